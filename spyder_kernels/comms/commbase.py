@@ -27,6 +27,9 @@ mechanism:
       side of the comm.
     - If the `_wait_reply` is implemented, remote_call can be called with
       `blocking=True`, which will wait for a reply sent by the other side.
+    - With `future=True`, calls return a `concurrent.futures.Future` of the
+      reply instead, so several calls can be made before waiting for their
+      replies with `gather`.
 
 The messages exchanged are:
     - Function call (spyder_msg_type = 'remote_call'):
@@ -37,9 +40,12 @@ The messages exchanged are:
             'call_args': The function args,
             'call_kwargs': The function kwargs,
             'buffered_args': The args index that are in the buffers,
-            'buffered_kwargs': the kwargs keys that are in the buffers
+            'buffered_kwargs': the kwargs keys that are in the buffers,
+            'buffer_list_args': [index, length] of the BufferList args,
+            'buffer_list_kwargs': [key, length] of the BufferList kwargs
           }
-        - The buffer contains any bytes in the arguments
+        - The buffer contains any bytes in the arguments, followed by the
+          items of any BufferList in the arguments
     - If the 'settings' has `'blocking' =  True`, a reply is sent.
       (spyder_msg_type = 'remote_call_reply'):
         - The 'content' is a dict with: {
@@ -47,27 +53,85 @@ The messages exchanged are:
                         exception to be raised.
             'call_id': The uuid from above,
             'call_name': The function name (mostly for debugging),
-            'call_return_value': The return value of the function
+            'call_return_value': The return value of the function,
+            'return_buffer_list': True if the return value is a BufferList
            }
-        - The buffer contains the return value if it is bytes
+        - The buffer contains the return value if it is bytes, or its items
+          if it is a BufferList
+
+If the 'settings' of a call has `'stream' = True` and the buffers of its
+reply are bigger than `STREAM_THRESHOLD`, the reply is streamed in chunks
+instead:
+    - A 'stream_start' message is sent with the reply content plus
+      'buffer_sizes', the sizes of the reply buffers.
+    - The buffers are sent in 'stream_chunk' messages, with content
+      {'call_id', 'index', 'buffer_index', 'offset'} and the chunk as their
+      only buffer. At most `STREAM_MAX_IN_FLIGHT` chunks are sent before
+      they are acknowledged.
+    - The receiver acknowledges each chunk with a 'stream_ack' message
+      ({'call_id', 'index'}) or stops the stream with a 'stream_cancel'
+      message ({'call_id'}).
+When all chunks are received, the reply is handled as a regular one.
+
+Several calls can be sent in a single message with `RemoteCallFactory.batch`
+(spyder_msg_type = 'remote_call_batch'):
+    - The content is a dictionnary {
+        'calls': The list of call contents, as described above, each with
+                 'n_buffers', its number of buffers
+      }
+    - The buffer contains the buffers of all the calls, in order.
+The calls are run in order and the replies of the ones that need one are
+sent in a single message (spyder_msg_type = 'remote_call_batch_reply'):
+    - The content is a dictionnary {
+        'replies': The list of reply contents, as described above, each with
+                   'n_buffers', its number of buffers
+      }
+    - The buffer contains the buffers of all the replies, in order.
+Replies of batched calls are never streamed.
 """
+from concurrent.futures import Future, wait as wait_futures
 import logging
 import sys
+import threading
+import time
 import uuid
 import traceback
 import builtins
 
+from spyder_kernels.comms.stats import CommStats, message_size
+
 
 logger = logging.getLogger(__name__)
 
 # Max timeout (in secs) for blocking calls
 TIMEOUT = 3
 
+# Minimum size (in bytes) of the buffers of a reply to stream it
+STREAM_THRESHOLD = 2**24
+
+# Size (in bytes) of the chunks of streamed replies
+STREAM_CHUNK_SIZE = 2**20
+
+# Max number of chunks sent and not acknowledged yet
+STREAM_MAX_IN_FLIGHT = 4
+
 
 class CommError(RuntimeError):
     pass
 
 
+class BufferList(list):
+    """
+    List of buffers (bytes or objects supporting the buffer protocol).
+
+    When passed as an argument or returned by a remote call, its items are
+    sent as separate buffers of the comm message instead of its JSON
+    content, so they are not copied to be serialized. They are received as
+    a BufferList too.
+    """
+    pass
+
+
 def stacksummary_to_json(stack):
     """StackSummary to json."""
     return [
@@ -83,7 +147,7 @@ def stacksummary_to_json(stack):
 
 def staksummary_from_json(stack):
     """StackSummary from json."""
-    traceback.StackSummary.from_list([
+    return traceback.StackSummary.from_list([
         (
             frame["filename"],
             frame["lineno"],
@@ -194,11 +258,35 @@ class CommBase:
         # Lists of reply numbers
         self._reply_inbox = {}
         self._reply_waitlist = {}
+        # Futures of the replies, by call id
+        self._reply_futures = {}
+        # Statistics of the calls, and start times of the ones waiting for
+        # a reply by call id
+        self._stats = CommStats()
+        self._call_start_times = {}
+        # Streamed replies being sent and received, by call id. Acks and
+        # cancellations can be handled in other threads than the one sending
+        # the chunks, so they are only changed with the lock held.
+        self._outgoing_streams = {}
+        self._incoming_streams = {}
+        self._streams_lock = threading.Lock()
 
         self._register_message_handler(
             'remote_call', self._handle_remote_call)
         self._register_message_handler(
             'remote_call_reply', self._handle_remote_call_reply)
+        self._register_message_handler(
+            'remote_call_batch', self._handle_remote_call_batch)
+        self._register_message_handler(
+            'remote_call_batch_reply', self._handle_remote_call_batch_reply)
+        self._register_message_handler(
+            'stream_start', self._handle_stream_start)
+        self._register_message_handler(
+            'stream_chunk', self._handle_stream_chunk)
+        self._register_message_handler(
+            'stream_ack', self._handle_stream_ack)
+        self._register_message_handler(
+            'stream_cancel', self._handle_stream_cancel)
 
     def get_comm_id_list(self, comm_id=None):
         """Get a list of comms id."""
@@ -213,6 +301,7 @@ class CommBase:
         id_list = self.get_comm_id_list(comm_id)
 
         for comm_id in id_list:
+            self._drop_streams(comm_id)
             try:
                 self._comms[comm_id]['comm'].close()
                 del self._comms[comm_id]
@@ -253,6 +342,91 @@ class CommBase:
         """Get a handler for remote calls."""
         return RemoteCallFactory(self, comm_id, callback, **settings)
 
+    def gather(self, *futures, timeout=None, return_exceptions=False):
+        """
+        Wait for the replies of calls made with `future=True`.
+
+        Parameters
+        ----------
+        futures: concurrent.futures.Future
+            The futures returned by the calls.
+        timeout: float or None
+            Maximum time to wait, in seconds, or None to wait until all the
+            replies are received.
+        return_exceptions: bool
+            If True, errors raised by the calls are returned as results
+            instead of being raised.
+
+        Returns
+        -------
+        The list of the results of the calls, in the order of `futures`.
+        """
+        if not self._wait_futures(futures, timeout):
+            raise TimeoutError("Timeout while waiting for replies.")
+        results = []
+        for future in futures:
+            error = future.exception()
+            if error is not None and not return_exceptions:
+                raise error
+            results.append(future.result() if error is None else error)
+        return results
+
+    def get_comm_stats(self):
+        """
+        Get the statistics of the remote calls, by call name.
+
+        See `CommStats` for what is recorded. Latency histograms are
+        dictionaries with the upper bounds of their buckets in seconds
+        ('buckets') and the number of calls in each one ('counts'), the
+        last count being for the calls above the last bound.
+        """
+        return self._stats.get()
+
+    def reset_comm_stats(self):
+        """Forget the statistics of the remote calls."""
+        self._stats.reset()
+
+    def cancel_stream(self, call_id):
+        """
+        Stop receiving the streamed reply of the call with id `call_id`.
+
+        The call fails with a CommError.
+        """
+        with self._streams_lock:
+            stream = self._incoming_streams.pop(call_id, None)
+        if stream is None:
+            return
+        try:
+            self._send_message(
+                'stream_cancel',
+                content={'call_id': call_id},
+                comm_id=stream['comm_id']
+            )
+        except CommError:
+            pass
+
+        call_name = stream['content']['call_name']
+        try:
+            raise CommError(
+                "The reply of '{}' was cancelled".format(call_name))
+        except CommError:
+            error = CommsErrorWrapper(call_name, call_id)
+        content = dict(
+            stream['content'],
+            is_error=True,
+            call_return_value=error.to_json()
+        )
+        self._handle_remote_call_reply({'content': content}, [])
+
+    def on_stream_progress(self, call_id, call_name, received, total):
+        """
+        Part of the streamed reply of a call was received.
+
+        `received` and `total` are the number of bytes received so far and
+        in total.
+        """
+        pass
+
     # ---- Private -----
     def _send_message(
         self, spyder_msg_type, content=None, comm_id=None, buffers=None
@@ -322,6 +496,7 @@ class CommBase:
     def _comm_close(self, msg):
         """Close comm."""
         comm_id = msg['content']['comm_id']
+        self._drop_streams(comm_id)
         del self._comms[comm_id]
 
     def _comm_message(self, msg):
@@ -343,29 +518,94 @@ class CommBase:
     def _handle_remote_call(self, msg, buffers):
         """Handle a remote call."""
         msg_dict = msg['content']
+        return_value, is_error = self._run_call(
+            msg_dict, buffers, message_size(msg_dict, buffers))
+        self._set_call_return_value(msg_dict, return_value, is_error=is_error)
+
+    def _handle_remote_call_batch(self, msg, buffers):
+        """Handle a batch of remote calls."""
+        comm_id = self.calling_comm_id
+        buffers = list(buffers or [])
+        replies = []
+        reply_buffers = []
+        for call_dict in msg['content']['calls']:
+            n_buffers = call_dict.pop('n_buffers')
+            call_buffers = buffers[:n_buffers]
+            del buffers[:n_buffers]
+
+            return_value, is_error = self._run_call(
+                call_dict, call_buffers,
+                message_size(call_dict, call_buffers))
+            reply = self._make_call_reply(
+                call_dict, return_value, is_error=is_error)
+            if reply is None:
+                continue
+            content, call_reply_buffers = reply
+            content['n_buffers'] = len(call_reply_buffers or [])
+            self._stats.record_reply(
+                call_dict['call_name'],
+                message_size(content, call_reply_buffers),
+                content['n_buffers'])
+            replies.append(content)
+            reply_buffers.extend(call_reply_buffers or [])
+
+        if replies:
+            self._send_message(
+                'remote_call_batch_reply',
+                content={'replies': replies},
+                comm_id=comm_id,
+                buffers=reply_buffers
+            )
+
+    def _run_call(self, msg_dict, buffers, request_size):
+        """
+        Run the remote call described by `msg_dict`.
+
+        `request_size` is the size of its message (see `message_size`).
+        Return a tuple ``(return_value, is_error)``. For errors, the return
+        value is a `CommsErrorWrapper`.
+        """
         self.on_incoming_call(msg_dict)
+        n_buffers = len(buffers or [])
+        t_start = time.perf_counter()
         try:
             # read buffers
             args = msg_dict['call_args']
             kwargs = msg_dict['call_kwargs']
 
-            if buffers:
-                for idx in msg_dict['buffered_args']:
-                    args[idx] = buffers.pop(0)
-                for name in msg_dict['buffered_kwargs']:
-                    kwargs[name] = buffers.pop(0)
-                assert len(buffers) == 0
+            # Empty BufferLists have no buffers, but must be rebuilt too
+            buffers = list(buffers or [])
+            for idx in msg_dict['buffered_args']:
+                args[idx] = buffers.pop(0)
+            for name in msg_dict['buffered_kwargs']:
+                kwargs[name] = buffers.pop(0)
+            for idx, length in msg_dict.get('buffer_list_args', []):
+                args[idx] = BufferList(buffers[:length])
+                del buffers[:length]
+            for name, length in msg_dict.get('buffer_list_kwargs', []):
+                kwargs[name] = BufferList(buffers[:length])
+                del buffers[:length]
+            assert len(buffers) == 0
 
             return_value = self._remote_callback(
                 msg_dict['call_name'],
                 args,
                 kwargs
             )
-            self._set_call_return_value(msg_dict, return_value)
+            is_error = False
         except Exception:
-            exc_infos = CommsErrorWrapper(
+            return_value = CommsErrorWrapper(
                 msg_dict['call_name'], msg_dict['call_id'])
-            self._set_call_return_value(msg_dict, exc_infos, is_error=True)
+            is_error = True
+
+        self._stats.record_handled(
+            msg_dict['call_name'],
+            time.perf_counter() - t_start,
+            request_size,
+            n_buffers,
+            is_error=is_error
+        )
+        return return_value, is_error
 
     def _remote_callback(self, call_name, call_args, call_kwargs):
         """Call the callback function for the remote call."""
@@ -381,6 +621,39 @@ class CommBase:
 
         This will reply if settings['blocking'] == True
         """
+        reply = self._make_call_reply(call_dict, return_value, is_error)
+        if reply is None:
+            # Nothing to send back
+            return
+        content, buffers = reply
+        self._stats.record_reply(
+            call_dict['call_name'],
+            message_size(content, buffers),
+            len(buffers or []))
+
+        settings = call_dict['settings']
+        stream = 'stream' in settings and settings['stream']
+        if (
+            stream and buffers
+            and sum(memoryview(b).nbytes for b in buffers) > STREAM_THRESHOLD
+        ):
+            self._start_stream(content, buffers, self.calling_comm_id)
+            return
+
+        self._send_message(
+            'remote_call_reply',
+            content=content,
+            comm_id=self.calling_comm_id,
+            buffers=buffers
+        )
+
+    def _make_call_reply(self, call_dict, return_value, is_error=False):
+        """
+        Get the content and buffers of the reply to a call.
+
+        Return None if the call doesn't need a reply. Errors are displayed
+        here if the call settings ask for it.
+        """
         settings = call_dict['settings']
 
         display_error = ('display_error' in settings and
@@ -392,13 +665,16 @@ class CommBase:
 
         send_reply = 'send_reply' in settings and settings['send_reply']
         if not send_reply:
-            # Nothing to send back
-            return
+            return None
 
         buffers = None
+        return_buffer_list = isinstance(return_value, BufferList)
         if isinstance(return_value, bytes):
             buffers = [return_value]
             return_value = None
+        elif return_buffer_list:
+            buffers = list(return_value)
+            return_value = None
 
         content = {
             'is_error': is_error,
@@ -406,23 +682,24 @@ class CommBase:
             'call_name': call_dict['call_name'],
             'call_return_value': return_value
         }
+        if return_buffer_list:
+            content['return_buffer_list'] = True
+        return content, buffers
 
-        self._send_message(
-            'remote_call_reply',
-            content=content,
-            comm_id=self.calling_comm_id,
-            buffers=buffers
-        )
-
-    def _register_call(self, call_dict, callback=None):
+    def _register_call(self, call_dict, callback=None, future=None):
         """
         Register the call so the reply can be properly treated.
         """
         settings = call_dict['settings']
-        blocking = 'blocking' in settings and settings['blocking']
+        # Calls with a future never block
+        blocking = (
+            'blocking' in settings and settings['blocking'] and future is None)
         call_id = call_dict['call_id']
-        if blocking or callback is not None:
+        if blocking or callback is not None or future is not None:
             self._reply_waitlist[call_id] = blocking, callback
+            self._call_start_times[call_id] = time.perf_counter()
+        if future is not None:
+            self._reply_futures[call_id] = future
 
     def on_outgoing_call(self, call_dict):
         """A message is about to be sent"""
@@ -439,6 +716,26 @@ class CommBase:
             'remote_call', content=call_dict, comm_id=comm_id, buffers=buffers
         )
 
+    def _send_call_batch(self, calls, comm_id):
+        """
+        Send a batch of calls.
+
+        `calls` is a list of tuples ``(call_dict, buffers)``.
+        """
+        call_dicts = []
+        batch_buffers = []
+        for call_dict, buffers in calls:
+            call_dict = dict(
+                self.on_outgoing_call(call_dict), n_buffers=len(buffers))
+            call_dicts.append(call_dict)
+            batch_buffers.extend(buffers)
+        self._send_message(
+            'remote_call_batch',
+            content={'calls': call_dicts},
+            comm_id=comm_id,
+            buffers=batch_buffers
+        )
+
     def _get_call_return_value(self, call_dict, comm_id):
         """
         Send a remote call and return the reply.
@@ -476,6 +773,13 @@ class CommBase:
         """
         raise NotImplementedError
 
+    def _wait_futures(self, futures, timeout):
+        """
+        Wait until futures are done. Returns False if timeout.
+        """
+        __, not_done = wait_futures(futures, timeout)
+        return not not_done
+
     def _handle_remote_call_reply(self, msg_dict, buffers):
         """
         A blocking call received a reply.
@@ -489,6 +793,8 @@ class CommBase:
         # Prepare return value
         if is_error:
             return_value = CommsErrorWrapper.from_json(return_value)
+        elif content.get('return_buffer_list', False):
+            return_value = BufferList(buffers or [])
         elif buffers:
             assert len(buffers) == 1
             return_value = buffers[0]
@@ -504,9 +810,24 @@ class CommBase:
             return
 
         blocking, callback = self._reply_waitlist.pop(call_id)
+        t_start = self._call_start_times.pop(call_id, None)
+        if t_start is not None:
+            self._stats.record_replied(
+                call_name, time.perf_counter() - t_start, is_error=is_error)
+
+        # Future
+        future = self._reply_futures.pop(call_id, None)
+        if future is not None:
+            if is_error:
+                future.set_exception(return_value.etype(return_value))
+            else:
+                future.set_result(return_value)
 
         # Async error
         if is_error and not blocking:
+            if future is not None:
+                # Raised by the future
+                return
             return self._async_error(return_value)
 
         # Callback
@@ -517,6 +838,150 @@ class CommBase:
         if blocking:
             self._reply_inbox[call_id] = content
 
+    def _handle_remote_call_batch_reply(self, msg_dict, buffers):
+        """The replies of a batch of calls were received."""
+        buffers = list(buffers or [])
+        for content in msg_dict['content']['replies']:
+            n_buffers = content.pop('n_buffers')
+            reply_buffers = buffers[:n_buffers]
+            del buffers[:n_buffers]
+            self._handle_remote_call_reply({'content': content}, reply_buffers)
+
+    def _start_stream(self, content, buffers, comm_id):
+        """Start streaming a reply."""
+        buffers = [memoryview(buffer).cast('B') for buffer in buffers]
+        chunks = [
+            (buffer_index, offset)
+            for buffer_index, buffer in enumerate(buffers)
+            for offset in range(0, buffer.nbytes, STREAM_CHUNK_SIZE)
+        ]
+        with self._streams_lock:
+            self._outgoing_streams[content['call_id']] = {
+                'comm_id': comm_id,
+                'buffers': buffers,
+                'chunks': chunks,
+                'sent': 0,
+                'acknowledged': 0,
+            }
+        start_content = dict(
+            content, buffer_sizes=[buffer.nbytes for buffer in buffers])
+        self._send_message(
+            'stream_start', content=start_content, comm_id=comm_id)
+        self._send_stream_chunks(content['call_id'])
+
+    def _send_stream_chunks(self, call_id):
+        """Send chunks of a stream until too many are in flight."""
+        while True:
+            # Chunks are reserved with the lock held, but sent without it so
+            # that acks can be handled meanwhile.
+            with self._streams_lock:
+                stream = self._outgoing_streams.get(call_id)
+                if (
+                    stream is None
+                    or stream['sent'] >= len(stream['chunks'])
+                    or stream['sent'] - stream['acknowledged']
+                    >= STREAM_MAX_IN_FLIGHT
+                ):
+                    return
+                index = stream['sent']
+                stream['sent'] += 1
+            buffer_index, offset = stream['chunks'][index]
+            chunk = stream['buffers'][buffer_index][
+                offset:offset + STREAM_CHUNK_SIZE]
+            self._send_message(
+                'stream_chunk',
+                content={
+                    'call_id': call_id,
+                    'index': index,
+                    'buffer_index': buffer_index,
+                    'offset': offset,
+                },
+                comm_id=stream['comm_id'],
+                buffers=[chunk]
+            )
+
+    def _handle_stream_ack(self, msg_dict, buffers):
+        """A chunk of a stream was received by the other side."""
+        call_id = msg_dict['content']['call_id']
+        with self._streams_lock:
+            stream = self._outgoing_streams.get(call_id)
+            if stream is None:
+                return
+            stream['acknowledged'] += 1
+            if stream['acknowledged'] >= len(stream['chunks']):
+                # Done
+                del self._outgoing_streams[call_id]
+                return
+        self._send_stream_chunks(call_id)
+
+    def _handle_stream_cancel(self, msg_dict, buffers):
+        """The other side doesn't want the rest of a stream."""
+        with self._streams_lock:
+            self._outgoing_streams.pop(msg_dict['content']['call_id'], None)
+
+    def _handle_stream_start(self, msg_dict, buffers):
+        """A streamed reply is starting."""
+        content = msg_dict['content']
+        buffer_sizes = content.pop('buffer_sizes')
+        stream = {
+            'comm_id': self.calling_comm_id,
+            'content': content,
+            'buffers': [bytearray(size) for size in buffer_sizes],
+            'received': 0,
+            'total': sum(buffer_sizes),
+        }
+        with self._streams_lock:
+            self._incoming_streams[content['call_id']] = stream
+
+    def _handle_stream_chunk(self, msg_dict, buffers):
+        """A chunk of a streamed reply was received."""
+        content = msg_dict['content']
+        call_id = content['call_id']
+        with self._streams_lock:
+            stream = self._incoming_streams.get(call_id)
+            if stream is None:
+                # Cancelled
+                return
+            chunk = memoryview(buffers[0]).cast('B')
+            buffer = stream['buffers'][content['buffer_index']]
+            offset = content['offset']
+            buffer[offset:offset + chunk.nbytes] = chunk
+            stream['received'] += chunk.nbytes
+            received = stream['received']
+
+        self._send_message(
+            'stream_ack',
+            content={'call_id': call_id, 'index': content['index']},
+            comm_id=stream['comm_id']
+        )
+        self.on_stream_progress(
+            call_id,
+            stream['content']['call_name'],
+            received,
+            stream['total']
+        )
+
+        if received >= stream['total']:
+            self._finish_stream(call_id)
+
+    def _finish_stream(self, call_id):
+        """Handle a streamed reply whose chunks were all received."""
+        with self._streams_lock:
+            stream = self._incoming_streams.pop(call_id, None)
+        if stream is None:
+            # Cancelled
+            return
+        self._handle_remote_call_reply(
+            {'content': stream['content']}, stream['buffers'])
+
+    def _drop_streams(self, comm_id):
+        """Forget the streams of a comm."""
+        with self._streams_lock:
+            for streams in [self._outgoing_streams, self._incoming_streams]:
+                for call_id, stream in list(streams.items()):
+                    if stream['comm_id'] == comm_id:
+                        del streams[call_id]
+
     def _async_error(self, error_wrapper):
         """
         Handle an error that was raised on the other side asyncronously.
@@ -550,25 +1015,169 @@ class RemoteCallFactory:
         """Set an attribute to the other side."""
         raise NotImplementedError
 
+    def batch(self):
+        """
+        Get a context manager to send several calls in a single message.
+
+        Calls made on it are collected and sent when the context exits
+        without errors. They are run in order by the other side, which
+        replies to all of them in a single message. If the calls are
+        blocking, their return values are then available in the `results`
+        attribute of the batch, in order. Failed calls don't raise, their
+        result is a `CommsErrorWrapper` instead.
+
+        Example::
+
+            with comm.remote_call(blocking=True).batch() as batch:
+                batch.get_cwd()
+                batch.get_syspath()
+            cwd, syspath = batch.results
+        """
+        return RemoteCallBatch(self._comms_wrapper, self._comm_id,
+                               self._callback, self._settings)
+
+
+class RemoteCallBatch:
+    """Class to collect `RemoteCall`s and send them together."""
+
+    def __init__(self, comms_wrapper, comm_id, callback, settings):
+        # Avoid setting attributes
+        super(RemoteCallBatch, self).__setattr__(
+            '_comms_wrapper', comms_wrapper)
+        super(RemoteCallBatch, self).__setattr__('_comm_id', comm_id)
+        super(RemoteCallBatch, self).__setattr__('_callback', callback)
+        super(RemoteCallBatch, self).__setattr__('_settings', settings)
+        super(RemoteCallBatch, self).__setattr__('_calls', [])
+        super(RemoteCallBatch, self).__setattr__('_futures', {})
+        super(RemoteCallBatch, self).__setattr__('results', None)
+
+    def __getattr__(self, name):
+        """Get a call for a function named 'name' to add to the batch."""
+        return RemoteCall(name, self._comms_wrapper, self._comm_id,
+                          self._callback, self._settings, batch=self)
+
+    def __setattr__(self, name, value):
+        """Set an attribute to the other side."""
+        raise NotImplementedError
+
+    def __len__(self):
+        return len(self._calls)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        calls = self._calls
+        futures = self._futures
+        super(RemoteCallBatch, self).__setattr__('_calls', [])
+        super(RemoteCallBatch, self).__setattr__('_futures', {})
+        if exc_type is not None or not calls:
+            # Nothing is sent if the calls couldn't all be collected
+            for future in futures.values():
+                future.cancel()
+            return False
+
+        comms_wrapper = self._comms_wrapper
+        blocking = 'blocking' in self._settings and self._settings['blocking']
+        if futures:
+            # Calls with a future never block
+            blocking = False
+        if not comms_wrapper.is_open(self._comm_id):
+            # Only an error if the calls are blocking.
+            if blocking:
+                raise CommError("The comm is not connected.")
+            logger.debug("Batch of calls to unconnected comm: %s" % ', '.join(
+                call_dict['call_name'] for call_dict, __ in calls))
+            for future in futures.values():
+                future.set_exception(CommError("The comm is not connected."))
+            return False
+
+        for call_dict, __ in calls:
+            comms_wrapper._register_call(
+                call_dict, self._callback, futures.get(call_dict['call_id']))
+        comms_wrapper._send_call_batch(calls, self._comm_id)
+        if not blocking:
+            return False
+
+        # The replies come in order, so all of them are there when the last
+        # one is.
+        last_call = calls[-1][0]
+        timeout = self._settings.get('timeout', None)
+        if timeout is None:
+            timeout = TIMEOUT
+        comms_wrapper._wait_reply(self._comm_id, last_call['call_id'],
+                                  last_call['call_name'], timeout)
+
+        results = []
+        for call_dict, __ in calls:
+            content = comms_wrapper._reply_inbox.pop(call_dict['call_id'])
+            results.append(content['call_return_value'])
+        super(RemoteCallBatch, self).__setattr__('results', results)
+        return False
+
+    def _add_call(self, call_dict, buffers, future=None):
+        """Add a call to the batch."""
+        self._calls.append((call_dict, buffers))
+        if future is not None:
+            self._futures[call_dict['call_id']] = future
+
 
 class RemoteCall():
     """Class to call the other side of the comms like a function."""
 
-    def __init__(self, name, comms_wrapper, comm_id, callback, settings):
+    def __init__(self, name, comms_wrapper, comm_id, callback, settings,
+                 batch=None):
         self._name = name
         self._comms_wrapper = comms_wrapper
         self._comm_id = comm_id
         self._settings = settings
         self._callback = callback
+        self._batch = batch
 
     def __call__(self, *args, **kwargs):
         """
         Transmit the call to the other side of the tunnel.
 
-        The args and kwargs have to be JSON-serializable or bytes.
+        The args and kwargs have to be JSON-serializable, bytes or
+        BufferList. Calls made on a `RemoteCallBatch` are only added to it
+        and return None.
+
+        If settings['future'] == True, the call doesn't block and returns a
+        `concurrent.futures.Future` of its reply instead (also for batched
+        calls). Asyncio code can await it with `asyncio.wrap_future`.
         """
         blocking = 'blocking' in self._settings and self._settings['blocking']
-        self._settings['send_reply'] = blocking or self._callback is not None
+        future = None
+        if 'future' in self._settings and self._settings['future']:
+            future = Future()
+            blocking = False
+        call_dict, buffers = self._make_call(args, kwargs)
+
+        if self._batch is not None:
+            self._batch._add_call(call_dict, buffers, future)
+            return future
+
+        if not self._comms_wrapper.is_open(self._comm_id):
+            # Only an error if the call is blocking.
+            if blocking:
+                raise CommError("The comm is not connected.")
+            logger.debug("Call to unconnected comm: %s" % self._name)
+            if future is not None:
+                future.set_exception(CommError("The comm is not connected."))
+            return future
+        self._comms_wrapper._register_call(call_dict, self._callback, future)
+        self._comms_wrapper._send_call(call_dict, self._comm_id, buffers)
+        if future is not None:
+            return future
+        return self._comms_wrapper._get_call_return_value(
+            call_dict, self._comm_id)
+
+    def _make_call(self, args, kwargs):
+        """Get the call dictionary and buffers of a call."""
+        blocking = 'blocking' in self._settings and self._settings['blocking']
+        future = 'future' in self._settings and self._settings['future']
+        self._settings['send_reply'] = (
+            blocking or future or self._callback is not None)
 
         # The call will be serialized with json. The bytes are sent separately.
         buffers = []
@@ -589,6 +1198,22 @@ class RemoteCall():
                 buffered_kwargs.append(name)
                 kwargs[name] = None
 
+        # The items of buffer lists go after all the bytes
+        buffer_list_args = []
+        buffer_list_kwargs = []
+        for i, arg in enumerate(args):
+            if isinstance(arg, BufferList):
+                buffers.extend(arg)
+                buffer_list_args.append([i, len(arg)])
+                args[i] = None
+
+        for name in kwargs:
+            arg = kwargs[name]
+            if isinstance(arg, BufferList):
+                buffers.extend(arg)
+                buffer_list_kwargs.append([name, len(arg)])
+                kwargs[name] = None
+
         call_id = uuid.uuid4().hex
         call_dict = {
             'call_name': self._name,
@@ -597,16 +1222,8 @@ class RemoteCall():
             'call_args': args,
             'call_kwargs': kwargs,
             'buffered_args': buffered_args,
-            'buffered_kwargs': buffered_kwargs
+            'buffered_kwargs': buffered_kwargs,
+            'buffer_list_args': buffer_list_args,
+            'buffer_list_kwargs': buffer_list_kwargs
         }
-
-        if not self._comms_wrapper.is_open(self._comm_id):
-            # Only an error if the call is blocking.
-            if blocking:
-                raise CommError("The comm is not connected.")
-            logger.debug("Call to unconnected comm: %s" % self._name)
-            return
-        self._comms_wrapper._register_call(call_dict, self._callback)
-        self._comms_wrapper._send_call(call_dict, self._comm_id, buffers)
-        return self._comms_wrapper._get_call_return_value(
-            call_dict, self._comm_id)
+        return call_dict, buffers
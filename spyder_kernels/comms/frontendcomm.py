@@ -7,6 +7,11 @@
 """
 In addition to the remote_call mechanism implemented in CommBase:
  - Implements _wait_reply, so blocking calls can be made.
+ - Threads waiting in wait_until are woken up by wake_up, which is called
+   when replies are received, so they don't need to poll.
+ - Control messages received while the kernel is blocked are dispatched
+   by poll_one on an event loop that is reused across calls, and the time
+   taken to handle them is recorded per message type.
 """
 
 import asyncio
@@ -21,11 +26,12 @@ from spyder_kernels.comms.commbase import CommBase, CommError
 from spyder_kernels.comms.utils import WriteContext
 
 
-def frontend_request(blocking, timeout=None):
+def frontend_request(blocking, timeout=None, future=False):
     """
     Send a request to the frontend.
 
-    If blocking is True, The return value will be returned.
+    If blocking is True, The return value will be returned. If future is
+    True, a future of the return value will be returned instead.
     """
     if not get_ipython().kernel.frontend_comm.is_open():
         raise CommError("Can't make a request to a closed comm")
@@ -33,7 +39,8 @@ def frontend_request(blocking, timeout=None):
     return get_ipython().kernel.frontend_call(
         blocking=blocking,
         broadcast=False,
-        timeout=timeout)
+        timeout=timeout,
+        future=future)
 
 
 class FrontendComm(CommBase):
@@ -47,8 +54,15 @@ class FrontendComm(CommBase):
         self.kernel.comm_manager.register_target(
             self._comm_name, self._comm_open)
         self.comm_lock = threading.Lock()
+        # Notified when something wait_until might be waiting for happened
+        self._wake_up_condition = threading.Condition()
         self._cached_messages = {}
         self._pending_comms = {}
+        # Event loop to run the handlers of messages received by poll_one
+        self._poll_loop = None
+        # Dispatch latency of those messages, by message type
+        self._dispatch_stats = {}
+        self._dispatch_stats_lock = threading.Lock()
 
     def close(self, comm_id=None):
         """Close the comm and notify the other side."""
@@ -82,7 +96,7 @@ class FrontendComm(CommBase):
             self.kernel.log.warning("Unknown message type: %r", msg_type)
             return
         try:
-            asyncio.run(handler(out_stream, ident, msg))
+            self._dispatch(msg_type, handler(out_stream, ident, msg))
         except Exception:
             self.kernel.log.error(
                 "Exception in message handler:", exc_info=True)
@@ -93,32 +107,73 @@ class FrontendComm(CommBase):
             if out_stream:
                 out_stream.flush(zmq.POLLOUT)
 
+    def get_dispatch_stats(self):
+        """
+        Get the dispatch latency of the messages handled by `poll_one`.
+
+        Returns a dictionary mapping message types to dictionaries with the
+        number of messages ('count') and the total, mean and maximum time
+        taken to handle them, in seconds.
+        """
+        with self._dispatch_stats_lock:
+            return {
+                msg_type: dict(
+                    stats, mean_time=stats['total_time'] / stats['count'])
+                for msg_type, stats in self._dispatch_stats.items()
+            }
+
+    def reset_dispatch_stats(self):
+        """Forget the dispatch latency of the handled messages."""
+        with self._dispatch_stats_lock:
+            self._dispatch_stats.clear()
+
     def remote_call(self, comm_id=None, blocking=False, callback=None,
-                    timeout=None, display_error=False):
+                    timeout=None, display_error=False, future=False):
         """Get a handler for remote calls."""
         return super(FrontendComm, self).remote_call(
             blocking=blocking,
             comm_id=comm_id,
             callback=callback,
             timeout=timeout,
-            display_error=display_error)
+            display_error=display_error,
+            future=future)
 
     def wait_until(self, condition, timeout=None):
-        """Wait until condition is met. Returns False if timeout."""
+        """
+        Wait until condition is met. Returns False if timeout.
+
+        Outside of the control thread, the condition is checked again each
+        time `wake_up` is called, so it has to be called after anything
+        that can change it.
+        """
         if condition():
             return True
         t_start = time.time()
-        while not condition():
-            if timeout is not None and time.time() > t_start + timeout:
-                return False
-            if threading.current_thread() is self.kernel.parent.control_thread:
+        control_thread = getattr(self.kernel.parent, 'control_thread', None)
+        if threading.current_thread() is control_thread:
+            while not condition():
+                if timeout is not None and time.time() > t_start + timeout:
+                    return False
                 # Wait for a reply on the comm channel.
                 self.poll_one()
-            else:
-                # Wait 10ms for a reply
-                time.sleep(0.01)
+            return True
+
+        with self._wake_up_condition:
+            while not condition():
+                if timeout is None:
+                    self._wake_up_condition.wait()
+                    continue
+                remaining = t_start + timeout - time.time()
+                if remaining <= 0:
+                    return False
+                self._wake_up_condition.wait(remaining)
         return True
 
+    def wake_up(self):
+        """Wake up the threads waiting in `wait_until`."""
+        with self._wake_up_condition:
+            self._wake_up_condition.notify_all()
+
     def cache_message(self, comm_id, msg):
         """Message from a comm that might be opened later."""
         if comm_id not in self._cached_messages:
@@ -126,6 +181,29 @@ class FrontendComm(CommBase):
         self._cached_messages[comm_id].append(msg)
 
     # --- Private --------
+    def _get_poll_loop(self):
+        """Get the event loop used to dispatch messages in poll_one."""
+        if self._poll_loop is None or self._poll_loop.is_closed():
+            self._poll_loop = asyncio.new_event_loop()
+        return self._poll_loop
+
+    def _dispatch(self, msg_type, coroutine):
+        """Run the handler coroutine of a message and record its latency."""
+        loop = self._get_poll_loop()
+        t_start = time.perf_counter()
+        try:
+            loop.run_until_complete(coroutine)
+        finally:
+            elapsed = time.perf_counter() - t_start
+            with self._dispatch_stats_lock:
+                stats = self._dispatch_stats.setdefault(
+                    msg_type,
+                    {'count': 0, 'total_time': 0., 'max_time': 0.}
+                )
+                stats['count'] += 1
+                stats['total_time'] += elapsed
+                stats['max_time'] = max(stats['max_time'], elapsed)
+
     def _check_comm_reply(self):
         """
         Send comm message to frontend to check if the iopub channel is ready
@@ -157,6 +235,19 @@ class FrontendComm(CommBase):
             self._cached_messages.pop(comm.comm_id)
 
 
+    def _handle_remote_call_reply(self, msg_dict, buffers):
+        """A blocking call received a reply."""
+        try:
+            super(FrontendComm, self)._handle_remote_call_reply(
+                msg_dict, buffers)
+        finally:
+            self.wake_up()
+
+    def _wait_futures(self, futures, timeout):
+        """Wait until the futures of calls are done."""
+        return self.wait_until(
+            lambda: all(future.done() for future in futures), timeout)
+
     def _wait_reply(self, comm_id, call_id, call_name, timeout, retry=True):
         """Wait until the frontend replies to a request."""
         def reply_received():
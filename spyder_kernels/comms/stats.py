@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Statistics of the remote calls of comms.
+
+They are recorded per call name, so slow or big calls can be spotted. Each
+call only updates a few counters, and latencies are kept in histograms with
+fixed buckets, so recording them has a low and constant overhead.
+"""
+
+from bisect import bisect_left
+import threading
+
+from jupyter_client.session import json_packer
+
+
+# Upper bounds of the buckets of latency histograms, in seconds. The last
+# bucket of histograms has the latencies above the last bound.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+
+def buffers_size(buffers):
+    """Get the number of bytes in buffers."""
+    return sum(memoryview(buffer).nbytes for buffer in buffers)
+
+
+def message_size(content, buffers=None):
+    """
+    Get the number of bytes of a message: its content serialized as JSON,
+    like the session does to send it, and its buffers.
+    """
+    try:
+        size = len(json_packer(content))
+    except (TypeError, ValueError):
+        # The session will fail to send it too
+        size = 0
+    return size + buffers_size(buffers or [])
+
+
+class LatencyHistogram:
+    """Histogram of latencies, with buckets bounded by `LATENCY_BUCKETS`."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.
+        self.max = 0.
+
+    def add(self, latency):
+        """Add a latency, in seconds."""
+        self.counts[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def to_dict(self):
+        """Get a JSON-able representation of the histogram."""
+        count = sum(self.counts)
+        return {
+            'buckets': list(LATENCY_BUCKETS),
+            'counts': list(self.counts),
+            'total_time': self.total,
+            'mean_time': self.total / count if count else 0.,
+            'max_time': self.max
+        }
+
+
+class CallStats:
+    """Statistics of the calls with a given name."""
+
+    def __init__(self):
+        # Calls handled by this side
+        self.count = 0
+        self.errors = 0
+        self.handler_latency = LatencyHistogram()
+        self.request_bytes = 0
+        self.request_buffers = 0
+        self.reply_bytes = 0
+        self.reply_buffers = 0
+        # Calls made to the other side that were replied
+        self.replied_count = 0
+        self.replied_errors = 0
+        self.round_trip_latency = LatencyHistogram()
+
+    def to_dict(self):
+        """Get a JSON-able representation of the statistics."""
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'handler_latency': self.handler_latency.to_dict(),
+            'request_bytes': self.request_bytes,
+            'request_buffers': self.request_buffers,
+            'reply_bytes': self.reply_bytes,
+            'reply_buffers': self.reply_buffers,
+            'replied_count': self.replied_count,
+            'replied_errors': self.replied_errors,
+            'round_trip_latency': self.round_trip_latency.to_dict()
+        }
+
+
+class CommStats:
+    """
+    Statistics of the remote calls of a comm, by call name.
+
+    For calls handled by this side, the time taken by their handler and the
+    size (see `message_size`) and number of buffers of their requests and
+    replies are recorded. For calls made to the other side, the time until
+    their reply is received is recorded.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _get_call_stats(self, call_name):
+        call_stats = self._calls.get(call_name)
+        if call_stats is None:
+            call_stats = self._calls[call_name] = CallStats()
+        return call_stats
+
+    def record_handled(self, call_name, latency, request_bytes,
+                       request_buffers, is_error=False):
+        """
+        Record a call handled by this side, whose request had
+        `request_bytes` bytes in total and `request_buffers` buffers.
+        """
+        with self._lock:
+            call_stats = self._get_call_stats(call_name)
+            call_stats.count += 1
+            call_stats.errors += is_error
+            call_stats.handler_latency.add(latency)
+            call_stats.request_bytes += request_bytes
+            call_stats.request_buffers += request_buffers
+
+    def record_reply(self, call_name, reply_bytes, reply_buffers):
+        """
+        Record the reply sent to a call handled by this side, which had
+        `reply_bytes` bytes in total and `reply_buffers` buffers.
+        """
+        with self._lock:
+            call_stats = self._get_call_stats(call_name)
+            call_stats.reply_bytes += reply_bytes
+            call_stats.reply_buffers += reply_buffers
+
+    def record_replied(self, call_name, latency, is_error=False):
+        """Record the reply to a call made to the other side."""
+        with self._lock:
+            call_stats = self._get_call_stats(call_name)
+            call_stats.replied_count += 1
+            call_stats.replied_errors += is_error
+            call_stats.round_trip_latency.add(latency)
+
+    def get(self):
+        """Get the statistics, as a dictionary keyed by call name."""
+        with self._lock:
+            return {
+                call_name: call_stats.to_dict()
+                for call_name, call_stats in self._calls.items()
+            }
+
+    def reset(self):
+        """Forget all the statistics."""
+        with self._lock:
+            self._calls.clear()
@@ -12,6 +12,10 @@ Comms Utilities
 import sys
 import threading
 
+import cloudpickle
+
+from spyder_kernels.comms.commbase import BufferList
+
 
 class WriteContext(object):
     class_lock = threading.RLock()
@@ -83,3 +87,35 @@ class WriteWrapper(object):
                     )
 
             return self._write(string)
+
+
+def dumps_out_of_band(value):
+    """
+    Serialize value with pickle protocol 5 and out-of-band buffers.
+
+    Returns a BufferList whose first item is the pickled data and the rest
+    are views of the contiguous buffers of value (e.g. the data of Numpy
+    arrays), which are not copied.
+    """
+    buffers = BufferList()
+    data = cloudpickle.dumps(
+        value, protocol=5, buffer_callback=buffers.append)
+    return BufferList([data] + [buffer.raw() for buffer in buffers])
+
+
+def loads_out_of_band(buffers, writable=True):
+    """
+    Deserialize a BufferList created with `dumps_out_of_band`.
+
+    Values are reconstructed on top of writable buffers without copying
+    them. Read-only buffers are copied if `writable` is True, so that the
+    values can be modified. Since the frames of the messages received by
+    comms are read-only, values sent in them are copied once.
+    """
+    data = buffers[0]
+    out_of_band = []
+    for buffer in buffers[1:]:
+        if writable and memoryview(buffer).readonly:
+            buffer = bytearray(buffer)
+        out_of_band.append(buffer)
+    return cloudpickle.loads(data, buffers=out_of_band)
@@ -20,6 +20,7 @@ import sys
 import traceback
 import tempfile
 import threading
+import time
 import cloudpickle
 
 # Third-party imports
@@ -32,8 +33,9 @@ from zmq.utils.garbage import gc
 
 # Local imports
 import spyder_kernels
-from spyder_kernels.comms.commbase import stacksummary_to_json
+from spyder_kernels.comms.commbase import BufferList, stacksummary_to_json
 from spyder_kernels.comms.frontendcomm import FrontendComm
+from spyder_kernels.comms.utils import dumps_out_of_band, loads_out_of_band
 from spyder_kernels.comms.decorators import (
     register_comm_handlers, comm_handler)
 from spyder_kernels.utils.pythonenv import (
@@ -43,11 +45,22 @@ from spyder_kernels.utils.pythonenv import (
     PythonEnvInfo,
     PythonEnvType,
 )
+from spyder_kernels.utils.arraystats import (
+    ARRAY_STATS, ARRAY_STATS_TIME_BUDGET)
+from spyder_kernels.utils.frameops import (
+    FRAME_VIEW_CACHE, get_frame_window)
+from spyder_kernels.utils.history import VariableHistory
 from spyder_kernels.utils.iofuncs import iofunctions
 from spyder_kernels.utils.mpl import automatic_backend, MPL_BACKENDS_TO_SPYDER
 from spyder_kernels.utils.nsview import (
-    get_remote_data, make_remote_view, get_size)
+    get_remote_data, make_children_view, make_remote_snapshot,
+    make_remote_view, make_remote_view_window, make_timed_view_row,
+    make_var_properties, make_view_delta, make_view_row, NamespaceTracker,
+    PANDAS_MEMORY_CACHE, resolve_path, VIEW_ROW_CACHE)
+from spyder_kernels.utils.slicing import get_slice, set_slice
 from spyder_kernels.utils.style import create_style_class
+from spyder_kernels.utils.summary import SUMMARY_CACHE
+from spyder_kernels.utils.thumbnails import THUMBNAIL_CACHE, THUMBNAIL_SIZE
 from spyder_kernels.console.shell import SpyderShell
 from spyder_kernels.comms.utils import WriteContext
 
@@ -59,6 +72,10 @@ logger = logging.getLogger(__name__)
 # shown at all there)
 EXCLUDED_NAMES = ['In', 'Out', 'exit', 'get_ipython', 'quit']
 
+# Time (in seconds) to compute the namespace view after each execution.
+# The display of the variables that don't fit in it is sent afterwards.
+NAMESPACE_VIEW_TIME_BUDGET = 0.5
+
 
 class SpyderKernel(IPythonKernel):
     """Spyder kernel for Jupyter."""
@@ -79,6 +96,23 @@ class SpyderKernel(IPythonKernel):
         self.faulthandler_handle = None
         self._cwd_initialised = False
 
+        # To publish only the changes of the namespace view
+        self.namespace_view_delta = False
+        self._namespace_view_seq = 0
+        self._published_namespace_view = None
+        self._published_var_properties = None
+
+        # To only compute the view of the variables that changed since the
+        # state was published
+        self.namespace_tracker = NamespaceTracker()
+
+        # To keep the history of the values of scalar variables
+        self.variable_history = VariableHistory()
+
+        # To compute the display of slow variables after publishing the state
+        self._pending_view_names = []
+        self._slow_values = {}
+
         # Add handlers to control to process messages while debugging
         self.control_handlers['comm_msg'] = self.control_comm_msg
         self.control_handlers['complete_request'] = self.shell_handlers[
@@ -107,8 +141,14 @@ class SpyderKernel(IPythonKernel):
 
     # -- Public API -----------------------------------------------------------
     def frontend_call(self, blocking=False, broadcast=True,
-                      timeout=None, callback=None, display_error=False):
-        """Call the frontend."""
+                      timeout=None, callback=None, display_error=False,
+                      future=False):
+        """
+        Call the frontend.
+
+        With future=True, calls return futures of their replies, which can
+        be waited for together with `self.frontend_comm.gather`.
+        """
         # If not broadcast, send only to the calling comm
         if broadcast:
             comm_id = None
@@ -120,7 +160,8 @@ class SpyderKernel(IPythonKernel):
             comm_id=comm_id,
             callback=callback,
             timeout=timeout,
-            display_error=display_error)
+            display_error=display_error,
+            future=future)
 
     def get_state(self):
         """"get current state to send to the frontend"""
@@ -128,10 +169,73 @@ class SpyderKernel(IPythonKernel):
         with WriteContext("get_state"):
             if self._cwd_initialised:
                 state["cwd"] = self.get_cwd()
-            state["namespace_view"] = self.get_namespace_view()
-            state["var_properties"] = self.get_var_properties()
+            view, properties = self._get_namespace_snapshot(
+                time_budget=NAMESPACE_VIEW_TIME_BUDGET)
+
+        if (
+            self.namespace_view_delta
+            and view is not None
+            and self._published_namespace_view is not None
+        ):
+            changed, removed = make_view_delta(
+                self._published_namespace_view, view)
+            changed_properties, __ = make_view_delta(
+                self._published_var_properties, properties)
+            state["namespace_view_delta"] = {
+                "changed": changed,
+                "changed_properties": changed_properties,
+                "removed": removed,
+            }
+        else:
+            state["namespace_view"] = view
+            state["var_properties"] = properties
+
+        if self.namespace_view_delta and view is not None:
+            self._namespace_view_seq += 1
+            state["namespace_view_seq"] = self._namespace_view_seq
+
+        self._published_namespace_view = view
+        self._published_var_properties = properties
+
+        # Compute the display of the variables that didn't fit in the time
+        # budget later.
+        self._pending_view_names = [
+            name for name, row in (view or {}).items() if row.get('pending')
+        ]
+        self._schedule_pending_views()
         return state
 
+    def reset_namespace_view_delta(self):
+        """
+        Forget the last published namespace view.
+
+        This makes the next call to `publish_state` send the full view.
+        """
+        self._published_namespace_view = None
+        self._published_var_properties = None
+
+    def invalidate_sampled_caches(self, names=None):
+        """
+        Forget the cached results that might be stale after running code.
+
+        Caches are validated with fingerprints that only sample big values,
+        so they can miss changes made to them in place by running code.
+        If `names` is given, only the results of their values are forgotten
+        (see `get_modifiable_names`).
+        """
+        caches = (VIEW_ROW_CACHE, ARRAY_STATS, FRAME_VIEW_CACHE,
+                  SUMMARY_CACHE, THUMBNAIL_CACHE, PANDAS_MEMORY_CACHE)
+        if names is None:
+            for cache in caches:
+                cache.invalidate_sampled()
+        else:
+            ns = self.shell.user_ns
+            for name in names:
+                if name in ns:
+                    for cache in caches:
+                        cache.invalidate(ns[name])
+        self.namespace_tracker.invalidate_sampled(names)
+
     def publish_state(self):
         """Publish the current kernel state"""
         if not self.frontend_comm.is_open():
@@ -295,6 +399,27 @@ class SpyderKernel(IPythonKernel):
 
         return stack_dict
 
+    @comm_handler
+    def get_comm_stats(self):
+        """
+        Get the statistics of the calls to the kernel and to the frontend.
+
+        Returns a dictionary with the statistics of the calls by call name in
+        'calls' (see `CommBase.get_comm_stats`), and the time taken to
+        dispatch the messages handled while the kernel is busy by message
+        type in 'dispatch' (see `FrontendComm.get_dispatch_stats`).
+        """
+        return {
+            'calls': self.frontend_comm.get_comm_stats(),
+            'dispatch': self.frontend_comm.get_dispatch_stats()
+        }
+
+    @comm_handler
+    def reset_comm_stats(self):
+        """Forget the statistics of the calls and of the dispatch times."""
+        self.frontend_comm.reset_comm_stats()
+        self.frontend_comm.reset_dispatch_stats()
+
     # --- For the Variable Explorer
     @comm_handler
     def get_namespace_view(self, frame=None):
@@ -332,6 +457,64 @@ class SpyderKernel(IPythonKernel):
         else:
             return None
 
+    @comm_handler
+    def get_namespace_view_window(self, offset=0, limit=None, sort_key='name',
+                                  reverse=False, name_filter=None,
+                                  type_filter=None):
+        """
+        Return a sorted and filtered window of the namespace view.
+
+        This allows the frontend to only request the rows it's displaying,
+        so the cost of the request doesn't depend on the namespace size.
+        See `make_remote_view_window` for the meaning of the arguments and
+        the returned value.
+        """
+        settings = self.namespace_view_settings
+        if settings:
+            ns = self.shell._get_current_namespace()
+            return make_remote_view_window(
+                ns,
+                settings,
+                offset=offset,
+                limit=limit,
+                sort_key=sort_key,
+                reverse=reverse,
+                name_filter=name_filter,
+                type_filter=type_filter,
+                more_excluded_names=EXCLUDED_NAMES
+            )
+        else:
+            return None
+
+    @comm_handler
+    def get_children(self, path, offset=0, limit=None):
+        """
+        Get a view of the children of a nested value.
+
+        `path` is a list whose first item is the name of a variable and the
+        rest are steps as described in `get_child`. See
+        `make_children_view` for the returned value, or None if there are
+        no view settings.
+        """
+        settings = self.namespace_view_settings
+        if not settings:
+            return None
+        ns = self.shell._get_current_namespace()
+        value = resolve_path(ns[path[0]], path[1:])
+        return make_children_view(
+            value, settings, offset=offset, limit=limit)
+
+    @comm_handler
+    def get_variable_history(self, name):
+        """
+        Get the history of the values of a scalar variable.
+
+        Values are recorded when they change, each time the state is
+        published after an execution. See `VariableHistory.get` for the
+        returned value.
+        """
+        return self.variable_history.get(name)
+
     @comm_handler
     def get_var_properties(self):
         """
@@ -346,55 +529,179 @@ class SpyderKernel(IPythonKernel):
 
             properties = {}
             for name, value in list(data.items()):
-                properties[name] = {
-                    'is_list':  self._is_list(value),
-                    'is_dict':  self._is_dict(value),
-                    'is_set': self._is_set(value),
-                    'len': self._get_len(value),
-                    'is_array': self._is_array(value),
-                    'is_image': self._is_image(value),
-                    'is_data_frame': self._is_data_frame(value),
-                    'is_series': self._is_series(value),
-                    'array_shape': self._get_array_shape(value),
-                    'array_ndim': self._get_array_ndim(value)
-                }
+                properties[name] = make_var_properties(value)
 
             return properties
         else:
             return None
 
     @comm_handler
-    def get_value(self, name, encoded=False):
-        """Get the value of a variable"""
+    def resync_namespace_view(self):
+        """
+        Get the full namespace view and use it as the base for later deltas.
+
+        This is meant to be called by the frontend when it detects a gap in
+        the sequence numbers of the deltas it received through
+        `update_state`.
+        """
+        self.reset_namespace_view_delta()
+        state = self.get_state()
+        return {
+            "namespace_view": state.get("namespace_view"),
+            "var_properties": state.get("var_properties"),
+            "namespace_view_seq": state.get("namespace_view_seq"),
+        }
+
+    @comm_handler
+    def get_value(self, name, encoded=False, out_of_band=False):
+        """
+        Get the value of a variable
+
+        If `encoded` and `out_of_band` are True, the value is encoded in a
+        BufferList with `dumps_out_of_band`, so that the data of arrays is
+        sent in separate buffers without being copied.
+        """
         ns = self.shell._get_current_namespace()
         value = ns[name]
         if encoded:
+            if out_of_band:
+                return dumps_out_of_band(value)
             # Encode with cloudpickle
             value = cloudpickle.dumps(value)
         return value
 
+    @comm_handler
+    def get_value_slice(self, name, rows=None, columns=None, index=None):
+        """
+        Get a block of an array, dataframe, series or sequence.
+
+        See `get_slice` for the meaning of the arguments. The block is
+        encoded in a BufferList with `dumps_out_of_band`.
+        """
+        ns = self.shell._get_current_namespace()
+        block = get_slice(ns[name], rows=rows, columns=columns, index=index)
+        return dumps_out_of_band(block)
+
+    @comm_handler
+    def get_frame_view(self, name, offset=0, limit=None, columns=None,
+                       sort_by=None, filter_expr=None):
+        """
+        Get a window of rows of a sorted or filtered view of a dataframe.
+
+        See `make_sort_keys` and `filter_positions` for the meaning of
+        `sort_by` and `filter_expr`, and `get_frame_window` for the other
+        arguments. The positions of the rows of views are cached, so only
+        the window is computed when scrolling. The result is encoded in a
+        BufferList with `dumps_out_of_band`.
+        """
+        ns = self.shell._get_current_namespace()
+        frame = ns[name]
+        positions = FRAME_VIEW_CACHE.get_positions(
+            frame, sort_by=sort_by, filter_expr=filter_expr)
+        window = get_frame_window(
+            frame, positions, offset=offset, limit=limit, columns=columns)
+        return dumps_out_of_band(window)
+
+    @comm_handler
+    def get_frame_groups(self, name, by, aggregations, filter_expr=None,
+                         offset=0, limit=None):
+        """
+        Get a window of rows of a dataframe grouped and aggregated.
+
+        See `group_frame` for the meaning of the arguments. The result is
+        encoded as in `get_frame_view`.
+        """
+        ns = self.shell._get_current_namespace()
+        groups = FRAME_VIEW_CACHE.get_groups(
+            ns[name], by, aggregations, filter_expr=filter_expr)
+        window = get_frame_window(groups, offset=offset, limit=limit)
+        return dumps_out_of_band(window)
+
+    @comm_handler
+    def get_value_summary(self, name, kind, quantiles=None, bins=None):
+        """
+        Get a summary of an array, dataframe or series.
+
+        See `get_summary` for the meaning of the arguments. Summaries are
+        cached while the variable doesn't change.
+        """
+        ns = self.shell._get_current_namespace()
+        return SUMMARY_CACHE.get_summary(
+            ns[name], kind, quantiles=quantiles, bins=bins)
+
+    @comm_handler
+    def get_value_thumbnail(self, name, max_size=THUMBNAIL_SIZE):
+        """
+        Get a PNG thumbnail of an image or an image-like array.
+
+        See `make_thumbnail` for the meaning of the arguments. Thumbnails
+        are cached while the variable doesn't change.
+        """
+        ns = self.shell._get_current_namespace()
+        return THUMBNAIL_CACHE.get_thumbnail(ns[name], max_size=max_size)
+
     @comm_handler
     def set_value(self, name, value, encoded=False):
-        """Set the value of a variable"""
+        """
+        Set the value of a variable
+
+        If `encoded` is True, value is a bytes object encoded with cloudpickle
+        or a BufferList encoded with `dumps_out_of_band`. The buffers of
+        received messages are read-only, so the data of a BufferList is copied
+        once to make the value writable.
+        """
         if encoded:
-            # Decode_value
-            value = cloudpickle.loads(value)
+            value = self._decode_value(value)
 
         ns = self.shell._get_reference_namespace(name)
         ns[name] = value
+        self.namespace_tracker.mark_dirty(name)
         self.log.debug(ns)
 
+    @comm_handler
+    def set_value_slice(self, name, value, rows=None, columns=None,
+                        index=None, encoded=False):
+        """
+        Set a block of an array, dataframe, series or list in place.
+
+        See `set_slice` for the meaning of the arguments. `value` can be
+        encoded as in `set_value`. Return the updated row of the variable in
+        the namespace view, or None if there are no view settings.
+        """
+        if encoded:
+            value = self._decode_value(value)
+
+        ns = self.shell._get_reference_namespace(name)
+        variable = ns[name]
+        set_slice(variable, value, rows=rows, columns=columns, index=index)
+
+        # The change might not be detected by the caches
+        VIEW_ROW_CACHE.invalidate(variable)
+        ARRAY_STATS.invalidate(variable)
+        SUMMARY_CACHE.invalidate(variable)
+        FRAME_VIEW_CACHE.invalidate(variable)
+        THUMBNAIL_CACHE.invalidate(variable)
+        PANDAS_MEMORY_CACHE.invalidate(variable)
+        self.namespace_tracker.mark_dirty(name)
+
+        settings = self.namespace_view_settings
+        if settings:
+            return make_view_row(variable, settings)
+        return None
+
     @comm_handler
     def remove_value(self, name):
         """Remove a variable"""
         ns = self.shell._get_reference_namespace(name)
         ns.pop(name)
+        self.namespace_tracker.mark_dirty(name)
 
     @comm_handler
     def copy_value(self, orig_name, new_name):
         """Copy a variable"""
         ns = self.shell._get_reference_namespace(orig_name)
         ns[new_name] = ns[orig_name]
+        self.namespace_tracker.mark_dirty(new_name)
 
     @comm_handler
     def load_data(self, filename, ext, overwrite=False):
@@ -430,6 +737,8 @@ class SpyderKernel(IPythonKernel):
             glbs.update(data)
         except Exception as error:
             return str(error)
+        finally:
+            self.namespace_tracker.mark_dirty(data)
 
         return None
 
@@ -627,7 +936,11 @@ class SpyderKernel(IPythonKernel):
                 self.publish_state()
             elif key == "namespace_view_settings":
                 self.namespace_view_settings = value
+                self.reset_namespace_view_delta()
                 self.publish_state()
+            elif key == "namespace_view_delta":
+                self.namespace_view_delta = value
+                self.reset_namespace_view_delta()
             elif key == "pdb":
                 self.shell.set_pdb_configuration(value)
             elif key == "faulthandler":
@@ -824,88 +1137,112 @@ class SpyderKernel(IPythonKernel):
 
     # -- Private API ---------------------------------------------------
     # --- For the Variable Explorer
-    def _get_len(self, var):
-        """Return sequence length"""
-        try:
-            return get_size(var)
-        except:
-            return None
-
-    def _is_array(self, var):
-        """Return True if variable is a NumPy array"""
-        try:
-            import numpy
-            return isinstance(var, numpy.ndarray)
-        except:
-            return False
-
-    def _is_image(self, var):
-        """Return True if variable is a PIL.Image image"""
-        try:
-            from PIL import Image
-            return isinstance(var, Image.Image)
-        except:
-            return False
+    def _decode_value(self, value):
+        """
+        Decode a value encoded with cloudpickle or `dumps_out_of_band`.
+        """
+        if isinstance(value, BufferList):
+            return loads_out_of_band(value)
+        return cloudpickle.loads(value)
 
-    def _is_data_frame(self, var):
-        """Return True if variable is a DataFrame"""
-        try:
-            from pandas import DataFrame
-            return isinstance(var, DataFrame)
-        except:
-            return False
+    def _get_namespace_snapshot(self, time_budget=None):
+        """
+        Get the namespace view and the variable properties walking the
+        current namespace only once.
+        """
+        settings = self.namespace_view_settings
+        if settings:
+            ns = self.shell._get_current_namespace()
+            # Values changed by silent executions are not recorded
+            self.variable_history.execution_count = (
+                self.shell.last_execution_count)
+            return make_remote_snapshot(
+                ns,
+                settings,
+                EXCLUDED_NAMES,
+                time_budget=time_budget,
+                slow_values=self._slow_values,
+                tracker=self.namespace_tracker,
+                history=self.variable_history
+            )
+        else:
+            return None, None
 
-    def _is_series(self, var):
-        """Return True if variable is a Series"""
-        try:
-            from pandas import Series
-            return isinstance(var, Series)
-        except:
-            return False
+    def _schedule_pending_views(self):
+        """Schedule the computation of the pending namespace view rows."""
+        if not self._pending_view_names:
+            return
+        io_loop = getattr(self, 'io_loop', None)
+        if io_loop is None or not self.frontend_comm.is_open():
+            return
+        io_loop.call_later(
+            0, self._complete_pending_views, self._pending_view_names)
 
-    def _is_list(self, var):
-        """Return True if variable is a list or tuple."""
-        # The try/except is necessary to fix spyder-ide/spyder#19516.
-        try:
-            return isinstance(var, (tuple, list))
-        except Exception:
-            return False
+    def _complete_pending_views(self, pending_names):
+        """
+        Compute the display and memory size of the variables in
+        `pending_names` and send them to the frontend.
 
-    def _is_dict(self, var):
-        """Return True if variable is a dictionary."""
-        # The try/except is necessary to fix spyder-ide/spyder#19516.
-        try:
-            return isinstance(var, dict)
-        except Exception:
-            return False
+        This stops after the time budget used for the namespace view and
+        schedules itself again for the remaining variables, so that other
+        events can be processed in between.
+        """
+        if pending_names is not self._pending_view_names:
+            # The state was published again, so these rows are outdated
+            return
 
-    def _is_set(self, var):
-        """Return True if variable is a set."""
-        # The try/except is necessary to fix spyder-ide/spyder#19516.
-        try:
-            return isinstance(var, set)
-        except Exception:
-            return False
+        settings = self.namespace_view_settings
+        view = self._published_namespace_view
+        if not settings or view is None:
+            return
 
-    def _get_array_shape(self, var):
-        """Return array's shape"""
-        try:
-            if self._is_array(var):
-                return var.shape
+        ns = self.shell._get_current_namespace()
+        changed = {}
+        start = time.perf_counter()
+        with WriteContext("get_state"):
+            while pending_names:
+                if time.perf_counter() - start > NAMESPACE_VIEW_TIME_BUDGET:
+                    break
+                name = pending_names.pop(0)
+                if name not in ns or name not in view:
+                    continue
+                row = make_timed_view_row(
+                    name, ns[name], settings, self._slow_values,
+                    minmax_time_budget=ARRAY_STATS_TIME_BUDGET)
+                if row.get('pending'):
+                    # The min and max of big arrays are computed in several
+                    # steps.
+                    pending_names.append(name)
+                else:
+                    # So that it's not sent as pending again after the next
+                    # execution if it doesn't change.
+                    self.namespace_tracker.update_row(name, ns[name], row)
+                if row != view[name]:
+                    changed[name] = row
+
+        view.update(changed)
+        if changed and self.frontend_comm.is_open():
+            if self.namespace_view_delta:
+                self._namespace_view_seq += 1
+                state = {
+                    "namespace_view_delta": {
+                        "changed": changed,
+                        "changed_properties": {},
+                        "removed": [],
+                    },
+                    "namespace_view_seq": self._namespace_view_seq,
+                }
             else:
-                return None
-        except:
-            return None
+                state = {
+                    "namespace_view": view,
+                    "var_properties": self._published_var_properties,
+                }
+            try:
+                self.frontend_call(blocking=False).update_state(state)
+            except Exception:
+                pass
 
-    def _get_array_ndim(self, var):
-        """Return array's ndim"""
-        try:
-            if self._is_array(var):
-                return var.ndim
-            else:
-                return None
-        except:
-            return None
+        self._schedule_pending_views()
 
     # --- For the Help plugin
     def _eval(self, text):
@@ -30,6 +30,7 @@ from spyder_kernels.customize.code_runner import SpyderCodeRunner
 from spyder_kernels.comms.commbase import stacksummary_to_json
 from spyder_kernels.comms.decorators import comm_handler
 from spyder_kernels.utils.mpl import automatic_backend
+from spyder_kernels.utils.nsview import get_modifiable_names
 
 
 logger = logging.getLogger(__name__)
@@ -50,6 +51,10 @@ class SpyderShell(ZMQInteractiveShell):
     def __init__(self, *args, **kwargs):
         # Create _namespace_stack before __init__
         self._namespace_stack = []
+        # Statements run since the last post_execute
+        self._executed_nodes = []
+        # Execution count of the last execution, None if it was silent
+        self.last_execution_count = 0
         self._request_pdb_stop = False
         self.special = None
         self._pdb_conf = {}
@@ -69,6 +74,8 @@ class SpyderShell(ZMQInteractiveShell):
         ]
 
         # register post_execute
+        self.events.register('pre_execute', self.do_pre_execute)
+        self.events.register('pre_run_cell', self.do_pre_run_cell)
         self.events.register('post_execute', self.do_post_execute)
 
     def init_magics(self):
@@ -439,6 +446,25 @@ class SpyderShell(ZMQInteractiveShell):
         except KeyboardInterrupt:
             self.showtraceback()
 
+    async def run_ast_nodes(self, nodelist, *args, **kwargs):
+        """Run the statements of a cell."""
+        self._executed_nodes.extend(nodelist)
+        return await super().run_ast_nodes(nodelist, *args, **kwargs)
+
+    def _get_modifiable_names(self):
+        """
+        Get the names whose values could have been modified in place by the
+        statements run since the last call (see `get_modifiable_names`).
+
+        Return None if they are unknown, e.g. after running code in the
+        debugger.
+        """
+        nodes = self._executed_nodes
+        self._executed_nodes = []
+        if not nodes or self.context_locals():
+            return None
+        return get_modifiable_names(nodes, self.user_ns)
+
     @comm_handler
     def pdb_input_reply(self, line, echo_stack_entry=True):
         """Get a pdb command from the frontend."""
@@ -449,10 +475,23 @@ class SpyderShell(ZMQInteractiveShell):
         debugger._cmd_input_line = line
         # Interrupts eventloop if needed
         self.kernel.interrupt_eventloop()
+        # Wakes up cmd_input if it's waiting for the line
+        self.kernel.frontend_comm.wake_up()
+
+    def do_pre_execute(self):
+        """Silent executions don't have an execution count."""
+        self.last_execution_count = None
+
+    def do_pre_run_cell(self, info):
+        """Save the execution count of the cell."""
+        if info.store_history:
+            # It's only incremented after this event
+            self.last_execution_count = self.execution_count
 
     def do_post_execute(self):
         """Flush __std*__ after execution."""
         # Flush C standard streams.
         sys.__stderr__.flush()
         sys.__stdout__.flush()
+        self.kernel.invalidate_sampled_caches(self._get_modifiable_names())
         self.kernel.publish_state()
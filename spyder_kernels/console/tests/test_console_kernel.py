@@ -20,6 +20,7 @@ import time
 from subprocess import Popen, PIPE
 import sys
 import inspect
+import threading
 import uuid
 from collections import namedtuple
 
@@ -32,8 +33,11 @@ import numpy as np
 import pytest
 
 # Local imports
-from spyder_kernels.comms.commbase import CommBase
+from spyder_kernels.comms import commbase
+from spyder_kernels.comms.commbase import BufferList, CommBase
+from spyder_kernels.comms.utils import dumps_out_of_band, loads_out_of_band
 from spyder_kernels.customize.spyderpdb import SpyderPdb
+from spyder_kernels.utils.arraystats import ARRAY_STATS
 from spyder_kernels.utils.iofuncs import iofunctions
 from spyder_kernels.utils.pythonenv import PythonEnvType
 from spyder_kernels.utils.test_utils import get_kernel, get_log_text
@@ -192,6 +196,63 @@ class Comm():
             return self._close_callback(msg)
 
 
+class LoopbackComm:
+    """Comm that delivers its messages to the other side synchronously."""
+
+    def __init__(self, comm_id):
+        self.comm_id = comm_id
+        self.other_side = None
+        self._msg_callback = None
+        # If not None, messages are queued here until delivered
+        self.queue = None
+        # Types of the sent messages
+        self.sent = []
+
+    def send(self, data=None, metadata=None, buffers=None):
+        self.sent.append(data['spyder_msg_type'])
+        # Received buffers are read-only, like the frames of zmq messages
+        buffers = [memoryview(bytes(buffer)) for buffer in buffers or []]
+        msg = {
+            'content': {'comm_id': self.comm_id, 'data': data},
+            'buffers': buffers
+        }
+        if self.queue is not None:
+            self.queue.append(msg)
+        else:
+            self.other_side._msg_callback(msg)
+
+    def deliver(self):
+        """Deliver the first queued message."""
+        self.other_side._msg_callback(self.queue.pop(0))
+
+    def close(self):
+        pass
+
+    def on_msg(self, callback):
+        self._msg_callback = callback
+
+    def on_close(self, callback):
+        pass
+
+
+class LoopbackCommBase(CommBase):
+    """CommBase whose replies are already received when waiting for them."""
+
+    def _wait_reply(self, comm_id, call_id, call_name, timeout):
+        if call_id not in self._reply_inbox:
+            raise TimeoutError("No reply for {}".format(call_name))
+
+
+def connect_comms():
+    """Get two CommBase's connected to each other."""
+    first, second = LoopbackCommBase(), LoopbackCommBase()
+    first_comm, second_comm = LoopbackComm('comm'), LoopbackComm('comm')
+    first_comm.other_side, second_comm.other_side = second_comm, first_comm
+    first._register_comm(first_comm)
+    second._register_comm(second_comm)
+    return first, second
+
+
 # =============================================================================
 # Fixtures
 # =============================================================================
@@ -315,6 +376,20 @@ def test_get_namespace_view_filter_on(kernel, filter_on):
     settings['exclude_capitalized'] = False
 
 
+def test_get_namespace_view_window(kernel):
+    """
+    Test getting a window of the namespace view.
+    """
+    asyncio.run(kernel.do_execute('a = 1; b = 2; c = "x"', True))
+
+    window = kernel.get_namespace_view_window(
+        offset=1, limit=1, sort_key='name')
+    assert window['total'] == 3
+    assert window['names'] == ['b']
+    assert window['view']['b']['view'] == '2'
+    assert not window['properties']['b']['is_array']
+
+
 def test_get_var_properties(kernel):
     """
     Test the properties fo the variables in the namespace.
@@ -334,6 +409,152 @@ def test_get_var_properties(kernel):
     assert "'array_ndim': None" in var_properties
 
 
+def test_get_state_delta(kernel):
+    """
+    Test that the state only contains the namespace changes when deltas are
+    enabled.
+    """
+    kernel.set_configuration({"namespace_view_delta": True})
+    asyncio.run(kernel.do_execute('a = 1; b = 2', True))
+
+    # The first state contains the full view
+    state = kernel.get_state()
+    assert 'namespace_view_delta' not in state
+    assert set(state['namespace_view']) == {'a', 'b'}
+    seq = state['namespace_view_seq']
+
+    # Only changes are sent afterwards
+    asyncio.run(kernel.do_execute('a = 3; c = 4; del b', True))
+    state = kernel.get_state()
+    assert 'namespace_view' not in state
+    assert state['namespace_view_seq'] == seq + 1
+    delta = state['namespace_view_delta']
+    assert set(delta['changed']) == {'a', 'c'}
+    assert delta['changed']['a']['view'] == '3'
+    assert set(delta['changed_properties']) == {'c'}
+    assert delta['removed'] == ['b']
+
+    # Nothing changed
+    delta = kernel.get_state()['namespace_view_delta']
+    assert delta == {'changed': {}, 'changed_properties': {}, 'removed': []}
+
+    # A resync returns the full view
+    state = kernel.resync_namespace_view()
+    assert set(state['namespace_view']) == {'a', 'c'}
+    assert state['namespace_view_seq'] == seq + 3
+
+    kernel.set_configuration({"namespace_view_delta": False})
+
+
+def test_get_state_dirty_names(kernel):
+    """
+    Test that names changed by comm handlers are published even if they are
+    modified in place.
+    """
+    kernel.set_configuration({"namespace_view_delta": True})
+    kernel.namespace_view_settings['minmax'] = True
+    asyncio.run(kernel.do_execute(
+        "import numpy as np; arr = np.zeros(100000); n = 1", True))
+    kernel.get_state()
+
+    kernel.set_value_slice('arr', 1, rows=[50000, 50001])
+    kernel.copy_value('n', 'm')
+    delta = kernel.get_state()['namespace_view_delta']
+    assert set(delta['changed']) == {'arr', 'm'}
+    assert delta['changed']['arr']['view'] == (
+        'Min: np.float64(0.0)\nMax: np.float64(1.0)')
+
+    # In-place edits of big arrays in the console are published too. The
+    # shell is shared by the kernels of all tests, so its post_execute
+    # callback can't be used here.
+    asyncio.run(kernel.do_execute("arr[12345] = 7", True))
+    kernel.invalidate_sampled_caches()
+    delta = kernel.get_state()['namespace_view_delta']
+    assert delta['changed']['arr']['view'] == (
+        'Min: np.float64(0.0)\nMax: np.float64(7.0)')
+
+    kernel.namespace_view_settings['minmax'] = False
+    kernel.set_configuration({"namespace_view_delta": False})
+
+
+def test_minmax_after_execution(kernel):
+    """Test that the min and max of big arrays are updated after editing."""
+    kernel.namespace_view_settings['minmax'] = True
+    asyncio.run(kernel.do_execute(
+        "import numpy as np; b = np.zeros(3_000_000)", True))
+    assert kernel.get_namespace_view()['b']['view'] == (
+        'Min: np.float64(0.0)\nMax: np.float64(0.0)')
+
+    # Element 12345 is not sampled by the fingerprint of b, but b is used
+    # by the code, so its statistics are computed again after running it.
+    asyncio.run(kernel.do_execute("b[12345] = 1e9", True))
+    assert kernel.get_namespace_view()['b']['view'] == (
+        'Min: np.float64(0.0)\nMax: np.float64(1000000000.0)')
+
+    # Running code that doesn't use b keeps its statistics
+    asyncio.run(kernel.do_execute("c = 1", True))
+    assert ARRAY_STATS.is_exact(kernel.shell.user_ns['b'])
+    kernel.namespace_view_settings['minmax'] = False
+
+
+def test_get_variable_history(kernel):
+    """Test that the history of scalar variables is recorded."""
+    counts = []
+    for code in ['x = 1', 'x = 2; y = "a"', 'z = 3', 'x = 4']:
+        counts.append(kernel.shell.execution_count)
+        asyncio.run(kernel.do_execute(code, False))
+        kernel.get_state()
+
+    history = kernel.get_variable_history('x')
+    assert history['values'] == [1, 2, 4]
+    assert history['execution_counts'] == [counts[0], counts[1], counts[3]]
+    assert kernel.get_variable_history('y')['values'] == []
+
+    # Silent executions don't have a count, so they are not recorded
+    asyncio.run(kernel.do_execute('x = 5', True))
+    kernel.get_state()
+    assert kernel.get_variable_history('x')['values'] == [1, 2, 4]
+
+    # Forget the inputs stored by the executions above
+    history_manager = kernel.shell.history_manager
+    del history_manager.input_hist_parsed[1:]
+    del history_manager.input_hist_raw[1:]
+
+
+def test_get_state_pending_views(kernel):
+    """
+    Test that variables that are slow to display are sent afterwards.
+    """
+    code = (
+        "import time\n"
+        "class SlowInt(int):\n"
+        "    def __repr__(self):\n"
+        "        time.sleep(0.2)\n"
+        "        return 'slow'\n"
+        "x = SlowInt(1)\n"
+        "y = 2"
+    )
+    asyncio.run(kernel.do_execute(code, True))
+
+    # The first time the variable is computed and marked as slow
+    state = kernel.get_state()
+    assert state['namespace_view']['x']['view'] == 'slow'
+    assert kernel._pending_view_names == []
+
+    # Then it's deferred
+    state = kernel.get_state()
+    assert state['namespace_view']['x']['pending']
+    assert state['namespace_view']['x']['memory'] is None
+    assert state['namespace_view']['y']['view'] == '2'
+    assert kernel._pending_view_names == ['x']
+
+    # And computed later
+    kernel._complete_pending_views(kernel._pending_view_names)
+    assert kernel._pending_view_names == []
+    assert kernel._published_namespace_view['x']['view'] == 'slow'
+    assert kernel._published_namespace_view['x']['memory'] > 0
+
+
 def test_get_value(kernel):
     """Test getting the value of a variable."""
     name = 'a'
@@ -343,6 +564,415 @@ def test_get_value(kernel):
     assert kernel.get_value(name) == 124
 
 
+def test_get_set_value_out_of_band(kernel):
+    """Test transferring values with out-of-band buffers."""
+    asyncio.run(kernel.do_execute(
+        "import numpy as np; arr = np.arange(1000.)", True))
+    arr = kernel.get_value('arr')
+
+    # The array data is sent in its own buffer without being copied
+    buffers = kernel.get_value('arr', encoded=True, out_of_band=True)
+    assert isinstance(buffers, BufferList)
+    assert len(buffers) == 2
+    assert np.shares_memory(np.frombuffer(buffers[1]), arr)
+
+    # Read-only buffers are copied so that the value can be modified
+    received = BufferList(memoryview(bytes(b)) for b in buffers)
+    kernel.set_value('arr2', received, encoded=True)
+    arr2 = kernel.get_value('arr2')
+    assert np.array_equal(arr2, arr)
+    assert arr2.flags.writeable
+
+    # Writable buffers are not copied
+    received = BufferList(
+        [buffers[0], bytearray(buffers[1])])
+    value = loads_out_of_band(received)
+    assert np.shares_memory(value, np.frombuffer(received[1]))
+
+
+def test_comm_stream(monkeypatch):
+    """Test streaming big replies in chunks."""
+    monkeypatch.setattr(commbase, 'STREAM_THRESHOLD', 100)
+    monkeypatch.setattr(commbase, 'STREAM_CHUNK_SIZE', 64)
+    monkeypatch.setattr(commbase, 'STREAM_MAX_IN_FLIGHT', 2)
+    frontend, kernel_comm = connect_comms()
+    data = bytes(range(256)) * 2
+    kernel_comm.register_call_handler('get_data', lambda: data)
+    progress = []
+    frontend.on_stream_progress = lambda *args: progress.append(args)
+
+    # Small replies are not streamed
+    monkeypatch.setattr(commbase, 'STREAM_THRESHOLD', 1000)
+    assert frontend.remote_call(blocking=True, stream=True).get_data() == data
+    assert progress == []
+
+    # The sender waits for acknowledgements
+    monkeypatch.setattr(commbase, 'STREAM_THRESHOLD', 100)
+    comm = kernel_comm._comms['comm']['comm']
+    comm.queue = []
+    replies = []
+    frontend.remote_call(callback=replies.append, stream=True).get_data()
+    assert [m['content']['data']['spyder_msg_type'] for m in comm.queue] == [
+        'stream_start', 'stream_chunk', 'stream_chunk']
+    comm.deliver()
+    comm.deliver()
+    assert len(comm.queue) == 2
+
+    while comm.queue:
+        comm.deliver()
+    assert bytes(replies[0]) == data
+    assert [p[2] for p in progress] == list(range(64, 513, 64))
+    assert progress[-1][3] == 512
+    assert kernel_comm._outgoing_streams == {}
+    assert frontend._incoming_streams == {}
+
+    # Blocking calls
+    comm.queue = None
+    assert frontend.remote_call(blocking=True, stream=True).get_data() == data
+
+    # Cancelling
+    comm.queue = []
+    progress.clear()
+    frontend.remote_call(callback=replies.append, stream=True).get_data()
+    comm.deliver()
+    comm.deliver()
+    frontend.cancel_stream(progress[0][0])
+    assert kernel_comm._outgoing_streams == {}
+    while comm.queue:
+        comm.deliver()
+    assert len(replies) == 1
+    assert frontend._incoming_streams == {}
+
+
+def test_comm_stream_threads(monkeypatch):
+    """Test that the acks of a stream can be handled in several threads."""
+    import queue
+    monkeypatch.setattr(commbase, 'STREAM_CHUNK_SIZE', 1)
+    monkeypatch.setattr(commbase, 'STREAM_MAX_IN_FLIGHT', 8)
+    __, kernel_comm = connect_comms()
+    sent = []
+    in_flight = queue.Queue()
+
+    def send_message(msg_type, content=None, comm_id=None, buffers=None):
+        if msg_type == 'stream_chunk':
+            sent.append(content['index'])
+            in_flight.put(content['index'])
+
+    def acknowledge():
+        while True:
+            try:
+                index = in_flight.get(timeout=1)
+            except queue.Empty:
+                return
+            kernel_comm._handle_stream_ack(
+                {'content': {'call_id': 'id', 'index': index}}, [])
+
+    monkeypatch.setattr(kernel_comm, '_send_message', send_message)
+    kernel_comm._start_stream({'call_id': 'id'}, [bytes(2000)], 'comm')
+    threads = [threading.Thread(target=acknowledge) for __ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Each chunk is sent once
+    assert sorted(sent) == list(range(2000))
+    assert kernel_comm._outgoing_streams == {}
+
+
+def test_get_value_slice(kernel):
+    """Test getting a block of a variable."""
+    asyncio.run(kernel.do_execute(
+        "import numpy as np; arr = np.arange(100.).reshape(10, 10)", True))
+
+    buffers = kernel.get_value_slice('arr', rows=[2, 4], columns=[0, 3])
+    block = loads_out_of_band(buffers)
+    assert np.array_equal(block, np.arange(100.).reshape(10, 10)[2:4, :3])
+
+
+def test_set_value_slice(kernel):
+    """Test setting a block of a variable in place."""
+    asyncio.run(kernel.do_execute(
+        "import numpy as np; arr = np.zeros(10); arr_id = id(arr)", True))
+    kernel.namespace_view_settings['minmax'] = True
+    kernel.get_namespace_view()
+
+    row = kernel.set_value_slice('arr', 5, rows=[2, 4])
+    arr = kernel.get_value('arr')
+    assert id(arr) == kernel.get_value('arr_id')
+    assert arr.tolist() == [0, 0, 5, 5, 0, 0, 0, 0, 0, 0]
+    assert row['view'] == 'Min: np.float64(0.0)\nMax: np.float64(5.0)'
+
+    # Encoded values
+    row = kernel.set_value_slice(
+        'arr', dumps_out_of_band(np.ones(2)), index=[[0, 2]], encoded=True)
+    assert arr[:2].tolist() == [1, 1]
+
+    # Values of a different kind are rejected
+    with pytest.raises(TypeError):
+        kernel.set_value_slice('arr', 'a', rows=[0, 1])
+
+
+def test_get_frame_view(kernel):
+    """Test sorting, filtering and grouping dataframes in the kernel."""
+    asyncio.run(kernel.do_execute(
+        "import pandas as pd; "
+        "df = pd.DataFrame({'a': [3, 1, 2, 4], 'b': list('xyxy')})", True))
+
+    window = loads_out_of_band(kernel.get_frame_view(
+        'df', offset=1, limit=2, sort_by=[['a', False]]))
+    assert window['total'] == 4
+    assert window['block']['a'].tolist() == [3, 2]
+
+    window = loads_out_of_band(kernel.get_frame_view(
+        'df', sort_by=['a'], filter_expr="b == 'y'"))
+    assert window['total'] == 2
+    assert window['block'].index.tolist() == [1, 3]
+
+    window = loads_out_of_band(kernel.get_frame_groups(
+        'df', 'b', {'a': 'sum'}))
+    assert window['block']['a'].to_dict() == {'x': 5, 'y': 5}
+
+    # Views are updated after partial updates
+    kernel.set_value_slice('df', 0, rows=[3, 4], columns=[0, 1])
+    window = loads_out_of_band(kernel.get_frame_view(
+        'df', limit=1, sort_by=['a']))
+    assert window['block']['a'].tolist() == [0]
+
+
+def test_get_value_thumbnail(kernel):
+    """Test getting thumbnails of image-like variables."""
+    asyncio.run(kernel.do_execute(
+        "import numpy as np; img = np.zeros((1000, 500, 3))", True))
+    thumbnail = kernel.get_value_thumbnail('img', max_size=50)
+    assert thumbnail.startswith(b'\x89PNG')
+
+    # Previews are updated after partial updates
+    kernel.set_value_slice('img', 1., index=[0, 0, 0])
+    assert kernel.get_value_thumbnail('img', max_size=50) != thumbnail
+
+
+def test_get_value_summary(kernel):
+    """Test getting summaries of variables."""
+    asyncio.run(kernel.do_execute(
+        "import numpy as np; arr = np.arange(10.)", True))
+    summary = kernel.get_value_summary('arr', 'histogram', bins=2)
+    assert summary == {'counts': [5, 5], 'edges': [0, 4.5, 9]}
+
+    # Summaries are updated after partial updates
+    kernel.set_value_slice('arr', 100, index=[0])
+    summary = kernel.get_value_summary('arr', 'histogram', bins=2)
+    assert summary['edges'] == [1, 50.5, 100]
+
+
+def test_get_children(kernel):
+    """Test browsing nested values."""
+    asyncio.run(kernel.do_execute(
+        "nested = {'a': [1, {'b': 2}]}", True))
+    view = kernel.get_children(['nested', ['key', 'a']], offset=1)
+    assert view['total'] == 2
+    assert view['children'][0]['step'] == ['index', 1]
+    assert view['children'][0]['view'] == "{'b':2}"
+
+
+def test_comm_buffer_lists():
+    """Test that buffer lists are sent as separate buffers in calls."""
+    frontend, kernel_comm = connect_comms()
+    kernel_comm.register_call_handler(
+        'echo', lambda *args, **kwargs: BufferList(
+            list(args[1]) + list(kwargs['kw'])))
+
+    reply = frontend.remote_call(blocking=True).echo(
+        b'abc', BufferList([b'de', b'f']), kw=BufferList([b'gh']))
+    assert isinstance(reply, BufferList)
+    assert [bytes(b) for b in reply] == [b'de', b'f', b'gh']
+
+    # Empty buffer lists are received as such, also without any buffers
+    reply = frontend.remote_call(blocking=True).echo(
+        None, BufferList(), kw=BufferList())
+    assert isinstance(reply, BufferList)
+    assert reply == []
+
+    # Values are transferred with out-of-band buffers
+    kernel_comm.register_call_handler(
+        'get_array', lambda: dumps_out_of_band(np.arange(10)))
+    reply = frontend.remote_call(blocking=True).get_array()
+    assert len(reply) == 2
+    assert np.array_equal(loads_out_of_band(reply), np.arange(10))
+
+
+def test_comm_batch():
+    """Test sending several calls in a single message."""
+    frontend, kernel_comm = connect_comms()
+    kernel_comm.register_call_handler('add', lambda a, b=0: a + b)
+    kernel_comm.register_call_handler('echo', lambda data: data)
+    kernel_comm.register_call_handler('fail', lambda: 1 / 0)
+
+    with frontend.remote_call(blocking=True).batch() as batch:
+        batch.add(1, b=2)
+        batch.fail()
+        batch.echo(b'abc')
+        assert len(batch) == 3
+    # A single message is sent and replied
+    assert frontend._comms['comm']['comm'].sent == ['remote_call_batch']
+    assert kernel_comm._comms['comm']['comm'].sent == [
+        'remote_call_batch_reply']
+    assert batch.results[0] == 3
+    assert isinstance(batch.results[1], commbase.CommsErrorWrapper)
+    assert batch.results[1].etype is ZeroDivisionError
+    assert bytes(batch.results[2]) == b'abc'
+    assert frontend._reply_inbox == {}
+
+    # Callbacks are called for each call
+    replies = []
+    with frontend.remote_call(callback=replies.append).batch() as batch:
+        batch.add(1)
+        batch.add(2, b=3)
+    assert replies == [1, 5]
+    assert batch.results is None
+
+    # Nothing is sent if there is an error in the context
+    with pytest.raises(ValueError):
+        with frontend.remote_call(blocking=True).batch() as batch:
+            batch.add(1)
+            raise ValueError
+    assert frontend._reply_waitlist == {}
+
+
+def test_comm_stats():
+    """Test the statistics of remote calls."""
+    frontend, kernel_comm = connect_comms()
+    kernel_comm.register_call_handler(
+        'echo', lambda data: BufferList([bytes(b) for b in data]))
+    kernel_comm.register_call_handler('fail', lambda: 1 / 0)
+    kernel_comm.register_call_handler('join', lambda text: text * 100)
+
+    frontend.remote_call(blocking=True).echo(BufferList([b'abc']))
+    frontend.remote_call(blocking=True).echo(BufferList([b'de', b'f']))
+    frontend.remote_call().fail()
+    frontend.remote_call(blocking=True).join('a' * 100)
+
+    stats = kernel_comm.get_comm_stats()
+    assert stats['echo']['count'] == 2
+    assert stats['echo']['errors'] == 0
+    assert stats['echo']['request_buffers'] == 3
+    assert stats['echo']['reply_buffers'] == 3
+    assert sum(stats['echo']['handler_latency']['counts']) == 2
+    assert stats['fail']['count'] == stats['fail']['errors'] == 1
+    assert stats['fail']['reply_bytes'] == 0
+
+    # Sizes include the JSON content of the messages
+    assert stats['echo']['request_bytes'] > 6
+    assert stats['echo']['reply_bytes'] > 6
+    assert 100 < stats['join']['request_bytes'] < 1000
+    assert stats['join']['reply_bytes'] > 10000
+    assert stats['join']['request_buffers'] == 0
+
+    # The caller records the replies it waited for
+    stats = frontend.get_comm_stats()
+    assert stats['echo']['replied_count'] == 2
+    assert sum(stats['echo']['round_trip_latency']['counts']) == 2
+    assert 'fail' not in stats
+
+    kernel_comm.reset_comm_stats()
+    assert kernel_comm.get_comm_stats() == {}
+
+
+def test_comm_future():
+    """Test getting futures of the replies of calls."""
+    frontend, kernel_comm = connect_comms()
+    kernel_comm.register_call_handler('add', lambda a, b=0: a + b)
+    kernel_comm.register_call_handler('fail', lambda: 1 / 0)
+    comm = kernel_comm._comms['comm']['comm']
+    comm.queue = []
+
+    # Calls are sent without waiting for the replies
+    first = frontend.remote_call(future=True).add(1, b=2)
+    second = frontend.remote_call(future=True, blocking=True).add(3)
+    assert not first.done() and not second.done()
+    while comm.queue:
+        comm.deliver()
+    assert frontend.gather(first, second) == [3, 3]
+    assert frontend._reply_inbox == {}
+
+    # Errors are raised by the futures
+    comm.queue = None
+    futures = [frontend.remote_call(future=True).fail(),
+               frontend.remote_call(future=True).add(1)]
+    with pytest.raises(ZeroDivisionError):
+        frontend.gather(*futures)
+    error, result = frontend.gather(*futures, return_exceptions=True)
+    assert isinstance(error, ZeroDivisionError) and result == 1
+
+    # Batched calls
+    with frontend.remote_call(future=True).batch() as batch:
+        futures = [batch.add(1), batch.fail()]
+    assert futures[0].result() == 1
+    assert isinstance(futures[1].exception(), ZeroDivisionError)
+    assert frontend._reply_waitlist == {}
+    assert frontend._reply_futures == {}
+
+
+def test_frontend_comm_wait_until(kernel):
+    """Test that waiting threads are woken up when replies arrive."""
+    frontend_comm = kernel.frontend_comm
+    assert not frontend_comm.wait_until(lambda: False, timeout=0.05)
+
+    call_id = 'call'
+    frontend_comm._reply_waitlist[call_id] = (True, None)
+
+    def reply():
+        frontend_comm._handle_remote_call_reply({'content': {
+            'call_id': call_id,
+            'call_name': 'get_value',
+            'is_error': False,
+            'call_return_value': 1
+        }}, [])
+
+    timer = threading.Timer(0.1, reply)
+    t_start = time.time()
+    timer.start()
+    # The timeout is only reached if the thread is not woken up
+    assert frontend_comm.wait_until(
+        lambda: call_id in frontend_comm._reply_inbox, timeout=10)
+    assert time.time() - t_start < 5
+    timer.join()
+    assert frontend_comm._reply_inbox.pop(call_id)['call_return_value'] == 1
+
+
+def test_frontend_comm_dispatch(kernel):
+    """Test that messages handled by poll_one reuse the same event loop."""
+    frontend_comm = kernel.frontend_comm
+    frontend_comm.reset_dispatch_stats()
+    loops = []
+
+    async def handler():
+        loops.append(asyncio.get_running_loop())
+
+    frontend_comm._dispatch('comm_msg', handler())
+    frontend_comm._dispatch('comm_msg', handler())
+    frontend_comm._dispatch('complete_request', handler())
+    assert len(loops) == 3
+    assert loops[0] is loops[1] is loops[2]
+    assert not loops[0].is_running()
+
+    stats = frontend_comm.get_dispatch_stats()
+    assert stats['comm_msg']['count'] == 2
+    assert stats['complete_request']['count'] == 1
+    assert 0 <= stats['comm_msg']['mean_time'] <= stats['comm_msg']['max_time']
+
+    frontend_comm.reset_dispatch_stats()
+    assert frontend_comm.get_dispatch_stats() == {}
+
+    # The kernel handlers include the dispatch statistics
+    frontend_comm._dispatch('comm_msg', handler())
+    stats = kernel.get_comm_stats()
+    assert stats['dispatch']['comm_msg']['count'] == 1
+    assert isinstance(stats['calls'], dict)
+    kernel.reset_comm_stats()
+    assert kernel.get_comm_stats() == {'calls': {}, 'dispatch': {}}
+
+
 def test_set_value(kernel):
     """Test setting the value of a variable."""
     name = 'a'
@@ -115,6 +115,7 @@ class NamespaceManager:
                 self.context_locals.update(self.ns_globals)
             else:
                 self.context_globals.update(self.ns_globals)
+            self.shell.kernel.namespace_tracker.mark_dirty(self.ns_globals)
 
         if self._previous_main:
             sys.modules['__main__'] = self._previous_main
@@ -233,6 +233,8 @@ class SpyderPdb(ipyPdb):
             finally:
                 if execute_events:
                      self.shell.events.trigger('post_execute')
+                else:
+                    self.shell.kernel.invalidate_sampled_caches()
                 sys.stdout = save_stdout
                 sys.stdin = save_stdin
                 sys.displayhook = save_displayhook
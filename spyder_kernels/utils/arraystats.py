@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Statistics of Numpy arrays.
+
+Statistics of big arrays (e.g. memory-mapped ones) are computed in chunks,
+so that they can be computed within a time budget, and are cached until the
+arrays change. Approximate results, computed from a sample of the array,
+are returned while the exact ones are not ready.
+"""
+
+import time
+import warnings
+import zlib
+
+from spyder_kernels.utils.cache import FingerprintCache
+from spyder_kernels.utils.lazymodules import numpy as np
+
+
+# Arrays smaller than this (in bytes) are fingerprinted using all their data
+FINGERPRINT_FULL_NBYTES = 65536
+
+# Number of elements sampled to fingerprint bigger arrays
+FINGERPRINT_SAMPLES = 257
+
+# Size (in bytes) of the chunks in which statistics are computed. Arrays
+# smaller than this are processed at once.
+CHUNK_NBYTES = 2**23
+
+# Number of elements sampled to compute approximate statistics
+APPROXIMATE_SAMPLES = 2**16
+
+# Default time (in seconds) to compute statistics of big arrays
+ARRAY_STATS_TIME_BUDGET = 0.05
+
+
+def array_fingerprint(value):
+    """
+    Get a cheap fingerprint of a Numpy array.
+
+    It changes when the array data changes, except for modifications of
+    elements that are not sampled in arrays bigger than
+    `FINGERPRINT_FULL_NBYTES`. Return None for arrays of objects because
+    they can change without anything in the array changing.
+    """
+    if value.dtype.hasobject:
+        return None
+    fingerprint = (
+        type(value),
+        value.__array_interface__['data'][0],
+        value.shape,
+        value.dtype.str,
+        value.strides,
+        value.flags.writeable,
+    )
+    is_masked = isinstance(value, np.ma.MaskedArray)
+    if value.nbytes <= FINGERPRINT_FULL_NBYTES:
+        data = value.tobytes()
+        if is_masked:
+            data += np.ma.getmaskarray(value).tobytes()
+    else:
+        # Sample elements uniformly, including the first and last ones
+        indexes = np.linspace(
+            0, value.size - 1, FINGERPRINT_SAMPLES).astype(np.intp)
+        data = value.flat[indexes].tobytes()
+        if is_masked:
+            data += np.ma.getmaskarray(value).flat[indexes].tobytes()
+    return fingerprint + (zlib.crc32(data),)
+
+
+def _has_moments(value):
+    """Check if the mean and std of value can be computed."""
+    return (
+        np.issubdtype(value.dtype, np.number)
+        and not np.issubdtype(value.dtype, np.complexfloating)
+    ) or value.dtype == np.bool_
+
+
+class _ChunkedStats:
+    """Statistics of an array computed one chunk at a time."""
+
+    def __init__(self, value, moments=False, nan_aware=False):
+        self.moments = moments and _has_moments(value)
+        self.nan_aware = nan_aware
+        self.min = None
+        self.max = None
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.position = 0
+
+        # Contiguous arrays are processed as flat views, others along their
+        # first axis.
+        self._flat = value.ndim == 0 or (
+            value.flags.c_contiguous or value.flags.f_contiguous)
+        if self._flat:
+            self.total = value.size
+            per_item = value.itemsize
+        else:
+            self.total = value.shape[0]
+            per_item = value[0].nbytes
+        self._step = max(1, CHUNK_NBYTES // max(1, per_item))
+
+    @property
+    def done(self):
+        return self.position >= self.total
+
+    def run(self, value, time_budget=None):
+        """
+        Process the chunks of value until done or `time_budget` is exhausted.
+
+        Note: The array is not saved in this object to not keep it alive.
+        """
+        start = time.perf_counter()
+        data = value.ravel(order='K') if self._flat else value
+        while not self.done:
+            chunk = data[self.position:self.position + self._step]
+            self.position += self._step
+            self._update(chunk)
+            if (
+                time_budget is not None
+                and time.perf_counter() - start > time_budget
+            ):
+                break
+
+    def _update(self, chunk):
+        """Add the statistics of chunk."""
+        if chunk.size == 0:
+            return
+
+        with warnings.catch_warnings():
+            # Chunks with only nans
+            warnings.simplefilter('ignore', RuntimeWarning)
+            if self.nan_aware:
+                chunk_min, chunk_max = np.nanmin(chunk), np.nanmax(chunk)
+                combine_min, combine_max = np.fmin, np.fmax
+            else:
+                chunk_min, chunk_max = chunk.min(), chunk.max()
+                combine_min, combine_max = np.minimum, np.maximum
+
+        if self.min is None:
+            self.min, self.max = chunk_min, chunk_max
+        else:
+            self.min = combine_min(self.min, chunk_min)
+            self.max = combine_max(self.max, chunk_max)
+
+        if self.moments:
+            chunk = chunk.ravel()
+            if self.nan_aware:
+                chunk = chunk[~np.isnan(chunk)]
+            count = chunk.size
+            if count == 0:
+                return
+            # Combine the moments with the parallel algorithm of Chan et al.
+            chunk_mean = chunk.mean(dtype=np.float64)
+            chunk_m2 = np.square(chunk - chunk_mean, dtype=np.float64).sum()
+            total = self.count + count
+            delta = chunk_mean - self.mean
+            self.mean += delta * count / total
+            self.m2 += chunk_m2 + delta ** 2 * self.count * count / total
+            self.count = total
+
+    def result(self, exact=True):
+        """Get a dictionary with the statistics."""
+        result = {'min': self.min, 'max': self.max, 'exact': exact}
+        if self.moments:
+            result['count'] = self.count
+            if self.count:
+                result['mean'] = self.mean
+                result['std'] = (self.m2 / self.count) ** 0.5
+            else:
+                result['mean'] = result['std'] = np.nan
+        return result
+
+
+def _get_approximate_stats(value, stats):
+    """
+    Complete the partial `stats` of value with the ones of a sample of it.
+    """
+    indexes = np.linspace(
+        0, value.size - 1, min(value.size, APPROXIMATE_SAMPLES)
+    ).astype(np.intp)
+    sample = value.flat[indexes]
+    sample_stats = _ChunkedStats(sample, stats.moments, stats.nan_aware)
+    sample_stats.run(sample)
+
+    result = sample_stats.result(exact=False)
+    if stats.min is not None:
+        # The exact results computed so far are also part of the range
+        if stats.nan_aware:
+            result['min'] = np.fmin(result['min'], stats.min)
+            result['max'] = np.fmax(result['max'], stats.max)
+        else:
+            result['min'] = np.minimum(result['min'], stats.min)
+            result['max'] = np.maximum(result['max'], stats.max)
+    return result
+
+
+def _is_read_only(value):
+    """
+    Check if the data of array *value* can't be modified, i.e. if neither
+    it nor the arrays it's a view of are writeable and the data is not
+    shared with other objects (except read-only memory maps).
+    """
+    while isinstance(value, np.ndarray):
+        if value.flags.writeable:
+            return False
+        if isinstance(value, np.memmap) and value.mode == 'r':
+            return True
+        value = value.base
+    return value is None or isinstance(value, bytes)
+
+
+def is_fingerprint_sampled(value):
+    """
+    Check if the fingerprint of array *value* (see `array_fingerprint`) can
+    miss changes of its data.
+
+    That's the case for arrays bigger than `FINGERPRINT_FULL_NBYTES`, unless
+    their data can't be modified (e.g. read-only memory maps).
+    """
+    if value.nbytes <= FINGERPRINT_FULL_NBYTES:
+        return False
+    if (
+        isinstance(value, np.ma.MaskedArray)
+        and value.mask is not np.ma.nomask
+        and not _is_read_only(value.mask)
+    ):
+        return True
+    return not _is_read_only(value)
+
+
+class ArrayStatsCache(FingerprintCache):
+    """
+    Compute statistics of arrays and cache them while the arrays don't
+    change.
+
+    Entries are keyed by the identity of the arrays and are only valid while
+    they are alive and their fingerprint (see `array_fingerprint`) doesn't
+    change, so that statistics computed before a change are not reported
+    as exact.
+    """
+
+    def __init__(self, maxsize=100):
+        super().__init__(maxsize)
+
+    def get_stats(self, value, time_budget=None, moments=False,
+                  nan_aware=False):
+        """
+        Get the statistics of the array *value*.
+
+        Parameters
+        ----------
+        value: numpy.ndarray
+            The array.
+        time_budget: float or None
+            Maximum time (in seconds) to spend computing the statistics of
+            big arrays. If None, they are computed completely.
+        moments: bool
+            Also compute the mean, standard deviation and number of
+            elements. This is ignored for non-numeric arrays.
+        nan_aware: bool
+            Ignore nans when computing the statistics.
+
+        Returns
+        -------
+        dict
+            With keys 'min', 'max' and 'exact', which is False when the time
+            budget was exhausted and the results are approximate. If
+            `moments` is True, also with keys 'mean', 'std' and 'count'.
+        """
+        if value.size == 0:
+            raise ValueError("Zero-size arrays have no statistics")
+
+        if not self._is_chunked(value):
+            stats = _ChunkedStats(value, moments, nan_aware)
+            stats.run(value)
+            return stats.result()
+
+        with self._lock:
+            stats = self._get_entry(value, moments, nan_aware)
+            stats.run(value, time_budget)
+            if stats.done:
+                return stats.result()
+            return _get_approximate_stats(value, stats)
+
+    def is_exact(self, value, moments=False, nan_aware=False):
+        """Check if the exact statistics of value are available."""
+        if not self._is_chunked(value):
+            return True
+        with self._lock:
+            return self._get_entry(value, moments, nan_aware).done
+
+    def _is_chunked(self, value):
+        """Check if the statistics of value are computed in chunks."""
+        return value.nbytes > CHUNK_NBYTES and not value.dtype.hasobject
+
+    def _is_sampled(self, value, key):
+        return is_fingerprint_sampled(value)
+
+    def _is_pinned(self, result):
+        # Otherwise, the statistics of more arrays than maxsize computed in
+        # turns would never be finished.
+        return not result.done
+
+    def _get_entry(self, value, moments, nan_aware):
+        """
+        Get the statistics entry of value, creating it if necessary.
+
+        This must be called with the lock held.
+        """
+        fingerprint = array_fingerprint(value)
+        key = (id(value), moments, nan_aware)
+        stats = self._lookup(key, value, fingerprint)
+        if stats is self.MISSING:
+            stats = _ChunkedStats(value, moments, nan_aware)
+            self._store(key, value, fingerprint, stats)
+        return stats
+
+
+ARRAY_STATS = ArrayStatsCache()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+LRU caches of results computed from values while the values don't change.
+"""
+
+from collections import OrderedDict
+import threading
+import weakref
+
+
+class FingerprintCache:
+    """
+    LRU cache of results computed from values.
+
+    Entries are keyed by the identity of the values (the first item of their
+    keys) and are only valid while the values are alive and their
+    fingerprint doesn't change. Fingerprints are cheap to compute, so they
+    can miss some changes (e.g. of the elements of big arrays they don't
+    sample). Entries of values whose fingerprint can do that are said to be
+    sampled, and are also invalidated by `invalidate_sampled`.
+
+    Subclasses implement the computation of the results, using `_get` or
+    `_lookup` and `_store`. The entries of results computed in several
+    steps can be kept until they are finished with `_is_pinned`, even if
+    that makes the cache grow over its maxsize.
+    """
+
+    # Returned by _lookup when there is no valid entry
+    MISSING = object()
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        # Reentrant so that subclasses can hold it between _lookup and
+        # _store.
+        self._lock = threading.RLock()
+        # Incremented by invalidate_sampled
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def invalidate(self, value):
+        """
+        Remove the entries of value.
+
+        This is needed after modifying value in a way that might not change
+        its fingerprint.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == id(value):
+                    del self._entries[key]
+
+    def invalidate_sampled(self):
+        """Remove the entries of values whose fingerprint is sampled."""
+        with self._lock:
+            self._generation += 1
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def _is_sampled(self, value, key):
+        """
+        Check if the fingerprint of value can miss changes of the result
+        cached under key.
+        """
+        return True
+
+    def _is_pinned(self, result):
+        """
+        Check if the entry of result must not be evicted, e.g. because
+        result is still being computed.
+        """
+        return False
+
+    def _lookup(self, key, value, fingerprint):
+        """
+        Get the result cached under key, or `MISSING` if there is no valid
+        one.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return self.MISSING
+            ref, entry_fingerprint, generation, result = entry
+            if (
+                ref() is not value
+                or entry_fingerprint != fingerprint
+                or generation not in (None, self._generation)
+            ):
+                del self._entries[key]
+                return self.MISSING
+            self._entries.move_to_end(key)
+            return result
+
+    def _store(self, key, value, fingerprint, result, generation=None):
+        """
+        Cache result under key.
+
+        generation is the one of the cache when the computation of result
+        started, so that the entry is invalid if `invalidate_sampled` was
+        called during it. If None, the current one is used.
+        """
+        if fingerprint is None:
+            return
+        try:
+            ref = weakref.ref(value)
+        except TypeError:
+            return
+
+        with self._lock:
+            if not self._is_sampled(value, key):
+                generation = None
+            elif generation is None:
+                generation = self._generation
+            self._entries[key] = (ref, fingerprint, generation, result)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def _evict(self):
+        """
+        Remove the least recently used entries while there are more than
+        maxsize, except the pinned ones of values that are alive.
+
+        This must be called with the lock held.
+        """
+        excess = len(self._entries) - self.maxsize
+        if excess <= 0:
+            return
+        for key in list(self._entries):
+            ref, __, __, result = self._entries[key]
+            if ref() is None or not self._is_pinned(result):
+                del self._entries[key]
+                excess -= 1
+                if excess == 0:
+                    break
+
+    def _get(self, key, value, fingerprint, compute):
+        """
+        Get the result cached under key, calling compute to get it if
+        there is no valid one.
+        """
+        with self._lock:
+            result = self._lookup(key, value, fingerprint)
+            if result is not self.MISSING:
+                return result
+            generation = self._generation
+
+        result = compute()
+        self._store(key, value, fingerprint, result, generation)
+        return result
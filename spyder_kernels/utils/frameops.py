@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Sort, filter and group dataframes in the kernel.
+
+They are used by the dataframe editor of the Variable Explorer so that big
+dataframes don't need to be transferred to be sorted or filtered. Sorted and
+filtered views are kept as arrays with the positions of their rows instead
+of copies of the dataframes, and only the windows shown by the editor are
+taken from them.
+"""
+
+import zlib
+
+from spyder_kernels.utils.arraystats import (
+    FINGERPRINT_SAMPLES, array_fingerprint)
+from spyder_kernels.utils.cache import FingerprintCache
+from spyder_kernels.utils.lazymodules import numpy as np
+from spyder_kernels.utils.typeregistry import isinstance_by_name
+
+
+def _check_frame(value):
+    """Raise a TypeError if value is not a dataframe."""
+    if not isinstance_by_name(value, 'pandas.DataFrame'):
+        raise TypeError(
+            "Values of type {} are not dataframes".format(
+                type(value).__name__))
+
+
+def make_sort_keys(sort_by):
+    """
+    Convert a JSON-able description of a sort to a tuple of keys.
+
+    Each item of `sort_by` is either a column name (sorted in ascending
+    order) or a list of the form [column, ascending].
+    """
+    if sort_by is None:
+        return ()
+    if not isinstance(sort_by, (list, tuple)):
+        sort_by = [sort_by]
+
+    keys = []
+    for item in sort_by:
+        if isinstance(item, (list, tuple)):
+            if len(item) != 2:
+                raise ValueError("Invalid sort key: {}".format(item))
+            column, ascending = item
+            keys.append((column, bool(ascending)))
+        else:
+            keys.append((item, True))
+    return tuple(keys)
+
+
+def _positions_dtype(nrows):
+    """Smallest integer type to keep the positions of nrows rows."""
+    if nrows < 2**31:
+        return np.int32
+    return np.int64
+
+
+def filter_positions(frame, filter_expr):
+    """
+    Get the positions of the rows of *frame* that match *filter_expr*.
+
+    `filter_expr` is a boolean expression evaluated with `DataFrame.eval`
+    (e.g. "a > 0 and b == 'x'"). Raise a TypeError if the result is not a
+    boolean per row.
+    """
+    _check_frame(frame)
+    mask = frame.eval(filter_expr)
+    mask = np.asarray(mask)
+    if mask.shape != (len(frame),) or mask.dtype != np.bool_:
+        raise TypeError(
+            "Filter expressions must evaluate to a boolean per row")
+    return np.flatnonzero(mask).astype(_positions_dtype(len(frame)))
+
+
+def sort_positions(frame, sort_by, positions=None):
+    """
+    Get the positions of the rows of *frame* sorted by *sort_by*.
+
+    Parameters
+    ----------
+    frame: pandas.DataFrame
+        The dataframe. It is not modified and only the sorted columns are
+        read.
+    sort_by: list
+        The columns to sort by, as described in `make_sort_keys`.
+    positions: numpy.ndarray or None
+        Positions of the rows to sort (e.g. the ones of a filter), or None
+        for all of them.
+
+    Returns
+    -------
+    An array with positions of rows of frame. The sort is stable and nulls
+    are placed last, like in `DataFrame.sort_values`.
+    """
+    _check_frame(frame)
+    keys = make_sort_keys(sort_by)
+    if not keys:
+        raise ValueError("No columns to sort by")
+    columns = [column for column, __ in keys]
+    missing = [column for column in columns if column not in frame.columns]
+    if missing:
+        raise KeyError("Unknown columns: {}".format(missing))
+
+    # Only the sort columns are taken, with a default index so that the
+    # index of the sorted subset has the positions.
+    subset = frame[columns]
+    if positions is not None:
+        subset = subset.take(positions)
+    subset = subset.reset_index(drop=True)
+    order = subset.sort_values(
+        columns,
+        ascending=[ascending for __, ascending in keys],
+        kind='stable'
+    ).index.to_numpy()
+
+    if positions is not None:
+        order = positions[order]
+    return order.astype(_positions_dtype(len(frame)), copy=False)
+
+
+def _make_group_keys(by, aggregations):
+    """Check the arguments of `group_frame` and return by as a list."""
+    if isinstance(by, (str, int)):
+        by = [by]
+    if not isinstance(aggregations, dict) or not aggregations:
+        raise ValueError("Aggregations must be a non-empty dictionary")
+    for functions in aggregations.values():
+        if isinstance(functions, str):
+            functions = [functions]
+        if not all(isinstance(function, str) for function in functions):
+            raise TypeError("Aggregations must be given by name")
+    return list(by)
+
+
+def group_frame(frame, by, aggregations, positions=None):
+    """
+    Group *frame* by the columns *by* and aggregate them.
+
+    `aggregations` is a dictionary mapping columns to the name of an
+    aggregation (e.g. 'mean') or a list of them, as accepted by
+    `DataFrameGroupBy.agg`. If `positions` is given, only those rows are
+    grouped. Return a dataframe with a row per group.
+    """
+    _check_frame(frame)
+    by = _make_group_keys(by, aggregations)
+
+    columns = by + [c for c in aggregations if c not in by]
+    subset = frame[columns]
+    if positions is not None:
+        subset = subset.take(positions)
+    result = subset.groupby(by, sort=True).agg(aggregations)
+    if result.columns.nlevels > 1:
+        # Columns of several aggregations are a MultiIndex, which is harder
+        # to show in the editor.
+        result.columns = [
+            '_'.join(map(str, column))
+            for column in result.columns.to_flat_index()
+        ]
+    return result
+
+
+def get_frame_window(frame, positions=None, offset=0, limit=None,
+                     columns=None):
+    """
+    Get a window of rows of a sorted or filtered view of *frame*.
+
+    Parameters
+    ----------
+    frame: pandas.DataFrame
+        The dataframe.
+    positions: numpy.ndarray or None
+        The positions of the rows of the view (see `sort_positions` and
+        `filter_positions`), or None for all the rows in order.
+    offset, limit: int
+        First row of the window and maximum number of rows in it (all of
+        them if None).
+    columns: list or None
+        Arguments of a slice of columns (e.g. [start, stop]).
+
+    Returns
+    -------
+    A dictionary with the window in 'block' (a dataframe), the number of
+    rows of the view in 'total' and the offset in 'offset'.
+    """
+    _check_frame(frame)
+    total = len(frame) if positions is None else len(positions)
+    offset = max(0, min(offset, total))
+    stop = total if limit is None else min(total, offset + limit)
+    column_slice = slice(*columns) if columns is not None else slice(None)
+
+    if positions is None:
+        block = frame.iloc[offset:stop, column_slice]
+    else:
+        block = frame.iloc[positions[offset:stop], column_slice]
+    return {'block': block, 'total': total, 'offset': offset}
+
+
+# ---- Cache
+def _sample_indexes(size):
+    """Indexes of a uniform sample of the elements of an axis of size."""
+    return np.linspace(
+        0, max(0, size - 1), min(size, FINGERPRINT_SAMPLES)).astype(np.intp)
+
+
+def _values_fingerprint(values):
+    """
+    Get a fingerprint of the values of a block or column of a dataframe.
+
+    Numeric values are fingerprinted with `array_fingerprint`. For objects
+    (e.g. strings), the identities of a sample of them are used instead, so
+    replacing them is detected but mutating them is not.
+    """
+    if not isinstance(values, np.ndarray):
+        # Extension arrays (e.g. categoricals) would be converted to objects
+        # by to_numpy, so only a sample of values is taken.
+        indexes = _sample_indexes(len(values))
+        sample = repr(list(values[indexes])).encode()
+        return (str(values.dtype), len(values), zlib.crc32(sample))
+
+    if values.dtype.hasobject:
+        indexes = _sample_indexes(values.size)
+        ids = np.fromiter(
+            (id(element) for element in values.flat[indexes]),
+            dtype=np.uint64,
+            count=len(indexes)
+        )
+        return (values.shape, zlib.crc32(ids.tobytes()))
+    return array_fingerprint(values)
+
+
+def _blocks_fingerprint(frame):
+    """
+    Fingerprint the blocks in which pandas stores the columns of frame.
+
+    This uses private pandas internals, so it raises AttributeError or
+    TypeError if they are not the expected ones.
+    """
+    return tuple(
+        (
+            zlib.crc32(np.asarray(block.mgr_locs.as_array).tobytes()),
+            _values_fingerprint(block.values)
+        )
+        for block in frame._mgr.blocks
+    )
+
+
+def _columns_fingerprint(frame):
+    """Fingerprint the columns of frame one by one."""
+    data = []
+    for position in range(frame.shape[1]):
+        column = frame.iloc[:, position]
+        if isinstance(column.dtype, np.dtype):
+            data.append(_values_fingerprint(column.to_numpy()))
+        else:
+            data.append(_values_fingerprint(column.array))
+    return tuple(data)
+
+
+def frame_fingerprint(frame):
+    """
+    Get a fingerprint of frame that changes when its data does.
+
+    The blocks in which pandas stores the columns of frame are fingerprinted
+    with `_values_fingerprint`, so the cost doesn't grow with the number of
+    columns of the same type. Columns are fingerprinted one by one with
+    versions of pandas whose internals are different.
+    """
+    try:
+        data = _blocks_fingerprint(frame)
+    except (AttributeError, TypeError):
+        data = _columns_fingerprint(frame)
+    return (type(frame), frame.shape, tuple(map(str, frame.columns)), data)
+
+
+class FrameViewCache(FingerprintCache):
+    """
+    LRU cache of sorted, filtered and grouped views of dataframes.
+
+    Entries are keyed by the identity of the dataframes and the operations,
+    and are only valid while the dataframes are alive and their fingerprint
+    (see `frame_fingerprint`) doesn't change. Sorted and filtered views are
+    arrays of row positions, so entries of big dataframes are much smaller
+    than the dataframes.
+
+    Fingerprints only look at a sample of the rows of big dataframes, so all
+    entries are sampled.
+    """
+
+    def __init__(self, maxsize=20):
+        super().__init__(maxsize)
+
+    def get_positions(self, frame, sort_by=None, filter_expr=None):
+        """
+        Get the positions of the rows of a view of frame.
+
+        Return None if there is nothing to sort or filter, i.e. if the view
+        has all the rows of frame in order.
+        """
+        _check_frame(frame)
+        keys = make_sort_keys(sort_by)
+        if not keys and not filter_expr:
+            return None
+        fingerprint = frame_fingerprint(frame)
+        return self._get_positions(frame, fingerprint, keys, filter_expr)
+
+    def _get_positions(self, frame, fingerprint, keys, filter_expr):
+        if not keys:
+            return self._get(
+                (id(frame), 'filter', filter_expr),
+                frame,
+                fingerprint,
+                lambda: filter_positions(frame, filter_expr)
+            )
+
+        # Sorts of filtered views reuse the positions of the filter
+        if filter_expr:
+            positions = self._get_positions(
+                frame, fingerprint, (), filter_expr)
+        else:
+            positions = None
+        return self._get(
+            (id(frame), 'sort', keys, filter_expr),
+            frame,
+            fingerprint,
+            lambda: sort_positions(frame, keys, positions)
+        )
+
+    def get_groups(self, frame, by, aggregations, filter_expr=None):
+        """Get frame grouped and aggregated (see `group_frame`)."""
+        _check_frame(frame)
+        by = _make_group_keys(by, aggregations)
+        fingerprint = frame_fingerprint(frame)
+        key = (
+            id(frame),
+            'group',
+            tuple(by),
+            tuple(
+                (column, functions if isinstance(functions, str)
+                 else tuple(functions))
+                for column, functions in aggregations.items()
+            ),
+            filter_expr
+        )
+
+        def compute():
+            positions = None
+            if filter_expr:
+                positions = self._get_positions(
+                    frame, fingerprint, (), filter_expr)
+            return group_frame(frame, by, aggregations, positions)
+
+        return self._get(key, frame, fingerprint, compute)
+
+
+FRAME_VIEW_CACHE = FrameViewCache()
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+History of the values of scalar variables.
+
+It's recorded while making the namespace view after each execution, so that
+the evolution of scalars in iterative work can be shown without keeping the
+values around. Values are kept as floats in fixed-size ring buffers backed
+by arrays of the standard library, so Numpy is not needed.
+"""
+
+from array import array
+from collections import OrderedDict
+import math
+import threading
+
+from spyder_kernels.utils.typeregistry import isinstance_by_name
+
+
+# Maximum number of values kept per variable
+HISTORY_LENGTH = 1000
+
+# Maximum number of variables with a history. The ones that changed least
+# recently are forgotten first.
+HISTORY_MAX_NAMES = 1000
+
+
+def scalar_value(value):
+    """
+    Get the value of scalar *value* as a float.
+
+    Scalars are ints, floats, bools and their Numpy equivalents, including
+    arrays with zero dimensions. Return None for other values or if the
+    value doesn't fit in a float.
+    """
+    if type(value) in (int, float, bool):
+        pass
+    elif isinstance_by_name(value, ('numpy.integer', 'numpy.floating',
+                                    'numpy.bool_')):
+        pass
+    elif (
+        isinstance_by_name(value, 'numpy.ndarray')
+        and value.ndim == 0
+        and value.dtype.kind in 'biuf'
+    ):
+        value = value[()]
+    else:
+        return None
+
+    try:
+        return float(value)
+    except (OverflowError, TypeError, ValueError):
+        return None
+
+
+class RingBuffer:
+    """
+    Values with the execution count at which they were recorded.
+
+    It grows up to `size` values, and then each new value replaces the
+    oldest one.
+    """
+
+    def __init__(self, size=HISTORY_LENGTH):
+        self.size = size
+        self._counts = array('q')
+        self._values = array('d')
+        # Position of the oldest value once the buffer is full
+        self._start = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def append(self, execution_count, value):
+        """Add a value."""
+        if len(self._values) < self.size:
+            self._counts.append(execution_count)
+            self._values.append(value)
+        else:
+            self._counts[self._start] = execution_count
+            self._values[self._start] = value
+            self._start = (self._start + 1) % self.size
+
+    def last(self):
+        """Get the last value, or None if there is none."""
+        if not self._values:
+            return None
+        return self._values[self._start - 1]
+
+    def to_lists(self):
+        """Get the execution counts and values, from oldest to newest."""
+        start = self._start
+        return (
+            self._counts[start:].tolist() + self._counts[:start].tolist(),
+            self._values[start:].tolist() + self._values[:start].tolist()
+        )
+
+
+class VariableHistory:
+    """
+    History of the values of the scalar variables of a namespace.
+
+    Values are only recorded when they change, with the value of
+    `execution_count` at that time. Nothing is recorded while it's None
+    (e.g. after silent executions, which don't have a count).
+    """
+
+    def __init__(self, length=HISTORY_LENGTH, max_names=HISTORY_MAX_NAMES):
+        self.length = length
+        self.max_names = max_names
+        self.execution_count = 0
+        self._buffers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def record(self, name, value):
+        """Record the value of variable `name`, if it's a scalar."""
+        if self.execution_count is None:
+            return
+        value = scalar_value(value)
+        if value is None:
+            return
+
+        with self._lock:
+            buffer = self._buffers.get(name)
+            if buffer is None:
+                buffer = self._buffers[name] = RingBuffer(self.length)
+            else:
+                last = buffer.last()
+                if last == value or (math.isnan(last) and math.isnan(value)):
+                    return
+            buffer.append(self.execution_count, value)
+            self._buffers.move_to_end(name)
+            while len(self._buffers) > self.max_names:
+                self._buffers.popitem(last=False)
+
+    def get(self, name):
+        """
+        Get the history of variable `name`.
+
+        Returns a dictionary with the lists 'execution_counts' and 'values',
+        from oldest to newest. They are empty if `name` has no history.
+        """
+        with self._lock:
+            buffer = self._buffers.get(name)
+            if buffer is None:
+                counts, values = [], []
+            else:
+                counts, values = buffer.to_lists()
+        return {'execution_counts': counts, 'values': values}
+
+    def clear(self):
+        """Forget the history of all variables."""
+        with self._lock:
+            self._buffers.clear()
@@ -12,9 +12,23 @@ Lazy modules.
 They are useful to not import big modules until it's really necessary.
 """
 
+import importlib.util
+
 from spyder_kernels.utils.misc import is_module_installed
 
 
+# =============================================================================
+# Auxiliary functions
+# =============================================================================
+def _find_spec(modname):
+    """Find the spec of a module without importing it, or return None."""
+    try:
+        return importlib.util.find_spec(modname)
+    except (ImportError, ValueError):
+        # Raised when a parent package is missing or broken
+        return None
+
+
 # =============================================================================
 # Auxiliary classes
 # =============================================================================
@@ -40,6 +54,7 @@ class LazyModule:
         """
         self.__spy_modname__ = modname
         self.__spy_mod__ = FakeObject
+        self.__spy_resolved__ = False
 
         # Set required second level attributes
         if second_level_attrs is not None:
@@ -47,9 +62,18 @@ class LazyModule:
                 setattr(self.__spy_mod__, attr, FakeObject)
 
     def __getattr__(self, name):
-        if is_module_installed(self.__spy_modname__):
+        # The module is imported on first access. Missing modules, and the
+        # ones that failed to be imported, are looked up again on later
+        # accesses, which is cheap, in case they are installed afterwards.
+        if (
+            not self.__spy_resolved__
+            and _find_spec(self.__spy_modname__) is not None
+            and is_module_installed(self.__spy_modname__)
+        ):
             self.__spy_mod__ = __import__(self.__spy_modname__)
-        else:
+            self.__spy_resolved__ = True
+
+        if self.__spy_mod__ is FakeObject:
             return self.__spy_mod__
 
         return getattr(self.__spy_mod__, name)
@@ -9,12 +9,28 @@
 """
 Utilities to build a namespace view.
 """
+import ast
 from itertools import islice
 import inspect
+import math
+import os.path as osp
 import re
-
-from spyder_kernels.utils.lazymodules import (
-    bs4, FakeObject, numpy as np, pandas as pd, PIL)
+import sys
+import sysconfig
+import threading
+import time
+import types
+import weakref
+import zlib
+
+from spyder_kernels.utils.arraystats import (
+    array_fingerprint, ARRAY_STATS, ARRAY_STATS_TIME_BUDGET,
+    is_fingerprint_sampled)
+from spyder_kernels.utils.cache import FingerprintCache
+from spyder_kernels.utils.frameops import frame_fingerprint
+from spyder_kernels.utils.lazymodules import numpy as np
+from spyder_kernels.utils.typeregistry import (
+    isinstance_by_name, resolve_type, TypeRegistry)
 
 
 #==============================================================================
@@ -33,8 +49,8 @@ def get_numpy_dtype(obj):
     Return None if Numpy is not available, if we get errors or if `obj` is not
     a Numpy array or scalar.
     """
-    # Check if NumPy is available
-    if np.ndarray is not FakeObject:
+    # Numpy objects can only exist if Numpy was imported
+    if 'numpy' in sys.modules:
         # All Numpy scalars inherit from np.generic and all Numpy arrays
         # inherit from np.ndarray. If we check that we are certain we have one
         # of these types then we are less likely to generate an exception
@@ -87,7 +103,10 @@ def try_to_eval(value):
 def get_size(item):
     """Return shape/size/len of an item of arbitrary type"""
     try:
-        if (
+        handler = TYPE_HANDLERS.lookup(type(item), 'size')
+        if handler is not None:
+            return handler(item)
+        elif (
             hasattr(item, 'size') and hasattr(item.size, 'compute') or
             hasattr(item, 'shape') and hasattr(item.shape, 'compute')
         ):
@@ -98,7 +117,8 @@ def get_size(item):
             return 1
         elif (
             hasattr(item, 'shape') and
-            isinstance(item.shape, (tuple, np.integer))
+            (isinstance(item.shape, tuple) or
+             isinstance_by_name(item.shape, 'numpy.integer'))
         ):
             try:
                 if item.shape:
@@ -117,7 +137,8 @@ def get_size(item):
                 # Fixes spyder-ide/spyder-kernels#217
                 return (-1, -1)
         elif (hasattr(item, 'size') and
-                isinstance(item.size, (tuple, np.integer))):
+                (isinstance(item.size, tuple) or
+                 isinstance_by_name(item.size, 'numpy.integer'))):
             try:
                 return item.size
             except RecursionError:
@@ -131,6 +152,73 @@ def get_size(item):
         return 1
 
 
+# Maximum number of objects visited to estimate the memory of a value
+MEMORY_NODE_BUDGET = 10000
+
+# Maximum time (in seconds) spent estimating the memory of a value
+MEMORY_TIME_BUDGET = 0.01
+
+
+def get_memory_size(value, node_budget=MEMORY_NODE_BUDGET,
+                    time_budget=MEMORY_TIME_BUDGET):
+    """
+    Estimate the memory used by *value* in bytes.
+
+    Arrays, dataframes and other types with a 'memory' type handler (see
+    `register_type_handler`) report their own size. For other objects,
+    `sys.getsizeof` of the object and everything it contains (items of
+    containers and attributes of instances) is added, counting objects
+    reachable in several ways only once. The walk stops after visiting
+    `node_budget` objects or after `time_budget` seconds, so the result is
+    a lower bound for big object graphs.
+    """
+    start = time.perf_counter()
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack and len(seen) < node_budget:
+        if (
+            time_budget is not None
+            and time.perf_counter() - start > time_budget
+        ):
+            break
+
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        # The try/except is necessary because objects can fail in any way.
+        try:
+            handler = TYPE_HANDLERS.lookup(type(obj), 'memory')
+            if handler is not None:
+                total += int(handler(obj))
+                continue
+
+            total += sys.getsizeof(obj, 0)
+            remaining = node_budget - len(seen)
+            if type(obj) in (str, bytes, int, float, complex, bool):
+                pass
+            elif isinstance(obj, dict):
+                stack.extend(islice(obj.keys(), remaining))
+                stack.extend(islice(obj.values(), remaining))
+            elif isinstance(obj, (list, tuple, set, frozenset)):
+                stack.extend(islice(obj, remaining))
+            elif not (
+                inspect.isclass(obj)
+                or inspect.ismodule(obj)
+                or inspect.isroutine(obj)
+            ):
+                # Classes, modules and functions are shared by many objects,
+                # so they are not counted as part of them.
+                attrs = getattr(obj, '__dict__', None)
+                if isinstance(attrs, dict):
+                    stack.append(attrs)
+        except Exception:
+            pass
+    return total
+
+
 def get_object_attrs(obj):
     """
     Get the attributes of an object using dir.
@@ -199,6 +287,10 @@ def is_editable_type(value):
     Return True if data type is editable with a standard GUI-based editor,
     like CollectionsEditor, ArrayEditor, QDateEdit or a simple QLineEdit.
     """
+    handler = TYPE_HANDLERS.lookup(type(value), 'editable')
+    if handler is not None:
+        return handler(value)
+
     if not is_known_type(value):
         return False
     else:
@@ -209,8 +301,7 @@ def is_editable_type(value):
             'datetime.timedelta'
         ]
 
-        if (get_type_string(value) not in supported_types and
-                not isinstance(value, pd.Index)):
+        if get_type_string(value) not in supported_types:
             np_dtype = get_numpy_dtype(value)
             if np_dtype is None or not hasattr(value, 'size'):
                 return False
@@ -317,101 +408,33 @@ def collections_display(value, level):
     return display
 
 
-def value_to_display(value, minmax=False, level=0):
-    """Convert value for display purpose"""
+def value_to_display(value, minmax=False, level=0, minmax_time_budget=None):
+    """
+    Convert value for display purpose
+
+    `minmax_time_budget` is the maximum time (in seconds) to spend computing
+    the min and max of big arrays when `minmax` is True. If it's exhausted,
+    approximate values are shown, prefixed by '~'.
+    """
     # To save current Numpy printoptions
-    np_printoptions = FakeObject
-    numeric_numpy_types = get_numeric_numpy_types()
+    np_printoptions = None
 
     try:
-        if np.ndarray is not FakeObject:
+        # Numpy is not imported here if the user hasn't done it
+        if 'numpy' in sys.modules:
             # Save printoptions
             np_printoptions = np.get_printoptions()
             # Set max number of elements to show for Numpy arrays
             # in our display
             np.set_printoptions(threshold=10)
-        if isinstance(value, np.recarray):
-            if level == 0:
-                fields = value.names
-                display = 'Field names: ' + ', '.join(fields)
-            else:
-                display = 'Recarray'
-        elif isinstance(value, np.ma.MaskedArray):
-            display = 'Masked array'
-        elif isinstance(value, np.ndarray):
-            if level == 0:
-                if minmax:
-                    try:
-                        display = 'Min: %r\nMax: %r' % (value.min(), value.max())
-                    except (TypeError, ValueError):
-                        if value.dtype.type in numeric_numpy_types:
-                            display = str(value)
-                        else:
-                            display = default_display(value)
-                elif value.dtype.type in numeric_numpy_types:
-                    display = str(value)
-                else:
-                    display = default_display(value)
-            else:
-                display = 'Numpy array'
-        elif any([type(value) == t for t in [list, set, tuple, dict]]):
-            display = collections_display(value, level+1)
-        elif isinstance(value, PIL.Image.Image):
-            if level == 0:
-                display = '%s  Mode: %s' % (address(value), value.mode)
-            else:
-                display = 'Image'
-        elif isinstance(value, pd.DataFrame):
-            if level == 0:
-                cols = value.columns
-                cols = [str(c) for c in cols]
-                display = 'Column names: ' + ', '.join(list(cols))
-            else:
-                display = 'Dataframe'
-        elif isinstance(value, bs4.element.NavigableString):
-            # Fixes Issue 2448
-            display = str(value)
-            if level > 0:
-                display = "'" + display + "'"
-        elif isinstance(value, pd.Index):
-            if level == 0:
-                try:
-                    display = value._summary()
-                except AttributeError:
-                    display = value.summary()
-            else:
-                display = 'Index'
-        elif isinstance(value, bytes):
-            # We don't apply this to classes that extend string types
-            # See issue 5636
-            if type(value) in [str, bytes]:
-                try:
-                    display = str(value, 'utf8')
-                    if level > 0:
-                        display = "'" + display + "'"
-                except:
-                    display = value
-                    if level > 0:
-                        display = b"'" + display + b"'"
-            else:
-                display = default_display(value)
-        elif isinstance(value, str):
-            # We don't apply this to classes that extend string types
-            # See issue 5636
-            if type(value) in [str, bytes]:
-                display = value
-                if level > 0:
-                    display = "'" + display + "'"
-            else:
-                display = default_display(value)
-
-        elif (isinstance(value, datetime.date) or
-              isinstance(value, datetime.timedelta)):
-            display = str(value)
-        elif (isinstance(value, (int, float, complex)) or
-              isinstance(value, bool) or
-              isinstance(value, numeric_numpy_types)):
-            display = repr(value)
+        handler = TYPE_HANDLERS.lookup(type(value), 'display')
+        if handler is not None:
+            display = handler(
+                value,
+                level,
+                minmax=minmax,
+                minmax_time_budget=minmax_time_budget
+            )
         else:
             if level == 0:
                 display = default_display(value)
@@ -430,7 +453,7 @@ def value_to_display(value, minmax=False, level=0):
         display = display[:70].rstrip() + ellipses
 
     # Restore Numpy printoptions
-    if np_printoptions is not FakeObject:
+    if np_printoptions is not None:
         np.set_printoptions(**np_printoptions)
 
     return display
@@ -492,21 +515,9 @@ def get_type_string(item):
     """Return type string of an object."""
     # The try/except is necessary to fix spyder-ide/spyder#19516.
     try:
-        # Numpy objects (don't change the order!)
-        if isinstance(item, np.ma.MaskedArray):
-            return "MaskedArray"
-        if isinstance(item, np.matrix):
-            return "Matrix"
-        if isinstance(item, np.ndarray):
-            return "NDArray"
-
-        # Pandas objects
-        if isinstance(item, pd.DataFrame):
-            return "DataFrame"
-        if isinstance(item, pd.Index):
-            return type(item).__name__
-        if isinstance(item, pd.Series):
-            return "Series"
+        handler = TYPE_HANDLERS.lookup(type(item), 'type_string')
+        if handler is not None:
+            return handler(item)
     except Exception:
         pass
 
@@ -523,7 +534,7 @@ def get_type_string(item):
 def is_known_type(item):
     """Return True if object has a known type"""
     # Unfortunately, the masked array case is specific
-    return (isinstance(item, np.ma.MaskedArray) or
+    return (isinstance_by_name(item, 'numpy.ma.MaskedArray') or
             get_type_string(item) != 'Unknown')
 
 
@@ -531,10 +542,9 @@ def get_human_readable_type(item):
     """Return human-readable type string of an item"""
     # The try/except is necessary to fix spyder-ide/spyder#19516.
     try:
-        if isinstance(item, (np.ndarray, np.ma.MaskedArray)):
-            return u'Array of ' + item.dtype.name
-        elif isinstance(item, PIL.Image.Image):
-            return "Image"
+        handler = TYPE_HANDLERS.lookup(type(item), 'readable_type')
+        if handler is not None:
+            return handler(item)
         else:
             text = get_type_string(item)
             return text[text.find('.')+1:]
@@ -542,6 +552,515 @@ def get_human_readable_type(item):
         return 'Unknown'
 
 
+#==============================================================================
+# Type handlers
+#==============================================================================
+TYPE_HANDLERS = TypeRegistry()
+
+
+def register_type_handler(cls, display=None, type_string=None,
+                          readable_type=None, size=None, editable=None,
+                          memory=None, subclasses=True):
+    """
+    Register functions to build the namespace view of values of type `cls`.
+
+    Handlers are found by walking the MRO of the type of each value, so a
+    handler registered for a class is also used for its subclasses, unless
+    `subclasses` is False. Handlers left as None are not registered, so
+    the ones of base classes or the default behavior are used instead.
+
+    Parameters
+    ----------
+    cls: type or str
+        The type or its import path (e.g. 'polars.DataFrame'). Using a path
+        avoids importing the type's module, which is only resolved after
+        it's been imported by someone else.
+    display: callable
+        Function with signature ``display(value, level, **options)`` that
+        returns the display of value (see `value_to_display`). `options`
+        contains `minmax` and `minmax_time_budget`.
+    type_string: callable
+        Function that returns the type string of value (see
+        `get_type_string`).
+    readable_type: callable
+        Function that returns the human readable type of value (see
+        `get_human_readable_type`).
+    size: callable
+        Function that returns the size of value (see `get_size`).
+    editable: callable
+        Function that returns whether value is editable (see
+        `is_editable_type`).
+    memory: callable
+        Function that returns the memory used by value in bytes (see
+        `get_memory_size`).
+    subclasses: bool
+        Whether the handlers also apply to subclasses of `cls`.
+    """
+    handlers = dict(
+        display=display,
+        type_string=type_string,
+        readable_type=readable_type,
+        size=size,
+        editable=editable,
+        memory=memory,
+    )
+    handlers = {
+        aspect: handler for aspect, handler in handlers.items()
+        if handler is not None
+    }
+    TYPE_HANDLERS.register(cls, handlers, subclasses=subclasses)
+
+
+# ---- Numpy
+def _display_recarray(value, level, **options):
+    if level == 0:
+        fields = value.names
+        return 'Field names: ' + ', '.join(fields)
+    return 'Recarray'
+
+
+def _display_ndarray(value, level, minmax=False, minmax_time_budget=None,
+                     **options):
+    if level > 0:
+        return 'Numpy array'
+
+    numeric_numpy_types = get_numeric_numpy_types()
+    if minmax:
+        try:
+            stats = ARRAY_STATS.get_stats(
+                value, time_budget=minmax_time_budget)
+            if stats['exact']:
+                return 'Min: %r\nMax: %r' % (stats['min'], stats['max'])
+            return 'Min: ~%r\nMax: ~%r' % (stats['min'], stats['max'])
+        except (TypeError, ValueError):
+            pass
+    if value.dtype.type in numeric_numpy_types:
+        return str(value)
+    return default_display(value)
+
+
+def _readable_type_array(value):
+    return 'Array of ' + value.dtype.name
+
+
+def _memory_array(value):
+    if value.dtype.hasobject:
+        # Only the first objects are counted to keep this bounded
+        objects = list(value.flat[:MEMORY_NODE_BUDGET])
+        return value.nbytes + get_memory_size(objects)
+    return value.nbytes
+
+
+register_type_handler(
+    'numpy.ndarray',
+    display=_display_ndarray,
+    type_string=lambda value: "NDArray",
+    readable_type=_readable_type_array,
+    memory=_memory_array
+)
+register_type_handler(
+    'numpy.recarray',
+    display=_display_recarray
+)
+register_type_handler(
+    'numpy.matrix',
+    type_string=lambda value: "Matrix"
+)
+register_type_handler(
+    'numpy.ma.MaskedArray',
+    display=lambda value, level, **options: 'Masked array',
+    type_string=lambda value: "MaskedArray"
+)
+for _name in ('int64', 'int32', 'int16', 'int8', 'uint64', 'uint32',
+              'uint16', 'uint8', 'float64', 'float32', 'float16',
+              'complex64', 'complex128', 'bool_'):
+    register_type_handler(
+        'numpy.' + _name,
+        display=lambda value, level, **options: repr(value)
+    )
+
+
+# ---- Pandas
+def _display_dataframe(value, level, **options):
+    if level == 0:
+        cols = value.columns
+        cols = [str(c) for c in cols]
+        return 'Column names: ' + ', '.join(list(cols))
+    return 'Dataframe'
+
+
+def _display_index(value, level, **options):
+    if level == 0:
+        try:
+            return value._summary()
+        except AttributeError:
+            return value.summary()
+    return 'Index'
+
+
+def _sum_memory(memory):
+    if hasattr(memory, 'sum'):
+        # Dataframes return the memory of each column
+        memory = memory.sum()
+    return int(memory)
+
+
+def _estimate_memory_pandas(value):
+    """
+    Estimate the memory used by a dataframe, series or index.
+
+    The Python objects it contains (e.g. strings) are only all counted if
+    there are at most `MEMORY_NODE_BUDGET` of them. Otherwise, the memory
+    of the objects of a uniform sample of rows is scaled to all of them.
+    """
+    nrows = len(value)
+    ncols = value.shape[1] if value.ndim > 1 else 1
+    if nrows * ncols <= MEMORY_NODE_BUDGET:
+        return _sum_memory(value.memory_usage(deep=True))
+
+    nsamples = max(1, MEMORY_NODE_BUDGET // ncols)
+    indexes = np.linspace(0, nrows - 1, nsamples).astype(np.intp)
+    if isinstance_by_name(value, 'pandas.Index'):
+        sample = value[indexes]
+    else:
+        sample = value.iloc[indexes]
+    objects = (
+        _sum_memory(sample.memory_usage(deep=True)) -
+        _sum_memory(sample.memory_usage(deep=False))
+    )
+    return (
+        _sum_memory(value.memory_usage(deep=False)) +
+        objects * nrows // nsamples
+    )
+
+
+class PandasMemoryCache(FingerprintCache):
+    """
+    LRU cache of the memory used by dataframes, series and indexes.
+
+    Entries are keyed by the identity of the values and are only valid while
+    the values are alive and the fingerprint of their data (see
+    `frame_fingerprint`) and index doesn't change.
+
+    Entries are not sampled because the memory only depends on the shape
+    and types of the data, except for the objects it contains, which are
+    estimated from a sample anyway.
+    """
+
+    def __init__(self, maxsize=100):
+        super().__init__(maxsize)
+
+    def get_memory(self, value):
+        """Get the memory used by value in bytes."""
+        if isinstance_by_name(value, 'pandas.Index'):
+            # Indexes are immutable
+            fingerprint = (type(value), len(value))
+        else:
+            frame = value if value.ndim > 1 else value.to_frame()
+            fingerprint = (frame_fingerprint(frame), id(value.index))
+        return self._get(
+            (id(value),), value, fingerprint,
+            lambda: _estimate_memory_pandas(value))
+
+    def _is_sampled(self, value, key):
+        return False
+
+
+PANDAS_MEMORY_CACHE = PandasMemoryCache()
+
+
+def _memory_pandas(value):
+    return PANDAS_MEMORY_CACHE.get_memory(value)
+
+
+register_type_handler(
+    'pandas.DataFrame',
+    display=_display_dataframe,
+    type_string=lambda value: "DataFrame",
+    memory=_memory_pandas
+)
+register_type_handler(
+    'pandas.Index',
+    display=_display_index,
+    type_string=lambda value: type(value).__name__,
+    editable=lambda value: True,
+    memory=_memory_pandas
+)
+register_type_handler(
+    'pandas.Series',
+    type_string=lambda value: "Series",
+    memory=_memory_pandas
+)
+
+
+# ---- PIL
+def _display_image(value, level, **options):
+    if level == 0:
+        return '%s  Mode: %s' % (address(value), value.mode)
+    return 'Image'
+
+
+def _memory_image(value):
+    # Approximation that doesn't require loading lazy images
+    width, height = value.size
+    return width * height * len(value.getbands())
+
+
+register_type_handler(
+    'PIL.Image.Image',
+    display=_display_image,
+    readable_type=lambda value: "Image",
+    memory=_memory_image
+)
+
+
+# ---- BeautifulSoup
+def _display_navigable_string(value, level, **options):
+    # Fixes Issue 2448
+    display = str(value)
+    if level > 0:
+        display = "'" + display + "'"
+    return display
+
+
+register_type_handler(
+    'bs4.element.NavigableString',
+    display=_display_navigable_string
+)
+
+
+# ---- Builtins
+def _display_bytes(value, level, **options):
+    # We don't apply this to classes that extend string types
+    # See issue 5636
+    if type(value) in [str, bytes]:
+        try:
+            display = str(value, 'utf8')
+            if level > 0:
+                display = "'" + display + "'"
+        except:
+            display = value
+            if level > 0:
+                display = b"'" + display + b"'"
+        return display
+    return default_display(value)
+
+
+def _display_str(value, level, **options):
+    # We don't apply this to classes that extend string types
+    # See issue 5636
+    if type(value) in [str, bytes]:
+        display = value
+        if level > 0:
+            display = "'" + display + "'"
+        return display
+    return default_display(value)
+
+
+for _cls in (list, set, tuple, dict):
+    # Subclasses use the default display
+    register_type_handler(
+        _cls,
+        display=lambda value, level, **options: collections_display(
+            value, level + 1),
+        subclasses=False
+    )
+register_type_handler(bytes, display=_display_bytes)
+register_type_handler(str, display=_display_str)
+for _cls in (datetime.date, datetime.timedelta):
+    register_type_handler(
+        _cls,
+        display=lambda value, level, **options: str(value)
+    )
+for _cls in (int, float, complex):
+    register_type_handler(
+        _cls,
+        display=lambda value, level, **options: repr(value)
+    )
+
+
+# ---- Other libraries
+def _display_tensor(value, level, **options):
+    if level == 0:
+        return 'Shape: %s  Device: %s' % (tuple(value.shape), value.device)
+    return 'Tensor'
+
+
+def _display_sparse(value, level, **options):
+    if level == 0:
+        return 'Format: %s  Stored elements: %s' % (value.format, value.nnz)
+    return 'Sparse matrix'
+
+
+def _display_polars_frame(value, level, **options):
+    if level == 0:
+        return 'Column names: ' + ', '.join(value.columns)
+    return 'Dataframe'
+
+
+register_type_handler(
+    'torch.Tensor',
+    display=_display_tensor,
+    readable_type=lambda value: 'Tensor of ' + str(value.dtype).replace(
+        'torch.', ''),
+    memory=lambda value: value.element_size() * value.nelement()
+)
+for _name in ('scipy.sparse.spmatrix', 'scipy.sparse.sparray'):
+    register_type_handler(
+        _name,
+        display=_display_sparse,
+        readable_type=lambda value: 'Sparse matrix of ' + value.dtype.name
+    )
+register_type_handler(
+    'polars.DataFrame',
+    display=_display_polars_frame,
+    readable_type=lambda value: 'DataFrame (Polars)',
+    memory=lambda value: value.estimated_size()
+)
+register_type_handler(
+    'polars.Series',
+    readable_type=lambda value: 'Series (Polars)',
+    memory=lambda value: value.estimated_size()
+)
+
+
+# ---- Lazy and out-of-core objects
+# Their handlers only use metadata, so they never compute or load anything.
+# Their memory is the one their data would use once computed, when it's
+# known from their metadata, and zero otherwise.
+def _lazy_shape(shape):
+    """Replace the unknown dimensions of shape (nan in Dask) by -1."""
+    return tuple(-1 if math.isnan(dim) else int(dim) for dim in shape)
+
+
+def _display_lazy_shape(shape):
+    """Display shape with its unknown dimensions as '?'."""
+    dims = ['?' if math.isnan(dim) else str(int(dim)) for dim in shape]
+    if len(dims) == 1:
+        return '(%s,)' % dims[0]
+    return '(%s)' % ', '.join(dims)
+
+
+def _lazy_nbytes(value):
+    if any(math.isnan(dim) for dim in value.shape):
+        return 0
+    return value.nbytes
+
+
+def _display_dask_array(value, level, **options):
+    if level == 0:
+        return 'Shape: %s  Chunk size: %s  Blocks: %d' % (
+            _display_lazy_shape(value.shape),
+            _display_lazy_shape(value.chunksize),
+            value.npartitions
+        )
+    return 'Dask array'
+
+
+def _display_dask_frame(value, level, **options):
+    if level == 0:
+        columns = ', '.join(str(c) for c in value.columns)
+        return 'Column names: %s  Partitions: %d' % (
+            columns, value.npartitions)
+    return 'Dataframe'
+
+
+def _display_dask_series(value, level, **options):
+    if level == 0:
+        return 'Type: %s  Partitions: %d' % (value.dtype, value.npartitions)
+    return 'Series'
+
+
+def _display_xarray_sizes(value):
+    return ', '.join(
+        '%s: %d' % (dim, size) for dim, size in value.sizes.items())
+
+
+def _display_data_array(value, level, **options):
+    if value.chunks is None:
+        # Not backed by Dask
+        return default_display(value, with_module=level == 0)
+    if level == 0:
+        return 'Dimensions: %s  Chunk size: %s' % (
+            _display_xarray_sizes(value),
+            tuple(max(chunks) for chunks in value.chunks)
+        )
+    return 'DataArray'
+
+
+def _display_dataset(value, level, **options):
+    if all(var.chunks is None for var in value.data_vars.values()):
+        # Not backed by Dask
+        return default_display(value, with_module=level == 0)
+    if level == 0:
+        return 'Data variables: %s  Dimensions: %s' % (
+            ', '.join(str(name) for name in value.data_vars),
+            _display_xarray_sizes(value)
+        )
+    return 'Dataset'
+
+
+def _polars_lazy_columns(value):
+    if hasattr(value, 'collect_schema'):
+        # Accessing the schema directly is deprecated in Polars 1.0
+        return value.collect_schema().names()
+    return list(value.schema)
+
+
+def _display_polars_lazy_frame(value, level, **options):
+    if level == 0:
+        return 'Column names: ' + ', '.join(_polars_lazy_columns(value))
+    return 'LazyFrame'
+
+
+register_type_handler(
+    'dask.array.Array',
+    display=_display_dask_array,
+    readable_type=lambda value: 'Dask array of ' + value.dtype.name,
+    size=lambda value: _lazy_shape(value.shape),
+    memory=_lazy_nbytes
+)
+register_type_handler(
+    'dask.dataframe.DataFrame',
+    display=_display_dask_frame,
+    readable_type=lambda value: 'DataFrame (Dask)',
+    size=lambda value: (-1, len(value.columns)),
+    memory=lambda value: 0
+)
+register_type_handler(
+    'dask.dataframe.Series',
+    display=_display_dask_series,
+    readable_type=lambda value: 'Series (Dask)',
+    size=lambda value: (-1,),
+    memory=lambda value: 0
+)
+register_type_handler(
+    'dask.delayed.Delayed',
+    display=lambda value, level, **options: 'Delayed: %s' % (value.key,),
+    readable_type=lambda value: 'Delayed',
+    size=lambda value: 1,
+    memory=lambda value: 0
+)
+register_type_handler(
+    'xarray.DataArray',
+    display=_display_data_array,
+    readable_type=lambda value: 'DataArray of ' + value.dtype.name,
+    memory=lambda value: value.nbytes
+)
+register_type_handler(
+    'xarray.Dataset',
+    display=_display_dataset,
+    memory=lambda value: value.nbytes
+)
+register_type_handler(
+    'polars.LazyFrame',
+    display=_display_polars_lazy_frame,
+    readable_type=lambda value: 'LazyFrame (Polars)',
+    size=lambda value: (-1, len(_polars_lazy_columns(value))),
+    memory=lambda value: 0
+)
+
+
 #==============================================================================
 # Globals filter: filter namespace dictionaries (to be edited in
 # CollectionsEditor)
@@ -612,9 +1131,155 @@ def globalsfilter(input_dict, check_all=False, filters=None,
     return output_dict
 
 
+#==============================================================================
+# Cache of view rows
+#==============================================================================
+def _displayed_elements_crc(value):
+    """
+    Get a checksum of the elements of array *value* shown by its display.
+
+    Numpy only prints the first and last `edgeitems` of each axis of arrays
+    with more than `threshold` elements, and all the elements of the others.
+    """
+    options = np.get_printoptions()
+    if value.size <= options['threshold']:
+        shown = value
+    else:
+        edge = options['edgeitems']
+        shown = value[np.ix_(*[
+            np.unique(np.r_[0:min(edge, n), max(0, n - edge):n])
+            for n in value.shape
+        ])]
+    return zlib.crc32(np.ascontiguousarray(shown).tobytes())
+
+
+def get_fingerprint(value):
+    """
+    Get a cheap fingerprint of *value* that changes when its view row does.
+
+    Return None if a fingerprint can't be computed for this kind of value,
+    which means its view row shouldn't be cached.
+    """
+    try:
+        if isinstance_by_name(value, 'numpy.ndarray'):
+            fingerprint = array_fingerprint(value)
+            if fingerprint is None:
+                return None
+            # The displayed elements might not be sampled by the fingerprint
+            return fingerprint + (_displayed_elements_crc(value),)
+        elif isinstance_by_name(value, 'pandas.DataFrame'):
+            # The display only shows the first column names because it's
+            # truncated to 70 characters.
+            columns = tuple(str(c) for c in value.columns[:20])
+            return (type(value), value.shape, columns)
+        elif isinstance_by_name(value, 'pandas.Series'):
+            return (type(value), value.shape, str(value.dtype))
+        elif isinstance_by_name(value, 'pandas.Index'):
+            # Index objects are immutable
+            return (type(value), len(value))
+        elif isinstance_by_name(value, 'PIL.Image.Image'):
+            return (type(value), value.mode, value.size)
+    except Exception:
+        pass
+    return None
+
+
+def _is_fingerprint_sampled(value):
+    """
+    Check if the fingerprint of *value* can miss changes of its contents.
+
+    That's the case for arrays whose fingerprint only samples their data,
+    and for dataframes and series, whose fingerprint doesn't use their data.
+    """
+    if isinstance_by_name(value, 'numpy.ndarray'):
+        return is_fingerprint_sampled(value)
+    return isinstance_by_name(value, ('pandas.DataFrame', 'pandas.Series'))
+
+
+def get_display_options():
+    """
+    Get the global options that change the display of values.
+
+    Those are the Numpy print options, which are only read if Numpy was
+    already imported.
+    """
+    if 'numpy' not in sys.modules:
+        return ()
+    return tuple(
+        (name, tuple(sorted(option.items())) if isinstance(option, dict)
+         else option)
+        for name, option in sorted(np.get_printoptions().items())
+    )
+
+
+def get_settings_key(settings):
+    """
+    Get a key that changes when the settings or the global options used to
+    make view rows (see `make_view_row`) do.
+    """
+    return (settings['minmax'], get_display_options())
+
+
+def _is_row_sampled(value, settings_key):
+    """
+    Check if the fingerprint of *value* can miss changes of its row.
+
+    That's the case for the min and max of arrays whose fingerprint only
+    samples their data, and for the memory used by dataframes and series.
+    """
+    if isinstance_by_name(value, 'numpy.ndarray'):
+        minmax = settings_key[0]
+        return minmax and is_fingerprint_sampled(value)
+    return isinstance_by_name(value, ('pandas.DataFrame', 'pandas.Series'))
+
+
+class ViewRowCache(FingerprintCache):
+    """
+    LRU cache of the view rows of values.
+
+    Entries are keyed by the identity of the value and the settings the row
+    depends on, and are only valid while the value is alive and its
+    fingerprint (see `get_fingerprint`) doesn't change.
+    """
+
+    def __init__(self, maxsize=1000):
+        super().__init__(maxsize)
+
+    def get(self, value, settings_key):
+        """
+        Get the cached row of *value*, or None if there is no valid one.
+
+        Also return the fingerprint of value, which has to be passed to
+        `put` to cache a new row.
+        """
+        fingerprint = get_fingerprint(value)
+        if fingerprint is None:
+            return None, None
+        row = self._lookup((id(value), settings_key), value, fingerprint)
+        if row is self.MISSING:
+            return None, fingerprint
+        return dict(row), fingerprint
+
+    def put(self, value, settings_key, fingerprint, row):
+        """Cache the row of value."""
+        self._store((id(value), settings_key), value, fingerprint, dict(row))
+
+    def _is_sampled(self, value, key):
+        return _is_row_sampled(value, key[1])
+
+
+VIEW_ROW_CACHE = ViewRowCache()
+
+
 #==============================================================================
 # Create view to be displayed by NamespaceBrowser
 #==============================================================================
+# Display of the values whose row is computed after the view is sent
+PENDING_VIEW = 'Pending...'
+
+# Time (in seconds) after which computing a row is considered slow
+VALUE_VIEW_TIME_BUDGET = 0.1
+
 REMOTE_SETTINGS = ('check_all', 'exclude_private', 'exclude_uppercase',
                    'exclude_capitalized', 'exclude_unsupported',
                    'excluded_names', 'minmax', 'show_callable_attributes',
@@ -634,22 +1299,18 @@ def get_supported_types():
     from datetime import date, timedelta
     editable_types = [int, float, complex, list, set, dict, tuple, date,
                       timedelta, str]
-    try:
-        from numpy import ndarray, matrix, generic
-        editable_types += [ndarray, matrix, generic]
-    except:
-        pass
-    try:
-        from pandas import DataFrame, Series, Index
-        editable_types += [DataFrame, Series, Index]
-    except:
-        pass
+
+    # Types of libraries that are not imported are left out because there
+    # can't be instances of them and importing them is expensive.
+    for name in ['numpy.ndarray', 'numpy.matrix', 'numpy.generic',
+                 'pandas.DataFrame', 'pandas.Series', 'pandas.Index']:
+        cls = resolve_type(name)
+        if cls is not None:
+            editable_types.append(cls)
     picklable_types = editable_types[:]
-    try:
-        from PIL import Image
-        editable_types.append(Image.Image)
-    except:
-        pass
+    image_type = resolve_type('PIL.Image.Image')
+    if image_type is not None:
+        editable_types.append(image_type)
     return dict(picklable=picklable_types, editable=editable_types)
 
 
@@ -687,13 +1348,794 @@ def make_remote_view(data, settings, more_excluded_names=None):
                            more_excluded_names=more_excluded_names)
     remote = {}
     for key, value in list(data.items()):
-        view = value_to_display(value, minmax=settings['minmax'])
-        remote[key] = {
-            'type':  get_human_readable_type(value),
-            'size':  get_size(value),
-            'view':  view,
-            'python_type': get_type_string(value),
-            'numpy_type': get_numpy_type_string(value)
-        }
+        remote[key] = make_view_row(value, settings)
 
     return remote
+
+
+def make_view_row(value, settings, size=None, defer=False,
+                  minmax_time_budget=None):
+    """
+    Make the entry of *value* in a remote view.
+
+    `size` can be passed to reuse a size already computed with `get_size`.
+    Rows of values that support it are cached in `VIEW_ROW_CACHE`. If
+    `defer` is True and there's no cached row, return a row made with
+    `make_pending_row` instead of computing the display of value.
+
+    If the min and max of an array can't be computed within
+    `minmax_time_budget` (see `value_to_display`), the row shows approximate
+    values and is marked as pending, like the ones of `make_pending_row`.
+    """
+    settings_key = get_settings_key(settings)
+    row, fingerprint = VIEW_ROW_CACHE.get(value, settings_key)
+    if row is not None:
+        return row
+    if defer:
+        return make_pending_row(value, size=size)
+
+    if size is None:
+        size = get_size(value)
+    row = {
+        'type':  get_human_readable_type(value),
+        'size':  size,
+        'view':  value_to_display(
+            value,
+            minmax=settings['minmax'],
+            minmax_time_budget=minmax_time_budget
+        ),
+        'python_type': get_type_string(value),
+        'numpy_type': get_numpy_type_string(value),
+        'memory': get_memory_size(value)
+    }
+
+    if (
+        settings['minmax']
+        and _safe_isinstance(value, 'numpy.ndarray')
+        and not ARRAY_STATS.is_exact(value)
+    ):
+        # The min and max are approximate
+        row['pending'] = True
+        return row
+
+    VIEW_ROW_CACHE.put(value, settings_key, fingerprint, row)
+    return row
+
+
+def make_pending_row(value, size=None):
+    """
+    Make a placeholder entry of *value* in a remote view.
+
+    It has all fields of a regular row but 'view', which is set to
+    `PENDING_VIEW`, 'memory', which is set to None because walking big
+    containers can be slow, and an additional 'pending' field set to True.
+    It's used for values whose display is computed after the view is sent.
+    """
+    if size is None:
+        size = get_size(value)
+    return {
+        'type':  get_human_readable_type(value),
+        'size':  size,
+        'view':  PENDING_VIEW,
+        'python_type': get_type_string(value),
+        'numpy_type': get_numpy_type_string(value),
+        'memory': None,
+        'pending': True
+    }
+
+
+def make_timed_view_row(name, value, settings, slow_values,
+                        value_time_budget=VALUE_VIEW_TIME_BUDGET, size=None,
+                        defer=False, minmax_time_budget=None):
+    """
+    Make the entry of *value* in a remote view and track if it's slow.
+
+    `slow_values` is a dictionary that maps variable names to the type of
+    their values when computing their row took longer than
+    `value_time_budget` seconds. It's updated with the result of this call.
+    """
+    start = time.perf_counter()
+    row = make_view_row(value, settings, size=size, defer=defer,
+                        minmax_time_budget=minmax_time_budget)
+    if row.get('pending'):
+        return row
+
+    if time.perf_counter() - start > value_time_budget:
+        slow_values[name] = type(value)
+    else:
+        slow_values.pop(name, None)
+    return row
+
+
+def is_slow_value(slow_values, name, value):
+    """Check if the row of *value* was slow to compute the last time."""
+    return slow_values.get(name, None) is type(value)
+
+
+def _safe_isinstance(value, types):
+    """
+    isinstance that returns False if the check raises an error.
+
+    `types` can also be import paths of types, which are checked with
+    `isinstance_by_name`.
+    """
+    # The try/except is necessary to fix spyder-ide/spyder#19516.
+    try:
+        if isinstance(types, str):
+            return isinstance_by_name(value, types)
+        return isinstance(value, types)
+    except Exception:
+        return False
+
+
+def make_var_properties(value, size=None):
+    """
+    Get the properties of *value* used by the Variable Explorer.
+
+    `size` can be passed to reuse a size already computed with `get_size`.
+    """
+    if size is None:
+        size = get_size(value)
+    is_array = _safe_isinstance(value, 'numpy.ndarray')
+    array_shape = None
+    array_ndim = None
+    if is_array:
+        try:
+            array_shape = value.shape
+            array_ndim = value.ndim
+        except Exception:
+            pass
+
+    return {
+        'is_list': _safe_isinstance(value, (tuple, list)),
+        'is_dict': _safe_isinstance(value, dict),
+        'is_set': _safe_isinstance(value, set),
+        'len': size,
+        'is_array': is_array,
+        'is_image': _safe_isinstance(value, 'PIL.Image.Image'),
+        'is_data_frame': _safe_isinstance(value, 'pandas.DataFrame'),
+        'is_series': _safe_isinstance(value, 'pandas.Series'),
+        'array_shape': array_shape,
+        'array_ndim': array_ndim
+    }
+
+
+def make_remote_snapshot(data, settings, more_excluded_names=None,
+                         time_budget=None, slow_values=None,
+                         value_time_budget=VALUE_VIEW_TIME_BUDGET,
+                         tracker=None, history=None):
+    """
+    Make a remote view of dictionary *data* and get the properties of its
+    values in a single pass.
+
+    Returns a tuple ``(view, properties)`` with the same contents as the ones
+    returned by `make_remote_view` and `make_var_properties`.
+
+    If `time_budget` (in seconds) is given, the rows of the values reached
+    after it's exceeded are made with `make_pending_row`, unless they are
+    cached. The same happens with the values that were slow to display the
+    last time, according to `slow_values` (see `make_timed_view_row`).
+    In that case, the time to compute the min and max of big arrays is also
+    limited to `ARRAY_STATS_TIME_BUDGET`.
+
+    If a `NamespaceTracker` is given, only the names that changed since its
+    last snapshot are filtered and get their rows computed. The rows of the
+    other names are reused.
+
+    If a `VariableHistory` is given, the values whose rows are computed are
+    recorded in it.
+    """
+    if tracker is not None:
+        changed, unchanged = tracker.get_changes(
+            data,
+            (dict(settings), tuple(more_excluded_names or ()),
+             get_display_options())
+        )
+    else:
+        changed, unchanged = data, {}
+    filtered = get_remote_data(changed, settings, mode='editable',
+                               more_excluded_names=more_excluded_names)
+    if slow_values is None:
+        slow_values = {}
+
+    minmax_time_budget = None
+    if time_budget is not None:
+        minmax_time_budget = ARRAY_STATS_TIME_BUDGET
+
+    start = time.perf_counter()
+    view = {}
+    properties = {}
+    for key in list(data.keys()):
+        if key in unchanged:
+            row, value_properties = unchanged[key]
+            if row is not None:
+                view[key] = row
+                properties[key] = value_properties
+            continue
+        elif key not in filtered:
+            continue
+
+        value = filtered[key]
+        if history is not None:
+            history.record(key, value)
+        size = get_size(value)
+        defer = time_budget is not None and (
+            time.perf_counter() - start > time_budget
+            or is_slow_value(slow_values, key, value)
+        )
+        view[key] = make_timed_view_row(
+            key, value, settings, slow_values,
+            value_time_budget=value_time_budget, size=size, defer=defer,
+            minmax_time_budget=minmax_time_budget)
+        properties[key] = make_var_properties(value, size=size)
+
+    if tracker is not None:
+        tracker.update(changed, view, properties)
+    return view, properties
+
+
+def _size_sort_key(size):
+    """Get a number to sort sizes returned by `get_size`."""
+    if isinstance(size, tuple):
+        n_elements = 1
+        for dim in size:
+            try:
+                n_elements *= int(dim)
+            except (TypeError, ValueError):
+                pass
+        return n_elements
+    try:
+        return int(size)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _get_window_sort_key(sort_key, data, settings):
+    """Get the key function used to sort the names of *data*."""
+    if sort_key == 'name':
+        return lambda name: str(name)
+    elif sort_key == 'type':
+        return lambda name: get_human_readable_type(data[name])
+    elif sort_key == 'python_type':
+        return lambda name: get_type_string(data[name])
+    elif sort_key == 'size':
+        return lambda name: _size_sort_key(get_size(data[name]))
+    elif sort_key == 'memory':
+        return lambda name: get_memory_size(data[name])
+    elif sort_key == 'view':
+        return lambda name: str(
+            value_to_display(data[name], minmax=settings['minmax']))
+    raise ValueError("Unknown sort key: {}".format(sort_key))
+
+
+def make_remote_view_window(data, settings, offset=0, limit=None,
+                            sort_key='name', reverse=False, name_filter=None,
+                            type_filter=None, more_excluded_names=None):
+    """
+    Make a remote view of a window of dictionary *data*.
+
+    The names are filtered and sorted first, and then the view rows and
+    properties are only computed for the ones between `offset` and
+    `offset + limit`.
+
+    Parameters
+    ----------
+    data: dict
+        Namespace to build the view for.
+    settings: dict
+        Variable explorer settings.
+    offset: int
+        Index of the first name to return.
+    limit: int or None
+        Maximum number of names to return. If None, all names after `offset`
+        are returned.
+    sort_key: str
+        One of 'name', 'type', 'size', 'python_type', 'memory' or 'view'.
+    reverse: bool
+        Sort in descending order.
+    name_filter: str or None
+        Only keep names that contain this string (case insensitive).
+    type_filter: str, list or None
+        Only keep values whose Python type (as returned by `get_type_string`)
+        is in this list.
+    more_excluded_names: list or None
+        Additional excluded names.
+
+    Returns
+    -------
+    dict
+        With keys 'names' (the sorted names in the window), 'view' and
+        'properties' (their view rows and properties), 'total' (the number of
+        names after filtering) and 'offset'.
+    """
+    data = get_remote_data(data, settings, mode='editable',
+                           more_excluded_names=more_excluded_names)
+    key = _get_window_sort_key(sort_key, data, settings)
+
+    names = list(data.keys())
+    if name_filter:
+        name_filter = name_filter.lower()
+        names = [name for name in names if name_filter in str(name).lower()]
+    if type_filter:
+        if isinstance(type_filter, str):
+            type_filter = [type_filter]
+        names = [name for name in names
+                 if get_type_string(data[name]) in type_filter]
+
+    try:
+        names.sort(key=lambda name: (key(name), str(name)), reverse=reverse)
+    except TypeError:
+        names.sort(key=str, reverse=reverse)
+
+    total = len(names)
+    offset = max(0, offset)
+    if limit is None:
+        window = names[offset:]
+    else:
+        window = names[offset:offset + max(0, limit)]
+
+    view = {}
+    properties = {}
+    for name in window:
+        value = data[name]
+        size = get_size(value)
+        view[name] = make_view_row(value, settings, size=size)
+        properties[name] = make_var_properties(value, size=size)
+
+    return {
+        'names': window,
+        'view': view,
+        'properties': properties,
+        'total': total,
+        'offset': offset,
+    }
+
+
+def make_view_delta(old_view, new_view):
+    """
+    Compare two namespace views (or variable properties dicts).
+
+    Returns a tuple ``(changed, removed)`` where ``changed`` maps the names
+    that were added or whose entry is different in `new_view` to their new
+    entry, and ``removed`` is the list of names that are no longer present.
+    """
+    changed = {}
+    for key, entry in new_view.items():
+        if key not in old_view or old_view[key] != entry:
+            changed[key] = entry
+    removed = [key for key in old_view if key not in new_view]
+    return changed, removed
+
+
+#==============================================================================
+# Namespace changes
+#==============================================================================
+# Types whose view rows can't change while their instances are bound to the
+# same name
+STABLE_VIEW_TYPES = (
+    bool, int, float, complex, str, bytes, type(None), range, type,
+    types.BuiltinFunctionType, types.FunctionType, types.ModuleType
+)
+
+
+def _make_ref(value):
+    """
+    Get a weak reference to value.
+
+    If that's not possible, get a strong one for immutable values (e.g.
+    numbers and strings) and None for the others (e.g. lists and dicts),
+    so that they are not kept alive after being deleted.
+    """
+    try:
+        return weakref.ref(value)
+    except TypeError:
+        if (
+            type(value) in STABLE_VIEW_TYPES
+            or _safe_isinstance(value, 'numpy.generic')
+        ):
+            return lambda: value
+        return None
+
+
+# Types whose instances can't be modified
+IMMUTABLE_TYPES = (bool, int, float, complex, str, bytes, type(None), range)
+
+# Builtins that give access to all the names of a namespace
+NAMESPACE_BUILTINS = {'eval', 'exec', 'get_ipython', 'globals', 'locals',
+                      'vars'}
+
+# Paths of the standard library and installed packages
+_LIBRARY_PATHS = None
+
+
+def _is_library_module(module):
+    """
+    Check if module is part of the standard library or of an installed
+    package, so that it doesn't refer to the values of user namespaces.
+    """
+    global _LIBRARY_PATHS
+    filename = getattr(module, '__file__', None)
+    if filename is None:
+        return module.__name__ in sys.builtin_module_names
+    if _LIBRARY_PATHS is None:
+        paths = sysconfig.get_paths()
+        _LIBRARY_PATHS = tuple({
+            osp.join(osp.normcase(paths[key]), '')
+            for key in ('stdlib', 'platstdlib', 'purelib', 'platlib')
+            if key in paths
+        })
+    return osp.normcase(filename).startswith(_LIBRARY_PATHS)
+
+
+def _is_library_object(value):
+    """
+    Check if value is a module, class or function of the standard library
+    or of an installed package.
+
+    Objects defined in the console are not, because their module is
+    `__main__`, which has no file.
+    """
+    if isinstance(value, types.ModuleType):
+        module = value
+    elif (
+        isinstance(
+            value, (type, types.FunctionType, types.BuiltinFunctionType))
+        or _safe_isinstance(value, 'numpy.ufunc')
+    ):
+        module = sys.modules.get(getattr(value, '__module__', None) or '')
+        if module is None:
+            return False
+    else:
+        return False
+    return _is_library_module(module)
+
+
+def _get_code_names(code):
+    """Get the global names used by a code object and the ones it defines."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names.update(_get_code_names(const))
+    return names
+
+
+def _get_base_array(value):
+    """Get the array that owns the data of the array value."""
+    while isinstance(value.base, np.ndarray):
+        value = value.base
+    return value
+
+
+def get_modifiable_names(nodes, namespace):
+    """
+    Get the names of *namespace* whose values could have been modified in
+    place by running the code of the AST *nodes*.
+
+    Those are the arrays used by the code, directly or through the functions
+    defined in namespace it uses, the arrays that share their data and all
+    dataframes and series, which can also share it. Return None if any
+    value could have been modified, i.e. if the code uses other values that
+    can be modified (e.g. lists, dataframes or objects of user classes),
+    user modules or builtins that access the whole namespace (e.g. magics,
+    which call `get_ipython`).
+    """
+    used = {
+        node.id
+        for tree in nodes
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Name)
+    }
+
+    seen = set()
+    names = set()
+    bases = set()
+    while used:
+        name = used.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        if name not in namespace:
+            if name in NAMESPACE_BUILTINS:
+                return None
+            continue
+
+        value = namespace[name]
+        if (
+            isinstance(value, types.FunctionType)
+            and value.__globals__ is namespace
+        ):
+            used.update(_get_code_names(value.__code__))
+            if value.__closure__:
+                return None
+        elif _safe_isinstance(value, 'numpy.ndarray'):
+            if value.dtype.hasobject:
+                return None
+            names.add(name)
+            bases.add(id(_get_base_array(value)))
+        elif not (
+            type(value) in IMMUTABLE_TYPES
+            or _safe_isinstance(value, 'numpy.generic')
+            or _is_library_object(value)
+        ):
+            return None
+
+    if bases:
+        for name, value in namespace.items():
+            if _safe_isinstance(value, 'numpy.ndarray'):
+                if id(_get_base_array(value)) in bases:
+                    names.add(name)
+            elif isinstance_by_name(
+                    value, ('pandas.DataFrame', 'pandas.Series')):
+                names.add(name)
+    return names
+
+
+class NamespaceTracker:
+    """
+    Track the names of a namespace that changed between snapshots.
+
+    Names are considered changed if they were bound, rebound or deleted,
+    which is found by comparing the identity of their values with the ones
+    of the last snapshot, or if they were marked with `mark_dirty` (e.g.
+    after modifying their value in place). Values that can be modified in
+    place without being rebound are also considered changed, unless their
+    view row doesn't depend on their contents (see `STABLE_VIEW_TYPES`) or
+    they have a fingerprint (see `get_fingerprint`) that didn't change.
+    Values whose fingerprint can miss changes are considered changed after
+    `invalidate_sampled` is called for them.
+    """
+
+    def __init__(self):
+        # Map of names to tuples of the form
+        # (ref, fingerprint, row, properties)
+        self._entries = {}
+        self._dirty = set()
+        self._settings_key = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def mark_dirty(self, names):
+        """Mark `names` (a name or an iterable of them) as changed."""
+        if isinstance(names, str):
+            names = [names]
+        with self._lock:
+            self._dirty.update(names)
+
+    def invalidate_sampled(self, names=None):
+        """
+        Mark the names of values whose fingerprint can miss changes as
+        changed.
+
+        This is needed after running code that could have modified the
+        values of `names` (all names if None) in place.
+        """
+        with self._lock:
+            for name, (ref, fingerprint, __, __) in self._entries.items():
+                if names is not None and name not in names:
+                    continue
+                if fingerprint is None or ref is None:
+                    # Always considered changed
+                    continue
+                value = ref()
+                if value is not None and _is_fingerprint_sampled(value):
+                    self._dirty.add(name)
+
+    def _is_unchanged(self, entry, value):
+        """Check if the row of value in the last snapshot is still valid."""
+        ref, fingerprint, row, __ = entry
+        if ref is None or ref() is not value:
+            return False
+        if row is not None and row.get('pending'):
+            return False
+        if (
+            type(value) in STABLE_VIEW_TYPES
+            or _safe_isinstance(value, 'numpy.generic')
+        ):
+            return True
+        return fingerprint is not None and fingerprint == get_fingerprint(
+            value)
+
+    def get_changes(self, data, settings_key):
+        """
+        Split the names of namespace `data` in changed and unchanged ones.
+
+        `settings_key` is a value that changes when the settings used to
+        make the snapshots do, which makes all names change.
+
+        Returns a tuple ``(changed, unchanged)`` where ``changed`` maps the
+        changed names to their values and ``unchanged`` maps the other names
+        to a tuple ``(row, properties)`` with their view row and properties
+        in the last snapshot (None for names that were filtered out).
+        """
+        with self._lock:
+            if settings_key != self._settings_key:
+                self._entries.clear()
+                self._settings_key = settings_key
+            dirty = self._dirty
+            self._dirty = set()
+
+            changed = {}
+            unchanged = {}
+            for name, value in list(data.items()):
+                entry = self._entries.get(name)
+                if (
+                    entry is None
+                    or name in dirty
+                    or not self._is_unchanged(entry, value)
+                ):
+                    changed[name] = value
+                else:
+                    unchanged[name] = entry[2:]
+
+            for name in list(self._entries):
+                if name not in data:
+                    del self._entries[name]
+        return changed, unchanged
+
+    def update_row(self, name, value, row):
+        """
+        Replace the row of `name` in the last snapshot (e.g. after computing
+        a pending one), if it's still bound to value.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return
+            ref, fingerprint, __, properties = entry
+            if ref is not None and ref() is value:
+                self._entries[name] = (ref, fingerprint, row, properties)
+
+    def update(self, changed, view, properties):
+        """
+        Save the rows of the `changed` values in a snapshot.
+
+        `view` and `properties` are the view and variable properties of the
+        snapshot, which don't have the names that were filtered out.
+        """
+        with self._lock:
+            for name, value in changed.items():
+                self._entries[name] = (
+                    _make_ref(value),
+                    get_fingerprint(value),
+                    view.get(name),
+                    properties.get(name)
+                )
+
+
+#==============================================================================
+# Children of nested values
+#==============================================================================
+def _is_json_key(key):
+    """Check if a dict key is kept as is when sent as JSON."""
+    return key is None or type(key) in (str, int, float, bool)
+
+
+def get_child(value, step):
+    """
+    Get the child of *value* described by `step`.
+
+    `step` is a list of the form [kind, arg], where kind is:
+        * 'key': Item `arg` of a dictionary (or any mapping).
+        * 'index': Item `arg` of a sequence.
+        * 'item': Value of the `arg`-th key of a dictionary, or `arg`-th item
+          of a set, in iteration order. This is used for keys that can't be
+          sent as JSON.
+        * 'attr': Attribute `arg` of an object.
+    """
+    kind, arg = step
+    if kind in ('key', 'index'):
+        return value[arg]
+    elif kind == 'item':
+        try:
+            item = next(islice(iter(value), arg, None))
+        except StopIteration:
+            raise IndexError("Item {} doesn't exist".format(arg))
+        if isinstance(value, dict):
+            return value[item]
+        return item
+    elif kind == 'attr':
+        return getattr(value, arg)
+    raise ValueError("Unknown path step: {}".format(kind))
+
+
+def resolve_path(value, path):
+    """Get the value at the end of `path`, a list of steps from *value*."""
+    for step in path:
+        value = get_child(value, step)
+    return value
+
+
+def has_children(value):
+    """Check if *value* has children that can be browsed."""
+    try:
+        if isinstance(value, (dict, list, tuple, set, frozenset)):
+            return len(value) > 0
+        if (
+            inspect.isclass(value)
+            or inspect.ismodule(value)
+            or inspect.isroutine(value)
+            or get_fingerprint(value) is not None
+            or isinstance(value, (str, bytes))
+        ):
+            # Arrays, dataframes and images are browsed with their editors
+            return False
+        return len(getattr(value, '__dict__', {})) > 0
+    except Exception:
+        return False
+
+
+def _get_children_steps(value, settings, offset, limit):
+    """
+    Get the total number of children of value and the (label, step) of the
+    ones in the window of `offset` and `limit`.
+    """
+    stop = None if limit is None else offset + limit
+    if isinstance(value, dict):
+        keys = islice(value, offset, stop)
+        steps = []
+        for position, key in enumerate(keys, start=offset):
+            if _is_json_key(key):
+                step = ['key', key]
+            else:
+                step = ['item', position]
+            steps.append((value_to_display(key, level=1), step))
+        return len(value), steps
+    elif isinstance(value, (list, tuple)):
+        indexes = range(len(value))[offset:stop]
+        return len(value), [(str(i), ['index', i]) for i in indexes]
+    elif isinstance(value, (set, frozenset)):
+        items = islice(value, offset, stop)
+        return len(value), [
+            (value_to_display(item, level=1), ['item', position])
+            for position, item in enumerate(items, start=offset)
+        ]
+    elif has_children(value):
+        names = []
+        for name in dir(value):
+            if (
+                not settings.get('show_special_attributes', False)
+                and name.startswith('__')
+            ):
+                continue
+            if not settings.get('show_callable_attributes', False):
+                try:
+                    if callable(getattr(value, name)):
+                        continue
+                except Exception:
+                    continue
+            names.append(name)
+        return len(names), [
+            (name, ['attr', name]) for name in names[offset:stop]
+        ]
+    return 0, []
+
+
+def make_children_view(value, settings, offset=0, limit=None):
+    """
+    Make a view of the children of *value* (items of containers or
+    attributes of objects).
+
+    Only the children between `offset` and `offset + limit` are included.
+    Returns a dictionary with keys:
+        * 'children': List of view rows (see `make_view_row`) of the
+          children, with additional 'label' (their key, index or attribute
+          name), 'step' (to use in the path of `get_child` to get them) and
+          'has_children' fields.
+        * 'total': Total number of children.
+        * 'offset': The offset.
+    """
+    total, steps = _get_children_steps(value, settings, offset, limit)
+    children = []
+    for label, step in steps:
+        try:
+            child = get_child(value, step)
+        except Exception:
+            continue
+        row = make_view_row(child, settings)
+        row['label'] = label
+        row['step'] = step
+        row['has_children'] = has_children(child)
+        children.append(row)
+    return {'children': children, 'total': total, 'offset': offset}
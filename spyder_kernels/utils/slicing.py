@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Get blocks of arrays, dataframes and series.
+
+They are used by the editors of the Variable Explorer to only transfer the
+part of a variable they are showing. Blocks are taken with basic indexing,
+so they are views of the variables when possible (e.g. for memory-mapped
+arrays) and variables are never copied as a whole.
+"""
+
+from spyder_kernels.utils.lazymodules import numpy as np
+from spyder_kernels.utils.typeregistry import isinstance_by_name
+
+
+def make_index(index):
+    """
+    Convert a JSON-able description of an index to a tuple of slices.
+
+    Each item of `index` can be an int, None (the whole axis), a list with
+    the arguments of a slice ([start, stop] or [start, stop, step]) or
+    '...' (an Ellipsis).
+    """
+    if index is None:
+        return ()
+    if not isinstance(index, (list, tuple)):
+        index = [index]
+
+    items = []
+    for item in index:
+        if item is None:
+            items.append(slice(None))
+        elif item == '...':
+            items.append(Ellipsis)
+        elif isinstance(item, (list, tuple)):
+            if not 1 <= len(item) <= 3:
+                raise ValueError("Invalid slice: {}".format(item))
+            items.append(slice(*item))
+        elif isinstance(item, int) and not isinstance(item, bool):
+            items.append(item)
+        else:
+            raise TypeError("Invalid index item: {!r}".format(item))
+    return tuple(items)
+
+
+def make_window(rows=None, columns=None, index=None):
+    """
+    Get the index of a block of rows and columns or the one of `index`.
+
+    `rows` and `columns` are lists with the arguments of a slice (e.g.
+    [start, stop]) and `index` is an index as described in `make_index`.
+    They can't be used together.
+    """
+    if index is not None:
+        if rows is not None or columns is not None:
+            raise ValueError("index can't be used with rows or columns")
+        return make_index(index)
+
+    window = (slice(*rows) if rows is not None else slice(None),)
+    if columns is not None:
+        window += (slice(*columns),)
+    return window
+
+
+def get_slice(value, rows=None, columns=None, index=None):
+    """
+    Get a block of *value*.
+
+    Parameters
+    ----------
+    value: numpy.ndarray, pandas.DataFrame, pandas.Series, list or tuple
+        The variable.
+    rows, columns: list or None
+        Arguments of the slices of rows and columns (e.g. [start, stop]).
+        `columns` is ignored for one-dimensional values.
+    index: list or None
+        Index of the block, as described in `make_index`. It can't be used
+        with `rows` or `columns`.
+
+    Returns
+    -------
+    The block, of the same type as value. Blocks of plain and memory-mapped
+    arrays are contiguous Numpy arrays, so that they can be pickled with
+    out-of-band buffers.
+    """
+    window = make_window(rows, columns, index)
+    ndim = getattr(value, 'ndim', 1)
+    if index is None and ndim == 1:
+        window = window[:1]
+
+    if isinstance_by_name(value, 'numpy.ndarray'):
+        block = value[window]
+        if isinstance(block, np.memmap):
+            # A view that is not pickled as a memory map
+            block = np.asarray(block)
+        if type(block) is np.ndarray:
+            # Only copied if the block is not contiguous
+            block = np.ascontiguousarray(block)
+        return block
+    elif isinstance_by_name(value, ('pandas.DataFrame', 'pandas.Series')):
+        return value.iloc[window]
+    elif isinstance(value, (list, tuple)):
+        if len(window) != 1:
+            raise ValueError("Sequences only support one-dimensional slices")
+        return value[window[0]]
+    raise TypeError(
+        "Values of type {} can't be sliced".format(type(value).__name__))
+
+
+def check_dtype(values, dtype):
+    """
+    Check that `values` can be set in an array or column of type `dtype`.
+
+    Values must be castable to `dtype` without changing their kind (e.g.
+    floats can't be set in integer arrays), so that the dtype of variables
+    doesn't change and values are not silently truncated. Raise a TypeError
+    otherwise.
+    """
+    if not isinstance(dtype, np.dtype) or dtype.kind == 'O':
+        # Object arrays accept anything and other dtypes (e.g. Pandas
+        # extension types) do their own validation.
+        return
+    values_dtype = np.asarray(values).dtype
+    if (
+        values_dtype.kind == 'O'
+        or not np.can_cast(values_dtype, dtype, casting='same_kind')
+    ):
+        raise TypeError(
+            "Can't set values of type {} in {}".format(values_dtype, dtype))
+
+
+def set_slice(value, block, rows=None, columns=None, index=None):
+    """
+    Set a block of *value* in place.
+
+    Parameters
+    ----------
+    value: numpy.ndarray, pandas.DataFrame, pandas.Series or list
+        The variable, which is modified in place.
+    block: object
+        The new values of the block. It can be anything that can be assigned
+        to the block, e.g. a scalar to set all its elements.
+    rows, columns, index:
+        The block, as in `get_slice`.
+    """
+    window = make_window(rows, columns, index)
+    ndim = getattr(value, 'ndim', 1)
+    if index is None and ndim == 1:
+        window = window[:1]
+
+    if isinstance_by_name(value, 'numpy.ndarray'):
+        check_dtype(block, value.dtype)
+        value[window] = block
+    elif isinstance_by_name(value, 'pandas.Series'):
+        check_dtype(block, value.dtype)
+        value.iloc[window] = block
+    elif isinstance_by_name(value, 'pandas.DataFrame'):
+        if len(window) > 1:
+            dtypes = value.dtypes.iloc[window[1]]
+        else:
+            dtypes = value.dtypes
+        if isinstance_by_name(block, 'pandas.DataFrame'):
+            for dtype, column in zip(dtypes, block.columns):
+                check_dtype(block[column], dtype)
+        else:
+            for dtype in set(getattr(dtypes, 'values', [dtypes])):
+                check_dtype(block, dtype)
+        value.iloc[window] = block
+    elif isinstance(value, list):
+        if len(window) != 1:
+            raise ValueError("Sequences only support one-dimensional slices")
+        value[window[0]] = block
+    else:
+        raise TypeError(
+            "Values of type {} can't be modified in place".format(
+                type(value).__name__))
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Summaries of arrays, dataframes and series.
+
+They are small JSON-able results (statistics, quantiles, histograms and null
+counts) used to plot and describe big variables without transferring them.
+Summaries are cached while the values they describe don't change.
+"""
+
+from spyder_kernels.utils.arraystats import (
+    ARRAY_STATS, APPROXIMATE_SAMPLES, CHUNK_NBYTES, array_fingerprint,
+    is_fingerprint_sampled)
+from spyder_kernels.utils.cache import FingerprintCache
+from spyder_kernels.utils.lazymodules import numpy as np
+from spyder_kernels.utils.typeregistry import isinstance_by_name
+
+
+# Kinds of summaries
+SUMMARY_KINDS = ('describe', 'quantiles', 'histogram', 'null_counts')
+
+# Default quantiles and number of histogram bins
+DEFAULT_QUANTILES = (0, 0.25, 0.5, 0.75, 1)
+DEFAULT_BINS = 50
+
+# Arrays bigger than this (in number of elements) get approximate quantiles
+# computed from a sample.
+EXACT_QUANTILES_SIZE = 10**7
+
+
+def _to_json(value):
+    """Convert the Numpy and Pandas objects in value to JSON-able ones."""
+    if isinstance(value, dict):
+        return {str(k): _to_json(v) for k, v in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    elif isinstance_by_name(value, ('numpy.ndarray', 'pandas.Series')):
+        return _to_json(value.tolist())
+    elif isinstance_by_name(value, 'numpy.generic'):
+        return value.item()
+    elif value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _check_numeric(value):
+    """Raise a TypeError if the array value is not numeric."""
+    if not (
+        np.issubdtype(value.dtype, np.number)
+        or np.issubdtype(value.dtype, np.bool_)
+    ) or np.issubdtype(value.dtype, np.complexfloating):
+        raise TypeError(
+            "Can't summarize arrays of type {}".format(value.dtype))
+
+
+def _sample(value):
+    """Get a sample of the array value."""
+    indexes = np.linspace(
+        0, value.size - 1, min(value.size, APPROXIMATE_SAMPLES)
+    ).astype(np.intp)
+    return value.flat[indexes]
+
+
+# ---- Arrays
+def _array_quantiles(value, quantiles):
+    _check_numeric(value)
+    exact = value.size <= EXACT_QUANTILES_SIZE
+    data = value if exact else _sample(value)
+    result = np.nanquantile(data.astype(np.float64), quantiles)
+    return {
+        'quantiles': list(quantiles),
+        'values': result,
+        'exact': exact,
+    }
+
+
+def _array_describe(value):
+    _check_numeric(value)
+    stats = ARRAY_STATS.get_stats(value, moments=True, nan_aware=True)
+    count = stats['count']
+    std = stats['std']
+    if count > 1:
+        # Use the sample standard deviation, like Pandas
+        std = std * (count / (count - 1)) ** 0.5
+    else:
+        std = np.nan
+    quartiles = _array_quantiles(value, (0.25, 0.5, 0.75))['values']
+    return {
+        'count': count,
+        'mean': stats['mean'],
+        'std': std,
+        'min': stats['min'],
+        '25%': quartiles[0],
+        '50%': quartiles[1],
+        '75%': quartiles[2],
+        'max': stats['max'],
+    }
+
+
+def _array_histogram(value, bins):
+    _check_numeric(value)
+    if value.size == 0:
+        # E.g. columns with only nulls
+        edges = np.histogram_bin_edges([], bins=bins)
+        return {'counts': np.zeros(len(edges) - 1, dtype=np.int64),
+                'edges': edges}
+
+    stats = ARRAY_STATS.get_stats(value, nan_aware=True)
+    bin_range = (float(stats['min']), float(stats['max']))
+    if not np.isfinite(bin_range).all():
+        # Only nans or infinite values
+        bin_range = None
+    edges = np.histogram_bin_edges([], bins=bins, range=bin_range)
+
+    # Count in chunks to not copy big arrays
+    counts = np.zeros(len(edges) - 1, dtype=np.int64)
+    step = max(1, CHUNK_NBYTES // value.itemsize)
+    for start in range(0, value.size, step):
+        chunk = value.flat[start:start + step]
+        if np.issubdtype(chunk.dtype, np.floating):
+            chunk = chunk[np.isfinite(chunk)]
+        counts += np.histogram(chunk, bins=edges)[0]
+    return {'counts': counts, 'edges': edges}
+
+
+def _array_null_counts(value):
+    value = np.atleast_1d(value)
+    if not np.issubdtype(value.dtype, np.inexact):
+        nulls = np.zeros(value.shape[1:], dtype=np.int64)
+    else:
+        nulls = np.isnan(value).sum(axis=0)
+    if value.ndim > 1:
+        # Per column
+        return nulls.ravel()
+    return nulls
+
+
+# ---- Pandas
+def _pandas_describe(value):
+    return value.describe().to_dict()
+
+
+def _pandas_quantiles(value, quantiles):
+    if isinstance_by_name(value, 'pandas.DataFrame'):
+        result = value.quantile(list(quantiles), numeric_only=True)
+        values = {column: result[column].values for column in result.columns}
+    else:
+        values = value.quantile(list(quantiles)).values
+    return {'quantiles': list(quantiles), 'values': values, 'exact': True}
+
+
+def _pandas_histogram(value, bins):
+    if isinstance_by_name(value, 'pandas.DataFrame'):
+        return {
+            column: _array_histogram(
+                value[column].dropna().to_numpy(), bins)
+            for column in value.select_dtypes('number').columns
+        }
+    return _array_histogram(value.dropna().to_numpy(), bins)
+
+
+def _pandas_null_counts(value):
+    nulls = value.isna().sum()
+    if isinstance_by_name(value, 'pandas.DataFrame'):
+        return nulls.to_dict()
+    return nulls
+
+
+def get_summary(value, kind, quantiles=None, bins=None):
+    """
+    Get a summary of *value*.
+
+    Parameters
+    ----------
+    value: numpy.ndarray, pandas.DataFrame or pandas.Series
+        The value.
+    kind: str
+        One of 'describe' (statistics like the ones of Pandas' describe),
+        'quantiles', 'histogram' (counts and bin edges) or 'null_counts'
+        (number of nans, per column for dataframes and 2D arrays).
+    quantiles: list or None
+        Quantiles to compute for 'quantiles'. By default,
+        `DEFAULT_QUANTILES`.
+    bins: int or None
+        Number of bins of 'histogram'. By default, `DEFAULT_BINS`.
+
+    Returns
+    -------
+    A JSON-able summary. Summaries of dataframes are dictionaries with one
+    entry per column.
+    """
+    if kind not in SUMMARY_KINDS:
+        raise ValueError("Unknown summary kind: {}".format(kind))
+    quantiles = tuple(DEFAULT_QUANTILES if quantiles is None else quantiles)
+    bins = DEFAULT_BINS if bins is None else bins
+
+    if isinstance_by_name(value, 'numpy.ndarray'):
+        if value.size == 0:
+            raise ValueError("Zero-size arrays have no summary")
+        functions = {
+            'describe': _array_describe,
+            'quantiles': _array_quantiles,
+            'histogram': _array_histogram,
+            'null_counts': _array_null_counts,
+        }
+    elif isinstance_by_name(value, ('pandas.DataFrame', 'pandas.Series')):
+        functions = {
+            'describe': _pandas_describe,
+            'quantiles': _pandas_quantiles,
+            'histogram': _pandas_histogram,
+            'null_counts': _pandas_null_counts,
+        }
+    else:
+        raise TypeError(
+            "Values of type {} have no summary".format(type(value).__name__))
+
+    function = functions[kind]
+    if kind == 'quantiles':
+        result = function(value, quantiles)
+    elif kind == 'histogram':
+        result = function(value, bins)
+    else:
+        result = function(value)
+    return _to_json(result)
+
+
+# ---- Cache
+def summary_fingerprint(value):
+    """
+    Get a fingerprint of value that changes when its data does.
+
+    Like `array_fingerprint`, changes of the elements that are not sampled
+    in big arrays and columns are not detected. Return None if a fingerprint
+    can't be computed.
+    """
+    if isinstance_by_name(value, 'numpy.ndarray'):
+        return array_fingerprint(value)
+    elif isinstance_by_name(value, 'pandas.Series'):
+        data = value.to_numpy()
+        if data.dtype.hasobject:
+            return None
+        return (type(value), str(value.name), array_fingerprint(data))
+    elif isinstance_by_name(value, 'pandas.DataFrame'):
+        columns = [summary_fingerprint(value[c]) for c in value.columns]
+        if None in columns:
+            return None
+        return (type(value), tuple(columns))
+    return None
+
+
+class SummaryCache(FingerprintCache):
+    """
+    LRU cache of summaries.
+
+    Entries are keyed by the identity of the values and the summary
+    arguments, and are only valid while the values are alive and their
+    fingerprint (see `summary_fingerprint`) doesn't change.
+    """
+
+    def __init__(self, maxsize=100):
+        super().__init__(maxsize)
+
+    def get_summary(self, value, kind, quantiles=None, bins=None):
+        """Get the summary of value (see `get_summary`)."""
+        key = (
+            id(value),
+            kind,
+            None if quantiles is None else tuple(quantiles),
+            bins
+        )
+        return self._get(
+            key,
+            value,
+            summary_fingerprint(value),
+            lambda: get_summary(value, kind, quantiles=quantiles, bins=bins)
+        )
+
+    def _is_sampled(self, value, key):
+        return (
+            not isinstance_by_name(value, 'numpy.ndarray')
+            or is_fingerprint_sampled(value)
+        )
+
+
+SUMMARY_CACHE = SummaryCache()
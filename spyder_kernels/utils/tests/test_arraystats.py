@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for arraystats.py
+"""
+
+# Third party imports
+import numpy as np
+import pytest
+
+# Local imports
+from spyder_kernels.utils import arraystats
+from spyder_kernels.utils.arraystats import ArrayStatsCache
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """Use small chunks so that arrays are processed in several steps."""
+    monkeypatch.setattr(arraystats, 'CHUNK_NBYTES', 800)
+
+
+@pytest.mark.parametrize(
+    "array",
+    [
+        np.random.rand(1000),
+        np.random.rand(40, 50).T,  # Fortran contiguous
+        np.random.rand(100, 30)[:, ::2],  # Non-contiguous
+        np.arange(5000, dtype=np.int16),
+    ]
+)
+def test_chunked_stats(small_chunks, array):
+    """Test that chunked statistics are the same as the ones of Numpy."""
+    cache = ArrayStatsCache()
+    stats = cache.get_stats(array, moments=True)
+    assert stats['exact']
+    assert stats['min'] == array.min()
+    assert stats['max'] == array.max()
+    assert stats['count'] == array.size
+    assert np.isclose(stats['mean'], array.mean())
+    assert np.isclose(stats['std'], array.std())
+
+
+def test_nan_aware_stats(small_chunks):
+    """Test nan-aware statistics."""
+    array = np.random.rand(1000)
+    array[::3] = np.nan
+    cache = ArrayStatsCache()
+
+    stats = cache.get_stats(array)
+    assert np.isnan(stats['min'])
+
+    stats = cache.get_stats(array, moments=True, nan_aware=True)
+    assert stats['min'] == np.nanmin(array)
+    assert stats['max'] == np.nanmax(array)
+    assert stats['count'] == np.count_nonzero(~np.isnan(array))
+    assert np.isclose(stats['mean'], np.nanmean(array))
+    assert np.isclose(stats['std'], np.nanstd(array))
+
+
+def test_time_budget(small_chunks):
+    """
+    Test that approximate results are returned when the time budget is
+    exhausted and that the computation continues in the next call.
+    """
+    array = np.arange(10000.)
+    cache = ArrayStatsCache()
+
+    stats = cache.get_stats(array, time_budget=0)
+    assert not stats['exact']
+    assert not cache.is_exact(array)
+    # The sample includes the first and last elements
+    assert stats['min'] == 0
+    assert stats['max'] == 9999
+
+    # One chunk is processed per call with no time budget
+    for __ in range(array.nbytes // arraystats.CHUNK_NBYTES):
+        cache.get_stats(array, time_budget=0)
+    assert cache.is_exact(array)
+    assert cache.get_stats(array, time_budget=0)['exact']
+
+    # Results are invalidated when the array changes
+    array[0] = -1
+    assert not cache.is_exact(array)
+    assert cache.get_stats(array)['min'] == -1
+
+    # Modifications of elements that are not sampled need an invalidation
+    array[5] = -2
+    assert cache.get_stats(array)['min'] == -1
+    cache.invalidate(array)
+    assert cache.get_stats(array)['min'] == -2
+
+
+def test_more_arrays_than_maxsize(small_chunks):
+    """
+    Test that the statistics of more arrays than the cache maxsize are
+    finished when they are computed in turns.
+    """
+    cache = ArrayStatsCache(maxsize=10)
+    arrays = [np.arange(1000.) + i for i in range(12)]
+    for __ in range(arrays[0].nbytes // arraystats.CHUNK_NBYTES):
+        for array in arrays:
+            cache.get_stats(array, time_budget=0)
+    assert all(cache.is_exact(array) for array in arrays)
+
+    # Finished entries are evicted again
+    cache.get_stats(np.arange(1000.), time_budget=0)
+    assert len(cache) == 10
+
+
+def test_masked_fingerprint():
+    """Test that the whole mask of masked arrays is sampled."""
+    array = np.ma.masked_array(np.zeros(100000))
+    fingerprint = arraystats.array_fingerprint(array)
+    indexes = np.linspace(
+        0, array.size - 1, arraystats.FINGERPRINT_SAMPLES).astype(np.intp)
+    array[indexes[-2]] = np.ma.masked
+    assert arraystats.array_fingerprint(array) != fingerprint
+
+
+def test_is_fingerprint_sampled(tmp_path):
+    """
+    Test that big arrays are sampled by their fingerprint unless their data
+    can't be modified.
+    """
+    assert not arraystats.is_fingerprint_sampled(np.zeros(10))
+    array = np.zeros(100000)
+    assert arraystats.is_fingerprint_sampled(array)
+
+    # Read-only views of writeable arrays are sampled
+    view = array[::2]
+    view.flags.writeable = False
+    assert arraystats.is_fingerprint_sampled(view)
+    array.flags.writeable = False
+    assert not arraystats.is_fingerprint_sampled(view)
+
+    # So are masked arrays whose mask is writeable
+    masked = np.ma.masked_array(array, mask=np.zeros(array.shape, bool))
+    assert arraystats.is_fingerprint_sampled(masked)
+
+    # Read-only memory maps are not
+    filename = str(tmp_path / 'array.npy')
+    np.save(filename, np.zeros(100000))
+    assert not arraystats.is_fingerprint_sampled(
+        np.load(filename, mmap_mode='r'))
+    assert arraystats.is_fingerprint_sampled(
+        np.load(filename, mmap_mode='r+'))
+
+
+def test_zero_size():
+    """Test that zero-size arrays raise the same error as Numpy."""
+    with pytest.raises(ValueError):
+        ArrayStatsCache().get_stats(np.array([]))
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for cache.py
+"""
+
+# Third party imports
+import pytest
+
+# Local imports
+from spyder_kernels.utils.cache import FingerprintCache
+
+
+class Value:
+    """Value whose fingerprint only samples its data when it's big."""
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def fingerprint(self):
+        return tuple(self.data[:2])
+
+
+class SumCache(FingerprintCache):
+
+    def __init__(self, maxsize=2):
+        super().__init__(maxsize)
+        self.computed = 0
+
+    def get_sum(self, value, offset=0):
+        def compute():
+            self.computed += 1
+            return sum(value.data) + offset
+
+        return self._get(
+            (id(value), offset), value, value.fingerprint, compute)
+
+    def _is_sampled(self, value, key):
+        return len(value.data) > 2
+
+
+def test_fingerprint_cache():
+    """Test that results are cached while values don't change."""
+    cache = SumCache()
+    value = Value([1, 2])
+    assert cache.get_sum(value) == 3
+    assert cache.get_sum(value) == 3
+    assert cache.computed == 1
+
+    # Different arguments are different entries
+    assert cache.get_sum(value, offset=1) == 4
+    assert len(cache) == 2
+
+    # Changes of the fingerprint
+    value.data[0] = 5
+    assert cache.get_sum(value) == 7
+
+    cache.invalidate(value)
+    assert len(cache) == 0
+
+    # LRU eviction
+    values = [Value([i]) for i in range(3)]
+    for v in values:
+        cache.get_sum(v)
+    assert len(cache) == 2
+    computed = cache.computed
+    cache.get_sum(values[2])
+    assert cache.computed == computed
+    cache.get_sum(values[0])
+    assert cache.computed == computed + 1
+
+    # Values that can't be weakly referenced are not cached
+    cache.clear()
+    assert cache._get((1,), 1, 1, lambda: 2) == 2
+    assert len(cache) == 0
+
+
+def test_invalidate_sampled():
+    """
+    Test that changes missed by sampled fingerprints are seen after
+    invalidate_sampled, and that the other entries stay cached.
+    """
+    cache = SumCache()
+    big = Value([1, 2, 3])
+    small = Value([1, 2])
+    cache.get_sum(big)
+    cache.get_sum(small)
+    big.data[2] = 10
+    assert cache.get_sum(big) == 6
+
+    cache.invalidate_sampled()
+    computed = cache.computed
+    assert cache.get_sum(big) == 13
+    assert cache.get_sum(small) == 3
+    assert cache.computed == computed + 1
+
+    # Results computed while invalidating are not cached as valid
+    def compute():
+        cache.invalidate_sampled()
+        return 0
+
+    cache._get((id(big), 'other'), big, big.fingerprint, compute)
+    assert cache._lookup(
+        (id(big), 'other'), big, big.fingerprint) is cache.MISSING
+
+
+def test_pinned_entries():
+    """Test that pinned entries are not evicted while their values live."""
+    class PinnedCache(SumCache):
+        def _is_pinned(self, result):
+            return result < 0
+
+    cache = PinnedCache()
+    values = [Value([-1]), Value([1]), Value([2]), Value([3])]
+    for value in values:
+        cache.get_sum(value)
+    assert len(cache) == 2
+    computed = cache.computed
+    cache.get_sum(values[0])
+    assert cache.computed == computed
+
+    # Pinned entries can make the cache grow over its maxsize
+    more = [Value([-2]), Value([-3])]
+    for value in more:
+        cache.get_sum(value)
+    assert len(cache) == 3
+
+    # Until their values are deleted
+    del values[0], more[:]
+    cache.get_sum(Value([4]))
+    assert len(cache) == 2
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for frameops.py
+"""
+
+# Third party imports
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local imports
+from spyder_kernels.utils import frameops
+from spyder_kernels.utils.frameops import (
+    filter_positions, frame_fingerprint, FrameViewCache, get_frame_window,
+    group_frame, make_sort_keys, sort_positions)
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame(
+        {
+            'a': [3, 1, 2, 1, np.nan, 5],
+            'b': ['x', 'y', 'x', 'z', 'y', 'x'],
+            'c': np.arange(6.),
+        },
+        index=list('uvwxyz')
+    )
+
+
+def test_make_sort_keys():
+    """Test converting JSON-able sorts."""
+    assert make_sort_keys(None) == ()
+    assert make_sort_keys('a') == (('a', True),)
+    assert make_sort_keys(['a', ['b', False]]) == (('a', True), ('b', False))
+    with pytest.raises(ValueError):
+        make_sort_keys([['a', True, 1]])
+
+
+def test_sort_positions(frame):
+    """Test sorting dataframes by positions."""
+    positions = sort_positions(frame, ['a'])
+    expected = frame.sort_values('a', kind='stable')
+    assert frame.index[positions].tolist() == expected.index.tolist()
+
+    positions = sort_positions(frame, [['b', False], 'a'])
+    expected = frame.sort_values(
+        ['b', 'a'], ascending=[False, True], kind='stable')
+    assert frame.index[positions].tolist() == expected.index.tolist()
+
+    # Sorting the rows of a filter
+    positions = sort_positions(frame, ['c'], np.array([5, 0, 2]))
+    assert positions.tolist() == [0, 2, 5]
+
+    with pytest.raises(KeyError):
+        sort_positions(frame, ['d'])
+
+
+def test_filter_positions(frame):
+    """Test filtering dataframes by positions."""
+    positions = filter_positions(frame, "a > 1 and b == 'x'")
+    assert positions.tolist() == [0, 2, 5]
+
+    with pytest.raises(TypeError):
+        filter_positions(frame, "a + 1")
+
+
+def test_group_frame(frame):
+    """Test grouping dataframes."""
+    result = group_frame(frame, 'b', {'c': 'sum'})
+    assert result['c'].to_dict() == {'x': 7.0, 'y': 5.0, 'z': 3.0}
+
+    # Columns of several aggregations are flattened
+    result = group_frame(
+        frame, 'b', {'c': ['min', 'max']}, positions=np.array([0, 1, 2]))
+    assert result.columns.tolist() == ['c_min', 'c_max']
+    assert result.loc['x'].tolist() == [0.0, 2.0]
+
+    with pytest.raises(TypeError):
+        group_frame(frame, 'b', {'c': [sum]})
+
+
+def test_get_frame_window(frame):
+    """Test getting windows of views."""
+    window = get_frame_window(frame, np.array([5, 3, 1]), offset=1, limit=5,
+                              columns=[0, 2])
+    assert window['total'] == 3
+    assert window['offset'] == 1
+    assert window['block'].index.tolist() == ['x', 'v']
+    assert window['block'].columns.tolist() == ['a', 'b']
+
+    window = get_frame_window(frame, offset=4)
+    assert window['block'].index.tolist() == ['y', 'z']
+
+
+@pytest.mark.parametrize("use_blocks", [True, False])
+def test_frame_fingerprint(frame, monkeypatch, use_blocks):
+    """Test that fingerprints of dataframes change with their data."""
+    if not use_blocks:
+        # Like with versions of pandas with different internals
+        def blocks_fingerprint(frame):
+            raise AttributeError
+
+        monkeypatch.setattr(
+            frameops, '_blocks_fingerprint', blocks_fingerprint)
+
+    frame['d'] = pd.Categorical(['p', 'q'] * 3)
+    fingerprint = frame_fingerprint(frame)
+    assert frame_fingerprint(frame) == fingerprint
+
+    for column, value in [('a', 7), ('b', 'w'), ('c', 9.), ('d', 'q')]:
+        changed = frame.copy()
+        changed.loc['u', column] = value
+        assert frame_fingerprint(changed) != fingerprint
+
+    # Swapping columns of the same type is detected too
+    swapped = frame.copy()
+    swapped[['a', 'c']] = swapped[['c', 'a']].to_numpy()
+    assert frame_fingerprint(swapped) != fingerprint
+
+
+def test_frame_view_cache(frame, monkeypatch):
+    """Test the cache of views."""
+    from spyder_kernels.utils import frameops
+    calls = []
+
+    def sort(*args):
+        calls.append(args)
+        return sort_positions(*args)
+
+    monkeypatch.setattr(frameops, 'sort_positions', sort)
+    cache = FrameViewCache()
+
+    assert cache.get_positions(frame) is None
+    positions = cache.get_positions(frame, sort_by=['a'])
+    assert cache.get_positions(frame, sort_by=['a']) is positions
+    assert len(calls) == 1
+
+    # Sorts of filters reuse the filter positions
+    positions = cache.get_positions(
+        frame, sort_by=[['c', False]], filter_expr="b == 'x'")
+    assert positions.tolist() == [5, 2, 0]
+    assert len(cache) == 3
+
+    # Changes are detected, also in columns of objects
+    frame.iloc[0, 1] = 'y'
+    positions = cache.get_positions(
+        frame, sort_by=[['c', False]], filter_expr="b == 'x'")
+    assert positions.tolist() == [5, 2]
+
+    # Groups
+    groups = cache.get_groups(frame, 'b', {'c': 'count'})
+    assert cache.get_groups(frame, 'b', {'c': 'count'}) is groups
+
+    cache.invalidate(frame)
+    assert len(cache) == 0
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for history.py
+"""
+
+# Third party imports
+import numpy as np
+
+# Local imports
+from spyder_kernels.utils.history import (
+    RingBuffer, scalar_value, VariableHistory)
+
+
+def test_scalar_value():
+    """Test getting the value of scalars."""
+    assert scalar_value(1) == 1.0
+    assert scalar_value(True) == 1.0
+    assert scalar_value(np.int8(3)) == 3.0
+    assert scalar_value(np.array(2.5)) == 2.5
+    assert scalar_value(np.array([2.5])) is None
+    assert scalar_value(1j) is None
+    assert scalar_value('1') is None
+    assert scalar_value(10**400) is None
+
+
+def test_ring_buffer():
+    """Test that ring buffers keep the last values in order."""
+    buffer = RingBuffer(size=3)
+    assert buffer.last() is None
+    for i in range(5):
+        buffer.append(i, i * 10.)
+    assert len(buffer) == 3
+    assert buffer.last() == 40.
+    assert buffer.to_lists() == ([2, 3, 4], [20., 30., 40.])
+
+
+def test_variable_history():
+    """Test recording the history of variables."""
+    history = VariableHistory(length=3, max_names=2)
+    for count, value in enumerate([1, 1, 2, float('nan'), float('nan')]):
+        history.execution_count = count
+        history.record('x', value)
+        history.record('text', 'abc')
+
+    # Only changes are recorded
+    result = history.get('x')
+    assert result['execution_counts'] == [0, 2, 3]
+    assert result['values'][:2] == [1., 2.]
+    assert np.isnan(result['values'][2])
+    assert history.get('text') == {'execution_counts': [], 'values': []}
+
+    # The least recently changed variables are forgotten
+    history.record('y', 1)
+    history.record('z', 1)
+    assert len(history) == 2
+    assert history.get('x')['values'] == []
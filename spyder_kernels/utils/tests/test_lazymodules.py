@@ -38,3 +38,43 @@ def test_existing_modules():
     # The lazy module should have these extra attributes
     assert np.__spy_mod__
     assert np.__spy_modname__
+
+
+def test_module_resolved_once(monkeypatch):
+    """Test that the module is only looked up on first access."""
+    from spyder_kernels.utils import lazymodules
+    calls = []
+
+    def is_module_installed(modname):
+        calls.append(modname)
+        return True
+
+    monkeypatch.setattr(lazymodules, 'is_module_installed', is_module_installed)
+    np = LazyModule('numpy')
+    np.ndarray
+    np.float64
+    assert calls == ['numpy']
+
+    mod = LazyModule('no_module')
+    monkeypatch.setattr(lazymodules, 'is_module_installed', lambda m: False)
+    assert mod.foo is FakeObject
+    assert mod.bar is FakeObject
+
+
+def test_module_installed_later(tmp_path, monkeypatch):
+    """Test that missing modules are imported once they are installed."""
+    import importlib
+    monkeypatch.syspath_prepend(str(tmp_path))
+    mod = LazyModule('spy_late_module')
+    assert mod.foo is FakeObject
+
+    (tmp_path / 'spy_late_module.py').write_text('foo = 1\n')
+    importlib.invalidate_caches()
+    assert mod.foo == 1
+
+    # Modules that fail to be imported are looked up again too
+    (tmp_path / 'spy_broken_module.py').write_text('raise ImportError\n')
+    importlib.invalidate_caches()
+    mod = LazyModule('spy_broken_module')
+    assert mod.foo is FakeObject
+    assert not mod.__spy_resolved__
@@ -11,9 +11,13 @@ Tests for utils.py
 """
 
 # Standard library imports
+import ast
 from collections import defaultdict
 import datetime
+import subprocess
 import sys
+import time
+import weakref
 
 # Third party imports
 import numpy as np
@@ -23,10 +27,16 @@ import xarray as xr
 import PIL.Image
 
 # Local imports
+from spyder_kernels.utils import arraystats, nsview
 from spyder_kernels.utils.nsview import (
     sort_against, is_supported, value_to_display, get_size,
     get_supported_types, get_type_string, get_numpy_type_string,
-    is_editable_type)
+    is_editable_type, make_remote_snapshot, make_remote_view,
+    make_remote_view_window, make_var_properties, make_view_row,
+    get_fingerprint, get_settings_key, ViewRowCache, VIEW_ROW_CACHE,
+    PENDING_VIEW, get_human_readable_type, register_type_handler,
+    TYPE_HANDLERS, get_memory_size, make_children_view, resolve_path,
+    NamespaceTracker, get_modifiable_names, PANDAS_MEMORY_CACHE)
 
 
 def generate_complex_object():
@@ -41,6 +51,17 @@ def generate_complex_object():
 COMPLEX_OBJECT = generate_complex_object()
 DF = pd.DataFrame([1,2,3])
 DATASET = xr.Dataset({0: pd.DataFrame([1,2]), 1:pd.DataFrame([3,4])})
+SETTINGS = {
+    'check_all': False,
+    'exclude_private': True,
+    'exclude_uppercase': True,
+    'exclude_capitalized': False,
+    'exclude_unsupported': False,
+    'exclude_callables_and_modules': True,
+    'excluded_names': [],
+    'minmax': False,
+    'filter_on': True
+}
 
 
 # --- Tests
@@ -133,6 +154,39 @@ def test_default_display():
             'Dataset object of xarray.core.dataset module')
 
 
+def test_lazy_objects_display(monkeypatch):
+    """Test that lazy objects are displayed without computing them."""
+    da = pytest.importorskip('dask.array')
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Lazy object computed")
+
+    monkeypatch.setattr(da.Array, 'compute', fail)
+    monkeypatch.setattr(da.Array, '__array__', fail)
+
+    arr = da.zeros((1000, 20), chunks=(100, 20))
+    assert value_to_display(arr) == (
+        'Shape: (1000, 20)  Chunk size: (100, 20)  Blocks: 10')
+    assert get_size(arr) == (1000, 20)
+    assert get_memory_size(arr) == 1000 * 20 * 8
+    assert get_human_readable_type(arr) == 'Dask array of float64'
+    make_remote_snapshot({'arr': arr}, SETTINGS)
+
+    # Unknown chunks, e.g. after filtering
+    filtered = arr[arr[:, 0] > 0]
+    assert value_to_display(filtered).startswith('Shape: (?, 20)')
+    assert get_size(filtered) == (-1, 20)
+    assert get_memory_size(filtered) == 0
+
+    # Xarray objects backed by Dask
+    data_array = xr.DataArray(arr, dims=('x', 'y'))
+    assert value_to_display(data_array) == (
+        'Dimensions: x: 1000, y: 20  Chunk size: (100, 20)')
+    assert value_to_display(data_array.to_dataset(name='a')) == (
+        'Data variables: a  Dimensions: x: 1000, y: 20')
+    assert get_memory_size(data_array) == 1000 * 20 * 8
+
+
 @pytest.mark.skipif(
     sys.platform == 'darwin' and sys.version_info[:2] == (3, 8),
     reason="Fails on Mac with Python 3.8")
@@ -444,5 +498,509 @@ def test_get_numpy_type():
     assert get_numpy_type_string(df) == 'Unknown'
 
 
+def test_make_remote_snapshot():
+    """
+    Test that the snapshot is the same as the separate view and properties.
+    """
+    data = {
+        'a': 1,
+        'arr': np.zeros((2, 3)),
+        'df': pd.DataFrame([1, 2, 3]),
+        'lst': [1, 2],
+        '_private': 2,
+    }
+    view, properties = make_remote_snapshot(data, SETTINGS)
+
+    assert view == make_remote_view(data, SETTINGS)
+    assert set(properties) == {'a', 'arr', 'df', 'lst'}
+    for name in properties:
+        assert properties[name] == make_var_properties(data[name])
+
+    assert properties['arr']['is_array']
+    assert properties['arr']['array_shape'] == (2, 3)
+    assert properties['arr']['array_ndim'] == 2
+    assert properties['df']['is_data_frame']
+    assert properties['lst']['is_list']
+    assert properties['lst']['len'] == 2
+
+
+def test_make_remote_view_window():
+    """Test that windows of the view are sorted and filtered correctly."""
+    data = {'var{:02d}'.format(i): i for i in range(30)}
+    data['arr'] = np.zeros(100)
+    data['text'] = 'abc'
+
+    # Sort by name
+    window = make_remote_view_window(data, SETTINGS, offset=0, limit=5)
+    assert window['total'] == 32
+    assert window['names'] == ['arr', 'text', 'var00', 'var01', 'var02']
+    assert set(window['view']) == set(window['names'])
+    assert set(window['properties']) == set(window['names'])
+    assert window['view']['var01']['view'] == '1'
+
+    # Reverse order and offset
+    window = make_remote_view_window(
+        data, SETTINGS, offset=2, limit=2, reverse=True)
+    assert window['names'] == ['var27', 'var26']
+    assert window['offset'] == 2
+
+    # Sort by size
+    window = make_remote_view_window(
+        data, SETTINGS, limit=1, sort_key='size', reverse=True)
+    assert window['names'] == ['arr']
+
+    # Sort by memory
+    data['big'] = np.zeros(1000)
+    window = make_remote_view_window(
+        data, SETTINGS, limit=2, sort_key='memory', reverse=True)
+    assert window['names'] == ['big', 'arr']
+    del data['big']
+
+    # Filters
+    window = make_remote_view_window(data, SETTINGS, name_filter='VAR1')
+    assert window['total'] == 10
+    window = make_remote_view_window(data, SETTINGS, type_filter='str')
+    assert window['names'] == ['text']
+
+    # Unknown sort key
+    with pytest.raises(ValueError):
+        make_remote_view_window(data, SETTINGS, sort_key='foo')
+
+
+def test_get_fingerprint():
+    """Test that fingerprints change when the displayed data does."""
+    # Small arrays
+    arr = np.arange(10)
+    fingerprint = get_fingerprint(arr)
+    assert get_fingerprint(arr) == fingerprint
+    arr[5] = 100
+    assert get_fingerprint(arr) != fingerprint
+
+    # Big arrays
+    arr = np.zeros(10**6)
+    fingerprint = get_fingerprint(arr)
+    arr += 1
+    assert get_fingerprint(arr) != fingerprint
+
+    # Dataframes
+    df = pd.DataFrame({'a': [1, 2], 'b': [3, 4]})
+    fingerprint = get_fingerprint(df)
+    df.columns = ['c', 'd']
+    assert get_fingerprint(df) != fingerprint
+
+    # Values that can't be fingerprinted
+    assert get_fingerprint([1, 2]) is None
+    assert get_fingerprint(np.array([object()])) is None
+
+
+def test_view_row_cache():
+    """Test that view rows are cached and invalidated."""
+    cache = ViewRowCache(maxsize=2)
+    key = get_settings_key(SETTINGS)
+    arr = np.arange(3)
+    row, fingerprint = cache.get(arr, key)
+    assert row is None
+    cache.put(arr, key, fingerprint, {'view': 'a'})
+    assert cache.get(arr, key)[0] == {'view': 'a'}
+
+    # Different settings
+    minmax_key = get_settings_key(dict(SETTINGS, minmax=True))
+    assert cache.get(arr, minmax_key)[0] is None
+
+    # Changes in the value
+    cache.put(arr, key, fingerprint, {'view': 'a'})
+    arr[0] = 10
+    assert cache.get(arr, key)[0] is None
+
+    # LRU eviction
+    arrays = [np.arange(i + 1) for i in range(3)]
+    for a in arrays:
+        cache.put(a, key, get_fingerprint(a), {'view': 'a'})
+    assert len(cache) == 2
+    assert cache.get(arrays[0], key)[0] is None
+    assert cache.get(arrays[2], key)[0] is not None
+
+    # The global cache is used by make_view_row
+    VIEW_ROW_CACHE.clear()
+    arr = np.arange(3)
+    row = make_view_row(arr, SETTINGS)
+    assert VIEW_ROW_CACHE.get(arr, key)[0] == row
+    arr[0] = 10
+    assert make_view_row(arr, SETTINGS)['view'] == '[10  1  2]'
+
+    # And depends on the Numpy print options
+    arr = np.array([0.123456])
+    make_view_row(arr, SETTINGS)
+    with np.printoptions(precision=2):
+        assert make_view_row(arr, SETTINGS)['view'] == '[0.12]'
+
+    # The displayed elements of big arrays are always fingerprinted
+    arr = np.zeros(10000)
+    make_view_row(arr, SETTINGS)
+    arr[1] = 5
+    assert make_view_row(arr, SETTINGS)['view'].startswith('[0. 5. 0.')
+
+
+def test_make_remote_snapshot_time_budget():
+    """Test that slow values are detected and deferred."""
+    class SlowInt(int):
+        def __repr__(self):
+            time.sleep(0.2)
+            return super().__repr__()
+
+    data = {'a': 1, 'slow': SlowInt(2)}
+    slow_values = {}
+
+    # Without a time budget everything is computed, but slow values are
+    # tracked.
+    view, __ = make_remote_snapshot(data, SETTINGS, slow_values=slow_values)
+    assert view['slow']['view'] == '2'
+    assert slow_values == {'slow': SlowInt}
+
+    # With a time budget, slow values are deferred
+    view, properties = make_remote_snapshot(
+        data, SETTINGS, time_budget=10, slow_values=slow_values)
+    assert view['a']['view'] == '1'
+    assert 'pending' not in view['a']
+    assert view['slow']['view'] == PENDING_VIEW
+    assert view['slow']['pending']
+    assert view['slow']['memory'] is None
+    assert view['slow']['python_type'].endswith('SlowInt')
+    assert properties['slow']['len'] == 1
+
+    # Values are no longer deferred if they become fast
+    data['slow'] = 3
+    view, __ = make_remote_snapshot(
+        data, SETTINGS, time_budget=10, slow_values=slow_values)
+    assert view['slow']['view'] == '3'
+    assert slow_values == {}
+
+
+def test_make_remote_snapshot_tracker(monkeypatch):
+    """Test that snapshots with a tracker only compute the changed rows."""
+    from spyder_kernels.utils import nsview
+    computed = []
+
+    def make_row(value, *args, **kwargs):
+        computed.append(value)
+        return make_view_row(value, *args, **kwargs)
+
+    monkeypatch.setattr(nsview, 'make_view_row', make_row)
+    tracker = NamespaceTracker()
+    arr = np.zeros(3)
+    lst = [1]
+    data = {'a': 1, 'arr': arr, 'lst': lst, '_private': 2}
+
+    view, properties = make_remote_snapshot(data, SETTINGS, tracker=tracker)
+    assert len(computed) == 3
+    assert view == make_remote_view(data, SETTINGS)
+
+    # Rebound names are computed again, as well as values that can change
+    # in place without a fingerprint.
+    computed.clear()
+    data = {'a': 2, 'arr': arr, 'lst': lst, '_private': 2, 'b': 'x'}
+    view, properties = make_remote_snapshot(data, SETTINGS, tracker=tracker)
+    assert computed == [2, lst, 'x']
+    assert view == make_remote_view(data, SETTINGS)
+    assert properties == {k: make_var_properties(data[k]) for k in view}
+
+    # Changes of values with a fingerprint are detected
+    computed.clear()
+    arr[0] = 1
+    del data['b']
+    view, __ = make_remote_snapshot(data, SETTINGS, tracker=tracker)
+    assert 'b' not in view
+    assert computed == [arr, lst]
+    assert len(tracker) == 4
+
+    # Names marked as dirty are computed again
+    computed.clear()
+    tracker.mark_dirty('a')
+    make_remote_snapshot(data, SETTINGS, tracker=tracker)
+    assert computed == [2, lst]
+
+    # Big arrays are computed again after running code, because their
+    # fingerprint only samples them.
+    big = np.zeros(100000)
+    data['big'] = big
+    make_remote_snapshot(data, SETTINGS, tracker=tracker)
+    computed.clear()
+    tracker.invalidate_sampled()
+    make_remote_snapshot(data, SETTINGS, tracker=tracker)
+    assert computed == [lst, big]
+
+    # Unless other names are given
+    computed.clear()
+    tracker.invalidate_sampled(['a'])
+    make_remote_snapshot(data, SETTINGS, tracker=tracker)
+    assert computed == [lst]
+
+    # Values that can't be weakly referenced are not kept alive
+    ref = weakref.ref(arr)
+    data['lst'] = [arr]
+    make_remote_snapshot(data, SETTINGS, tracker=tracker)
+    computed.clear()
+    del data['lst'], data['arr'], arr
+    assert ref() is None
+    del data['big']
+
+    # Changing the settings makes all names change
+    computed.clear()
+    settings = dict(SETTINGS, exclude_private=False)
+    view, __ = make_remote_snapshot(data, settings, tracker=tracker)
+    assert '_private' in view
+    assert computed == [2, 2]
+
+    # And so does changing the Numpy print options
+    computed.clear()
+    with np.printoptions(precision=2):
+        make_remote_snapshot(data, settings, tracker=tracker)
+    assert computed == [2, 2]
+
+
+def test_namespace_tracker_update_row():
+    """Test that pending rows completed later are reused."""
+    tracker = NamespaceTracker()
+    arr = np.zeros(3)
+    data = {'arr': arr}
+    view, __ = make_remote_snapshot(
+        data, SETTINGS, time_budget=0, tracker=tracker)
+    assert view['arr']['pending']
+
+    row = make_view_row(arr, SETTINGS)
+    tracker.update_row('arr', arr, row)
+    view, __ = make_remote_snapshot(
+        data, SETTINGS, time_budget=0, tracker=tracker)
+    assert view['arr'] == row
+
+    # Rows of other values are ignored
+    tracker.update_row('arr', np.ones(3), {'view': 'other'})
+    view, __ = make_remote_snapshot(
+        data, SETTINGS, time_budget=0, tracker=tracker)
+    assert view['arr'] == row
+
+
+def test_get_modifiable_names():
+    """Test finding the names that running code can modify in place."""
+    namespace = {}
+    exec(
+        "import numpy as np\n"
+        "import pandas as pd\n"
+        "a = np.zeros(10)\n"
+        "view = a[:5]\n"
+        "b = np.zeros(10)\n"
+        "df = pd.DataFrame({'c': [1]})\n"
+        "lst = [a]\n"
+        "x = 1\n"
+        "def f():\n"
+        "    b[0] = x\n",
+        namespace
+    )
+
+    def get_names(code):
+        return get_modifiable_names(ast.parse(code).body, namespace)
+
+    assert get_names("x = 2; print(x)") == set()
+
+    # Arrays, the arrays sharing their data and dataframes
+    assert get_names("a[0] = np.sum(b)") == {'a', 'view', 'b', 'df'}
+
+    # Functions defined in the namespace use their globals
+    assert get_names("f()") == {'b', 'df'}
+
+    # Anything can change through containers, dataframes and magics
+    assert get_names("lst[0][1] = 2") is None
+    assert get_names("df['c'] = 2") is None
+    assert get_names("get_ipython().run_line_magic('reset', '-f')") is None
+
+
+def test_minmax_time_budget(monkeypatch):
+    """
+    Test that rows with approximate min and max values are marked as pending
+    and not cached.
+    """
+    monkeypatch.setattr(arraystats, 'CHUNK_NBYTES', 800)
+    settings = dict(SETTINGS, minmax=True)
+    arr = np.arange(10000.)
+
+    row = make_view_row(arr, settings, minmax_time_budget=0)
+    assert row['view'] == 'Min: ~np.float64(0.0)\nMax: ~np.float64(9999.0)'
+    assert row['pending']
+    assert VIEW_ROW_CACHE.get(arr, get_settings_key(settings))[0] is None
+
+    # Without a time budget the exact values are computed
+    row = make_view_row(arr, settings)
+    assert row['view'] == 'Min: np.float64(0.0)\nMax: np.float64(9999.0)'
+    assert 'pending' not in row
+    assert VIEW_ROW_CACHE.get(arr, get_settings_key(settings))[0] == row
+
+
+def test_register_type_handler():
+    """Test registering handlers to build the view of custom types."""
+    class Custom:
+        def __len__(self):
+            raise RuntimeError
+
+    class SubCustom(Custom):
+        pass
+
+    try:
+        register_type_handler(
+            Custom,
+            display=lambda value, level, **options: 'Custom at %s' % level,
+            readable_type=lambda value: 'Custom thing',
+            size=lambda value: 42,
+            editable=lambda value: True
+        )
+        for value in [Custom(), SubCustom()]:
+            assert value_to_display(value) == 'Custom at 0'
+            assert value_to_display([value]) == '[Custom at 1]'
+            assert get_human_readable_type(value) == 'Custom thing'
+            assert get_size(value) == 42
+            assert is_editable_type(value)
+    finally:
+        TYPE_HANDLERS._by_type.pop(Custom)
+        TYPE_HANDLERS._cache.clear()
+
+    assert value_to_display(Custom()).startswith('Custom object')
+    assert get_size(Custom()) == 1
+
+
+def test_view_does_not_import_libraries():
+    """
+    Test that building the view of a namespace doesn't import Numpy, Pandas,
+    PIL or bs4 if they were not imported before.
+    """
+    code = (
+        "import datetime, sys\n"
+        "from spyder_kernels.utils.nsview import (\n"
+        "    make_remote_snapshot, is_editable_type)\n"
+        "data = {'a': 1, 'b': [1.5, 'c'], 'd': {1: b'e'},\n"
+        "        'f': datetime.date.today(), 'g': object()}\n"
+        "make_remote_snapshot(data, %r)\n"
+        "[is_editable_type(value) for value in data.values()]\n"
+        "print([m for m in ['numpy', 'pandas', 'PIL', 'bs4']\n"
+        "       if m in sys.modules])\n"
+    ) % dict(SETTINGS, minmax=True)
+    output = subprocess.check_output([sys.executable, '-c', code])
+    assert output.decode().strip() == '[]'
+
+
+def test_get_memory_size():
+    """Test the estimation of the memory used by values."""
+    arr = np.zeros((100, 10))
+    assert get_memory_size(arr) == arr.nbytes
+
+    df = pd.DataFrame({'a': range(100), 'b': ['x' * 100] * 100})
+    assert get_memory_size(df) == df.memory_usage(deep=True).sum()
+    assert get_memory_size(df['b']) == df['b'].memory_usage(deep=True)
+
+    # Shared objects are counted once
+    text = 'x' * 10000
+    assert (
+        get_memory_size([text, text]) ==
+        sys.getsizeof([text, text]) + sys.getsizeof(text)
+    )
+
+    # Items of dicts and attributes of instances are included
+    class Foo:
+        def __init__(self):
+            self.arr = arr
+
+    assert get_memory_size({'a': arr}) > arr.nbytes
+    assert get_memory_size(Foo()) > arr.nbytes
+
+    # The walk is bounded
+    data = [[i] for i in range(1000)]
+    assert get_memory_size(data, node_budget=10) < get_memory_size(data)
+    assert get_memory_size(data, time_budget=-1) == 0
+
+    # Memory is part of the view
+    assert make_view_row(arr, SETTINGS)['memory'] == arr.nbytes
+
+
+def test_memory_pandas(monkeypatch):
+    """
+    Test that the memory of the objects of big dataframes is estimated from
+    a sample, and that it's cached while their data doesn't change.
+    """
+    monkeypatch.setattr(nsview, 'MEMORY_NODE_BUDGET', 100)
+    df = pd.DataFrame({'a': range(1000), 'b': ['x' * 100] * 1000})
+    assert get_memory_size(df) == df.memory_usage(deep=True).sum()
+    df['b'] = [str(i) * 10 for i in range(1000)]
+    memory = df.memory_usage(deep=True).sum()
+    assert get_memory_size(df) == pytest.approx(memory, rel=0.05)
+    index = pd.Index(['x' * 100] * 1000)
+    assert get_memory_size(index) == index.memory_usage(deep=True)
+
+    calls = []
+    estimate_memory = nsview._estimate_memory_pandas
+
+    def estimate_memory_pandas(value):
+        calls.append(value)
+        return estimate_memory(value)
+
+    monkeypatch.setattr(
+        nsview, '_estimate_memory_pandas', estimate_memory_pandas)
+    get_memory_size(df)
+    get_memory_size(df)
+    assert calls == []
+
+    # Entries are kept after running code
+    PANDAS_MEMORY_CACHE.invalidate_sampled()
+    get_memory_size(df)
+    assert calls == []
+
+    # But not after changes of the data
+    df['c'] = 1
+    get_memory_size(df)
+    assert len(calls) == 1
+
+
+def test_make_children_view():
+    """Test browsing the children of nested values."""
+    class Foo:
+        def __init__(self):
+            self.x = [1, 2]
+            self.arr = np.zeros(3)
+
+        def method(self):
+            pass
+
+    data = {'a': {'b': [10, {'c': 'd'}]}, (1, 2): {5}, 'foo': Foo()}
+
+    view = make_children_view(data, SETTINGS)
+    assert view['total'] == 3
+    labels = [child['label'] for child in view['children']]
+    assert labels == ["'a'", '(1, 2)', "'foo'"]
+    steps = [child['step'] for child in view['children']]
+    assert steps == [['key', 'a'], ['item', 1], ['key', 'foo']]
+    assert all(child['has_children'] for child in view['children'])
+
+    # Pagination
+    view = make_children_view(data, SETTINGS, offset=1, limit=1)
+    assert [child['step'] for child in view['children']] == [['item', 1]]
+    assert view['children'][0]['view'] == '{5}'
+
+    # Paths
+    path = [['key', 'a'], ['key', 'b'], ['index', 1]]
+    view = make_children_view(resolve_path(data, path), SETTINGS)
+    assert view['children'][0]['view'] == 'd'
+    assert not view['children'][0]['has_children']
+    assert resolve_path(data, [['item', 1], ['item', 0]]) == 5
+
+    # Attributes of objects
+    view = make_children_view(data['foo'], SETTINGS)
+    assert [child['label'] for child in view['children']] == ['arr', 'x']
+    assert not view['children'][0]['has_children']
+    assert resolve_path(data, [['key', 'foo'], ['attr', 'x']]) == [1, 2]
+    view = make_children_view(
+        data['foo'], dict(SETTINGS, show_callable_attributes=True))
+    assert 'method' in [child['label'] for child in view['children']]
+
+    with pytest.raises(IndexError):
+        resolve_path(data, [['item', 5]])
+
+
 if __name__ == "__main__":
     pytest.main()
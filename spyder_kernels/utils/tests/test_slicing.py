@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for slicing.py
+"""
+
+# Third party imports
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local imports
+from spyder_kernels.utils.slicing import get_slice, make_index, set_slice
+
+
+def test_make_index():
+    """Test the conversion of JSON-able indexes."""
+    assert make_index(None) == ()
+    assert make_index(3) == (3,)
+    assert make_index([None, [1, 5], [0, 10, 2], '...']) == (
+        slice(None), slice(1, 5), slice(0, 10, 2), Ellipsis)
+
+    with pytest.raises(TypeError):
+        make_index([1.5])
+    with pytest.raises(ValueError):
+        make_index([[1, 2, 3, 4]])
+
+
+def test_get_slice_array(tmpdir):
+    """Test getting blocks of arrays."""
+    arr = np.arange(100).reshape(10, 10)
+    assert np.array_equal(get_slice(arr, rows=[2, 4]), arr[2:4])
+    assert np.array_equal(
+        get_slice(arr, rows=[2, 4], columns=[5, 10]), arr[2:4, 5:10])
+    assert np.array_equal(get_slice(arr, index=[None, 3]), arr[:, 3])
+
+    # Non-contiguous blocks are copied to be contiguous
+    block = get_slice(arr, columns=[0, 2])
+    assert block.flags.c_contiguous
+
+    # Blocks of memory maps are plain arrays
+    mmap = np.memmap(
+        str(tmpdir.join('data.dat')), dtype=np.float64, mode='w+',
+        shape=(1000, 10))
+    mmap[5] = 1
+    block = get_slice(mmap, rows=[5, 7])
+    assert type(block) is np.ndarray
+    assert np.array_equal(block, mmap[5:7])
+
+    # rows and columns can't be used with index
+    with pytest.raises(ValueError):
+        get_slice(arr, rows=[0, 1], index=[0])
+
+
+def test_get_slice_pandas():
+    """Test getting blocks of dataframes and series."""
+    df = pd.DataFrame({'a': range(100), 'b': ['x'] * 100, 'c': 1.5})
+    block = get_slice(df, rows=[10, 20], columns=[1, 3])
+    assert block.equals(df.iloc[10:20, 1:3])
+
+    series = df['a']
+    assert get_slice(series, rows=[5, 8], columns=[0, 1]).equals(
+        series.iloc[5:8])
+
+
+def test_get_slice_other():
+    """Test getting blocks of sequences and unsupported values."""
+    assert get_slice(list(range(10)), rows=[2, 4]) == [2, 3]
+
+    with pytest.raises(TypeError):
+        get_slice({'a': 1}, rows=[0, 1])
+
+
+def test_set_slice_array(tmpdir):
+    """Test setting blocks of arrays in place."""
+    arr = np.zeros((5, 5))
+    set_slice(arr, 1, rows=[1, 2])
+    assert (arr[1] == 1).all()
+    set_slice(arr, [[2, 3]], rows=[0, 1], columns=[0, 2])
+    assert arr[0, :3].tolist() == [2, 3, 0]
+    set_slice(arr, 7, index=[4, 4])
+    assert arr[4, 4] == 7
+
+    # Values of a different kind are rejected
+    arr = np.zeros(5, dtype=int)
+    with pytest.raises(TypeError):
+        set_slice(arr, 1.5, rows=[0, 1])
+    with pytest.raises(TypeError):
+        set_slice(arr, 'a', rows=[0, 1])
+    assert (arr == 0).all()
+
+    # Memory maps are modified in place
+    filename = str(tmpdir.join('data.dat'))
+    mmap = np.memmap(filename, dtype=np.float64, mode='w+', shape=(100,))
+    set_slice(mmap, 3, rows=[10, 20])
+    mmap.flush()
+    assert np.fromfile(filename)[10:20].tolist() == [3] * 10
+
+
+def test_set_slice_pandas():
+    """Test setting blocks of dataframes and series in place."""
+    df = pd.DataFrame({'a': range(5), 'b': ['x'] * 5, 'c': 1.5})
+    set_slice(df, 10, index=[2, 0])
+    assert df['a'].tolist() == [0, 1, 10, 3, 4]
+    set_slice(df, 'y', rows=[0, 2], columns=[1, 2])
+    assert df['b'].tolist() == ['y', 'y', 'x', 'x', 'x']
+    set_slice(df, [[5]], rows=[4, 5], columns=[0, 1])
+    assert df['a'].iloc[4] == 5
+
+    # Values of a different kind are rejected
+    with pytest.raises(TypeError):
+        set_slice(df, 'z', rows=[0, 1], columns=[0, 1])
+    with pytest.raises(TypeError):
+        set_slice(df, pd.DataFrame({'a': [1.5], 'c': [1.5]}), rows=[0, 1],
+                  columns=[0, 3])
+    assert df['a'].dtype == np.int64
+
+    series = pd.Series([1.0, 2.0])
+    set_slice(series, 5, index=[1])
+    assert series.tolist() == [1.0, 5.0]
+
+    with pytest.raises(TypeError):
+        set_slice((1, 2), 3, rows=[0, 1])
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for summary.py
+"""
+
+# Standard library imports
+import json
+
+# Third party imports
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local imports
+from spyder_kernels.utils import arraystats
+from spyder_kernels.utils.summary import get_summary, SummaryCache
+
+
+@pytest.fixture
+def array():
+    array = np.random.rand(1000)
+    array[::10] = np.nan
+    return array
+
+
+def test_array_summaries(array, monkeypatch):
+    """Test the summaries of arrays."""
+    series = pd.Series(array)
+
+    describe = get_summary(array, 'describe')
+    assert describe == pytest.approx(series.describe().to_dict())
+
+    quantiles = get_summary(array, 'quantiles', quantiles=[0.1, 0.9])
+    assert quantiles['exact']
+    assert quantiles['values'] == pytest.approx(
+        series.quantile([0.1, 0.9]).tolist())
+
+    # Histograms are computed in chunks
+    monkeypatch.setattr(arraystats, 'CHUNK_NBYTES', 800)
+    histogram = get_summary(array, 'histogram', bins=10)
+    counts, edges = np.histogram(array[~np.isnan(array)], bins=10)
+    assert histogram['counts'] == counts.tolist()
+    assert histogram['edges'] == pytest.approx(edges.tolist())
+
+    assert get_summary(array, 'null_counts') == 100
+    assert get_summary(array.reshape(100, 10), 'null_counts') == (
+        [100] + [0] * 9)
+
+    # Summaries are JSON-able
+    for kind in ['describe', 'quantiles', 'histogram', 'null_counts']:
+        json.dumps(get_summary(array, kind))
+
+    with pytest.raises(TypeError):
+        get_summary(np.array(['a']), 'describe')
+    with pytest.raises(ValueError):
+        get_summary(array, 'foo')
+
+
+def test_dataframe_summaries(array):
+    """Test the summaries of dataframes."""
+    df = pd.DataFrame({'a': array, 'b': ['x'] * 1000, 'c': np.nan})
+    assert get_summary(df, 'describe')['a'] == pytest.approx(
+        df['a'].describe().to_dict())
+    assert set(get_summary(df, 'quantiles')['values']) == {'a', 'c'}
+
+    histogram = get_summary(df, 'histogram', bins=5)
+    assert set(histogram) == {'a', 'c'}
+    assert sum(histogram['a']['counts']) == 900
+    assert sum(histogram['c']['counts']) == 0
+
+    assert get_summary(df, 'null_counts') == {'a': 100, 'b': 0, 'c': 1000}
+    assert get_summary(df['a'], 'null_counts') == 100
+
+    with pytest.raises(TypeError):
+        get_summary([1, 2], 'describe')
+
+
+def test_summary_cache(array):
+    """Test that summaries are cached until values change."""
+    cache = SummaryCache()
+    df = pd.DataFrame({'a': array})
+    summary = cache.get_summary(df, 'describe')
+    assert cache.get_summary(df, 'describe') is summary
+    assert len(cache) == 1
+
+    # Different arguments are different entries
+    cache.get_summary(df, 'histogram', bins=5)
+    assert len(cache) == 2
+
+    # Changes of the data are detected
+    df.iloc[0, 0] = 100
+    assert cache.get_summary(df, 'describe')['a']['max'] == 100
+
+    cache.invalidate(df)
+    assert len(cache) == 0
+
+
+if __name__ == "__main__":
+    pytest.main()
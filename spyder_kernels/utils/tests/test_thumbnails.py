@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for thumbnails.py
+"""
+
+# Standard library imports
+import io
+
+# Third party imports
+import numpy as np
+import PIL.Image
+import pytest
+
+# Local imports
+from spyder_kernels.utils.thumbnails import (
+    is_image_like, make_thumbnail, reduce_array, ThumbnailCache, to_uint8)
+
+
+def load_png(data):
+    """Decode PNG data into an array."""
+    return np.asarray(PIL.Image.open(io.BytesIO(data)))
+
+
+def test_is_image_like():
+    """Test detecting images and image-like arrays."""
+    assert is_image_like(np.zeros((10, 10)))
+    assert is_image_like(np.zeros((10, 10, 3), dtype=np.uint8))
+    assert is_image_like(PIL.Image.new('RGB', (5, 5)))
+    assert not is_image_like(np.zeros((10, 10, 2)))
+    assert not is_image_like(np.zeros(10))
+    assert not is_image_like(np.zeros((10, 10), dtype=complex))
+    assert not is_image_like([[1, 2]])
+
+
+def test_reduce_array():
+    """Test reducing arrays by averaging blocks."""
+    arr = np.arange(16.).reshape(4, 4)
+    reduced = reduce_array(arr, max_size=2)
+    assert reduced.shape == (2, 2, 1)
+    assert reduced[..., 0].tolist() == [[2.5, 4.5], [10.5, 12.5]]
+
+    # Big arrays are subsampled first
+    big = np.ones((10000, 5000, 3), dtype=np.uint8)
+    assert reduce_array(big, max_size=100).shape == (100, 50, 3)
+
+
+def test_to_uint8():
+    """Test converting pixels to 8 bits."""
+    values = np.array([[0, 0.5, 1]])
+    assert to_uint8(values, np.dtype(float)).tolist() == [[0, 128, 255]]
+    values = np.array([[0, 10, 200]], dtype=float)
+    assert to_uint8(values, np.dtype(np.int64)).tolist() == [[0, 10, 200]]
+    values = np.array([[-1, 0, 1000, np.nan]])
+    assert to_uint8(values, np.dtype(float)).tolist() == [[0, 0, 255, 0]]
+
+
+def test_make_thumbnail():
+    """Test making thumbnails of arrays and images."""
+    arr = np.zeros((300, 600, 3), dtype=np.uint8)
+    arr[:, :300, 0] = 255
+    pixels = load_png(make_thumbnail(arr, max_size=100))
+    assert pixels.shape == (50, 100, 3)
+    assert pixels[0, 0].tolist() == [255, 0, 0]
+    assert pixels[0, -1].tolist() == [0, 0, 0]
+
+    # Grayscale
+    pixels = load_png(make_thumbnail(np.eye(10) > 0))
+    assert pixels.shape == (10, 10)
+    assert pixels[0, 0] == 255 and pixels[0, 1] == 0
+
+    # PIL images
+    image = PIL.Image.new('P', (400, 200))
+    pixels = load_png(make_thumbnail(image, max_size=100))
+    assert pixels.shape == (50, 100, 3)
+
+    with pytest.raises(TypeError):
+        make_thumbnail(np.zeros(10))
+
+
+def test_thumbnail_cache():
+    """Test the cache of thumbnails."""
+    cache = ThumbnailCache()
+    arr = np.zeros((20, 20))
+    thumbnail = cache.get_thumbnail(arr)
+    assert cache.get_thumbnail(arr) is thumbnail
+
+    arr[0, 0] = 1
+    assert cache.get_thumbnail(arr) != thumbnail
+
+    image = PIL.Image.new('L', (20, 20))
+    thumbnail = cache.get_thumbnail(image)
+    assert cache.get_thumbnail(image) is thumbnail
+    image.putpixel((19, 19), 255)
+    assert cache.get_thumbnail(image) != thumbnail
+    assert len(cache) == 2
+
+    cache.invalidate(image)
+    assert len(cache) == 1
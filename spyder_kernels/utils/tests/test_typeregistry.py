@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for typeregistry.py
+"""
+
+# Standard library imports
+import sys
+import types
+
+# Third party imports
+import pytest
+
+# Local imports
+from spyder_kernels.utils.typeregistry import resolve_type, TypeRegistry
+
+
+class Base:
+    pass
+
+
+class Child(Base):
+    pass
+
+
+class GrandChild(Child):
+    pass
+
+
+def test_lookup_mro():
+    """Test that handlers are found by walking the MRO."""
+    registry = TypeRegistry()
+    registry.register(Base, {'display': 'base'})
+    registry.register(Child, {'size': 'child'})
+
+    assert registry.lookup(GrandChild, 'display') == 'base'
+    assert registry.lookup(GrandChild, 'size') == 'child'
+    assert registry.lookup(Base, 'size') is None
+    assert registry.lookup(int, 'display') is None
+
+    # Results are cached until a new registration
+    assert registry._cache[GrandChild] == {'display': 'base', 'size': 'child'}
+    registry.register(GrandChild, {'display': 'grandchild'})
+    assert GrandChild not in registry._cache
+    assert registry.lookup(GrandChild, 'display') == 'grandchild'
+
+
+def test_exact_type():
+    """Test handlers that don't apply to subclasses."""
+    registry = TypeRegistry()
+    registry.register(Base, {'display': 'base'})
+    registry.register(Child, {'display': 'child'}, subclasses=False)
+
+    assert registry.lookup(Child, 'display') == 'child'
+    assert registry.lookup(GrandChild, 'display') == 'base'
+
+
+def test_register_by_name(monkeypatch):
+    """Test that types registered by name are resolved after their import."""
+    registry = TypeRegistry()
+    registry.register('fake_module.Base', {'display': 'base'})
+    assert resolve_type('fake_module.Base') is None
+    assert registry.lookup(Child, 'display') is None
+
+    module = types.ModuleType('fake_module')
+    module.Base = Base
+    module.not_a_type = 1
+    monkeypatch.setitem(sys.modules, 'fake_module', module)
+    assert resolve_type('fake_module.Base') is Base
+    assert resolve_type('fake_module.not_a_type') is None
+
+    # Registering a new type forces resolving the pending names
+    registry.register(int, {'display': 'int'})
+    assert registry.lookup(Child, 'display') == 'base'
+    assert registry._by_name == {}
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Thumbnails of images and image-like arrays.
+
+They are small PNG images used by the Variable Explorer to preview images
+without transferring them. Big images are first subsampled with a stride
+and then reduced by averaging blocks of pixels, so the time to make a
+thumbnail doesn't depend much on the size of the image.
+"""
+
+import io
+import struct
+import zlib
+
+from spyder_kernels.utils.arraystats import (
+    array_fingerprint, is_fingerprint_sampled)
+from spyder_kernels.utils.cache import FingerprintCache
+from spyder_kernels.utils.lazymodules import numpy as np
+from spyder_kernels.utils.typeregistry import isinstance_by_name
+
+
+# Default maximum width and height of thumbnails
+THUMBNAIL_SIZE = 256
+
+# Maximum number of pixels averaged in each direction to make a thumbnail
+# pixel. Images that need bigger blocks are subsampled first.
+AREA_SAMPLES = 4
+
+# Number of pixels sampled in each direction to fingerprint PIL images
+IMAGE_FINGERPRINT_SAMPLES = 8
+
+
+def is_image_like(value):
+    """
+    Check if value is a PIL image or an array that can be shown as one.
+
+    These are two-dimensional arrays (grayscale) and three-dimensional ones
+    with 1, 3 (RGB) or 4 (RGBA) channels, of real numbers or booleans.
+    """
+    if isinstance_by_name(value, 'PIL.Image.Image'):
+        return True
+    if not isinstance_by_name(value, 'numpy.ndarray'):
+        return False
+    if value.ndim == 3:
+        if value.shape[2] not in (1, 3, 4):
+            return False
+    elif value.ndim != 2:
+        return False
+    return value.size > 0 and (
+        np.issubdtype(value.dtype, np.bool_)
+        or np.issubdtype(value.dtype, np.integer)
+        or np.issubdtype(value.dtype, np.floating)
+    )
+
+
+def _check_image_like(value):
+    if not is_image_like(value):
+        raise TypeError(
+            "Values of type {} are not images".format(type(value).__name__))
+
+
+def _thumbnail_shape(height, width, max_size):
+    """Get the shape of the thumbnail of an image of height x width."""
+    scale = min(1, max_size / max(height, width))
+    return max(1, round(height * scale)), max(1, round(width * scale))
+
+
+def reduce_array(value, max_size=THUMBNAIL_SIZE):
+    """
+    Reduce image-like array *value* to at most `max_size` pixels per side.
+
+    The array is subsampled with a stride (which doesn't copy it) so that
+    at most `AREA_SAMPLES` pixels per direction are averaged for each pixel
+    of the result. Return a float64 array with three dimensions.
+    """
+    if value.ndim == 2:
+        value = value[:, :, np.newaxis]
+    height, width = value.shape[:2]
+    factor = -(-max(height, width) // max_size)
+    if factor > 1:
+        step = max(1, factor // AREA_SAMPLES)
+        value = value[::step, ::step]
+        height, width = value.shape[:2]
+        factor = -(-max(height, width) // max_size)
+
+    # Average blocks of factor x factor pixels. The last rows and columns
+    # are dropped if they don't fill a block.
+    rows, columns = max(1, height // factor), max(1, width // factor)
+    block = value[:rows * factor, :columns * factor].astype(np.float64)
+    block = block.reshape(
+        rows, block.shape[0] // rows, columns, block.shape[1] // columns, -1)
+    if np.isnan(block).any():
+        return np.nanmean(block, axis=(1, 3))
+    return block.mean(axis=(1, 3))
+
+
+def to_uint8(value, dtype):
+    """
+    Convert the reduced image *value* to 8-bit pixels.
+
+    `dtype` is the type of the original image. Like in most image
+    libraries, booleans are black and white, floats between 0 and 1 are
+    scaled to 255 and integers between 0 and 255 are kept. Other values are
+    rescaled to their range, and nans become zeros.
+    """
+    finite = value[np.isfinite(value)]
+    if finite.size == 0:
+        return np.zeros(value.shape, dtype=np.uint8)
+    low, high = finite.min(), finite.max()
+    if dtype.kind == 'b' or (dtype.kind == 'f' and low >= 0 and high <= 1):
+        value = value * 255
+    elif low < 0 or high > 255 or dtype.kind == 'f':
+        value = (value - low) * (255 / (high - low) if high > low else 0)
+    value = np.nan_to_num(value, nan=0, posinf=255, neginf=0)
+    return np.clip(np.rint(value), 0, 255).astype(np.uint8)
+
+
+def encode_png(pixels):
+    """
+    Encode an array of 8-bit pixels as PNG.
+
+    The array has two dimensions (grayscale) or three with 1, 3 (RGB) or 4
+    (RGBA) channels.
+    """
+    if pixels.ndim == 2:
+        pixels = pixels[:, :, np.newaxis]
+    height, width, channels = pixels.shape
+    color_type = {1: 0, 3: 2, 4: 6}[channels]
+
+    def chunk(kind, data):
+        return (
+            struct.pack('>I', len(data)) + kind + data
+            + struct.pack('>I', zlib.crc32(kind + data))
+        )
+
+    # Each row starts with its filter type (0, no filter)
+    rows = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    rows[:, 1:] = pixels.reshape(height, -1)
+    header = struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0)
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', header)
+        + chunk(b'IDAT', zlib.compress(rows.tobytes()))
+        + chunk(b'IEND', b'')
+    )
+
+
+def _image_thumbnail(value, max_size):
+    """Get the PNG thumbnail of PIL image value."""
+    width, height = value.size
+    thumbnail_height, thumbnail_width = _thumbnail_shape(
+        height, width, max_size)
+    # reducing_gap makes PIL reduce the image by whole factors first
+    thumbnail = value.resize(
+        (thumbnail_width, thumbnail_height), reducing_gap=AREA_SAMPLES)
+    if thumbnail.mode not in ('L', 'RGB', 'RGBA'):
+        has_alpha = (
+            'A' in thumbnail.getbands() or 'transparency' in thumbnail.info)
+        thumbnail = thumbnail.convert('RGBA' if has_alpha else 'RGB')
+    output = io.BytesIO()
+    thumbnail.save(output, format='PNG')
+    return output.getvalue()
+
+
+def make_thumbnail(value, max_size=THUMBNAIL_SIZE):
+    """
+    Make a PNG thumbnail of *value*.
+
+    Parameters
+    ----------
+    value: PIL.Image.Image or numpy.ndarray
+        The image or an image-like array (see `is_image_like`).
+    max_size: int
+        Maximum width and height of the thumbnail. Smaller images keep
+        their size.
+
+    Returns
+    -------
+    The PNG image, as bytes.
+    """
+    _check_image_like(value)
+    if isinstance_by_name(value, 'PIL.Image.Image'):
+        return _image_thumbnail(value, max_size)
+
+    reduced = reduce_array(value, max_size)
+    return encode_png(to_uint8(reduced, value.dtype))
+
+
+# ---- Cache
+def thumbnail_fingerprint(value):
+    """
+    Get a fingerprint of value that changes when its pixels do.
+
+    Arrays use `array_fingerprint`. PIL images use a grid of sampled
+    pixels, so changes of the pixels that are not sampled are not detected.
+    """
+    if isinstance_by_name(value, 'numpy.ndarray'):
+        return array_fingerprint(value)
+    width, height = value.size
+    samples = IMAGE_FINGERPRINT_SAMPLES
+    pixels = tuple(
+        value.getpixel((x * (width - 1) // (samples - 1),
+                        y * (height - 1) // (samples - 1)))
+        for x in range(samples) for y in range(samples)
+    )
+    return (type(value), value.mode, value.size, pixels)
+
+
+class ThumbnailCache(FingerprintCache):
+    """
+    LRU cache of thumbnails.
+
+    Entries are keyed by the identity of the values and the thumbnail size,
+    and are only valid while the values are alive and their fingerprint
+    (see `thumbnail_fingerprint`) doesn't change.
+    """
+
+    def __init__(self, maxsize=100):
+        super().__init__(maxsize)
+
+    def get_thumbnail(self, value, max_size=THUMBNAIL_SIZE):
+        """Get the thumbnail of value (see `make_thumbnail`)."""
+        _check_image_like(value)
+        return self._get(
+            (id(value), max_size),
+            value,
+            thumbnail_fingerprint(value),
+            lambda: make_thumbnail(value, max_size)
+        )
+
+    def _is_sampled(self, value, key):
+        return (
+            not isinstance_by_name(value, 'numpy.ndarray')
+            or is_fingerprint_sampled(value)
+        )
+
+
+THUMBNAIL_CACHE = ThumbnailCache()
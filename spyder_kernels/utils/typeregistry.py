@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Registry to map types to handler functions.
+
+Handlers are found by walking the MRO of types and the result is cached per
+type. Types can be registered by their import path, so that they are
+resolved only after their module has been imported by someone else.
+"""
+
+import sys
+import threading
+import weakref
+
+
+def resolve_type(name):
+    """
+    Get the type with import path `name` (e.g. 'pandas.DataFrame').
+
+    This never imports anything: None is returned if the type's module
+    (e.g. 'pandas') is not in `sys.modules` or doesn't have the type.
+    """
+    module_name, __, attr = name.rpartition('.')
+    module = sys.modules.get(module_name)
+    if module is None:
+        return None
+    cls = getattr(module, attr, None)
+    if isinstance(cls, type):
+        return cls
+    return None
+
+
+def isinstance_by_name(value, names):
+    """
+    Check if value is an instance of the types with import paths `names`.
+
+    Like `resolve_type`, this never imports anything. Types whose module is
+    not imported are skipped because value can't be one of their instances.
+    """
+    if isinstance(names, str):
+        names = (names,)
+    types = tuple(
+        cls for cls in map(resolve_type, names) if cls is not None
+    )
+    return bool(types) and isinstance(value, types)
+
+
+class TypeRegistry:
+    """
+    Map types to handler functions for different aspects (e.g. 'display'
+    or 'size').
+    """
+
+    def __init__(self):
+        # Handlers by type and by import path. They map aspects to tuples
+        # of the form (handler, subclasses)
+        self._by_type = {}
+        self._by_name = {}
+        # Resolved handlers by type and aspect
+        self._cache = weakref.WeakKeyDictionary()
+        self._lock = threading.RLock()
+
+    def register(self, cls, handlers, subclasses=True):
+        """
+        Register handlers for `cls`.
+
+        Parameters
+        ----------
+        cls: type or str
+            The type or its import path. If it's a path, the type is only
+            resolved after its module is imported.
+        handlers: dict
+            Map of aspect names to handler functions. Previous handlers of
+            `cls` for the same aspects are replaced.
+        subclasses: bool
+            Whether the handlers also apply to subclasses of `cls`.
+        """
+        with self._lock:
+            if isinstance(cls, str):
+                registry = self._by_name
+            else:
+                registry = self._by_type
+            entry = registry.setdefault(cls, {})
+            for aspect, handler in handlers.items():
+                entry[aspect] = (handler, subclasses)
+            self._cache.clear()
+
+    def lookup(self, cls, aspect):
+        """
+        Get the handler of `aspect` for `cls`, or None if there is none.
+
+        This is the handler of the first class in the MRO of `cls` that
+        has one for `aspect`.
+        """
+        try:
+            return self._cache[cls][aspect]
+        except (KeyError, TypeError):
+            pass
+
+        with self._lock:
+            self._resolve_names()
+            handler = None
+            for klass in getattr(cls, '__mro__', ()):
+                entry = self._by_type.get(klass)
+                if entry is not None and aspect in entry:
+                    klass_handler, subclasses = entry[aspect]
+                    if subclasses or klass is cls:
+                        handler = klass_handler
+                        break
+            try:
+                self._cache.setdefault(cls, {})[aspect] = handler
+            except TypeError:
+                pass
+        return handler
+
+    def _resolve_names(self):
+        """Resolve the types registered by name whose module is imported."""
+        for name in list(self._by_name):
+            cls = resolve_type(name)
+            if cls is None:
+                continue
+            entry = self._by_name.pop(name)
+            self._by_type.setdefault(cls, {}).update(entry)
+            self._cache.clear()